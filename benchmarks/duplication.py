@@ -0,0 +1,65 @@
+"""Measure how long the "to plane" operators take to copy a selection.
+
+Run with Blender from the project root::
+
+    blender --background --factory-startup --python benchmarks/duplication.py -- --count 1000
+
+``--count`` small meshes with a visibility switch are selected and copied to
+the AnimationObjs collection with ``object.copy_to_plane`` and
+``object.copy_without_keyframes``.  The script reports the time each
+operator call took.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+
+def _measure(operator: str, count: int) -> float:
+    import bpy
+
+    import typst_importer
+    from typst_importer.operators.visibility import toggle_visibility
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    typst_importer.register()
+    try:
+        scene = bpy.context.scene
+        mesh = bpy.data.meshes.new("BenchmarkGlyph")
+        mesh.from_pydata(
+            [(0.0, 0.0, 0.0), (0.1, 0.0, 0.0), (0.1, 0.1, 0.0)], [], [(0, 1, 2)]
+        )
+        for index in range(count):
+            obj = bpy.data.objects.new(f"Glyph{index:05d}", mesh)
+            obj.location = ((index % 100) * 0.12, (index // 100) * 0.12, 1.0)
+            scene.collection.objects.link(obj)
+            toggle_visibility(obj, 1, True, backend="MODIFIER")
+            obj.select_set(True)
+
+        start = time.perf_counter()
+        getattr(bpy.ops.object, operator)()
+        return (time.perf_counter() - start) * 1000
+    finally:
+        typst_importer.unregister()
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.count} objects")
+    for operator in ("copy_to_plane", "copy_without_keyframes"):
+        print(f"{operator:<24} {_measure(operator, args.count):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
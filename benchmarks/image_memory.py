@@ -0,0 +1,138 @@
+"""Compare peak memory of in-memory and streamed image imports.
+
+Run with Blender from the project root::
+
+    blender --background --factory-startup --python benchmarks/image_memory.py
+
+Each mode is measured in a fresh Blender process, because peak RSS only ever
+grows within a process.  Both the process peak RSS and the Python-level
+``tracemalloc`` peak are reported.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import zlib
+
+
+IMAGE_COUNT = 40
+IMAGE_SIZE = 1024
+
+
+def _png_bytes(width: int, height: int, seed: int) -> bytes:
+    # Noise does not compress, so the payload size is close to width*height*3.
+    rows = b"".join(
+        b"\x00" + os.urandom(width * 3) for _row in range(height)
+    )
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(
+            ">I", zlib.crc32(body) & 0xFFFFFFFF
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"tEXt", f"seed\x00{seed}".encode("ascii"))
+        + chunk(b"IDAT", zlib.compress(rows, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _write_document(directory: Path) -> Path:
+    for index in range(IMAGE_COUNT):
+        (directory / f"image{index}.png").write_bytes(
+            _png_bytes(IMAGE_SIZE, IMAGE_SIZE, index)
+        )
+    body = "\n".join(
+        f'#image("image{index}.png", width: 2cm)' for index in range(IMAGE_COUNT)
+    )
+    typst_file = directory / "images.typ"
+    typst_file.write_text(
+        "#set page(width: auto, height: auto, margin: 0pt, fill: none)\n" + body,
+        encoding="utf-8",
+    )
+    return typst_file
+
+
+def _measure(stream_images: bool) -> dict:
+    from typst_importer.typst_to_svg import typst_to_blender_curves
+
+    with tempfile.TemporaryDirectory(prefix="typst_image_memory_") as directory:
+        typst_file = _write_document(Path(directory))
+        tracemalloc.start()
+        collection = typst_to_blender_curves(
+            typst_file,
+            convert_to_mesh=False,
+            stream_images=stream_images,
+        )
+        _current, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS.
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "stream_images": stream_images,
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        * rss_unit
+        / 2**20,
+        "tracemalloc_peak_mib": traced_peak / 2**20,
+        "processed_svg_mib": len(collection.processed_svg) / 2**20,
+        "images": sum(1 for obj in collection.objects if obj.type == "MESH"),
+    }
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+    if "--measure" in sys.argv:
+        stream_images = sys.argv[sys.argv.index("--measure") + 1] == "stream"
+        print("RESULT " + json.dumps(_measure(stream_images)), flush=True)
+        return
+
+    import bpy
+
+    for mode in ("memory", "stream"):
+        completed = subprocess.run(
+            [
+                bpy.app.binary_path,
+                "--background",
+                "--factory-startup",
+                "--python",
+                str(Path(__file__).resolve()),
+                "--",
+                "--measure",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        line = next(
+            line
+            for line in completed.stdout.splitlines()
+            if line.startswith("RESULT ")
+        )
+        result = json.loads(line[len("RESULT ") :])
+        print(
+            f"{mode:>6}: peak RSS {result['peak_rss_mib']:8.1f} MiB, "
+            f"Python peak {result['tracemalloc_peak_mib']:8.1f} MiB, "
+            f"stored SVG {result['processed_svg_mib']:7.2f} MiB, "
+            f"{result['images']} images"
+        )
+
+
+if __name__ == "__main__":
+    main()
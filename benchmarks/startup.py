@@ -0,0 +1,94 @@
+"""Measure the cost of importing and registering the add-on.
+
+Run with Blender from the project root::
+
+    blender --background --factory-startup --python benchmarks/startup.py
+
+The measurement runs in a fresh Blender process so no module is already
+cached.  It reports the time spent importing ``typst_importer`` and in
+``register()``, every module that registration pulled in, and which of the
+heavy import-pipeline dependencies were among them.  The cost of the first
+import afterwards is reported separately for comparison.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+
+# Dependencies that only the import pipeline needs.
+HEAVY_MODULES = ("typst", "lxml", "svg", "databpy", "nodebpy", "networkx")
+
+
+def _measure() -> dict:
+    import bpy  # noqa: F401
+
+    before = set(sys.modules)
+    start = time.perf_counter()
+    import typst_importer
+
+    imported = time.perf_counter()
+    typst_importer.register()
+    registered = time.perf_counter()
+    loaded = sorted(set(sys.modules) - before)
+
+    from typst_importer import typst_to_svg  # noqa: F401
+
+    pipeline = time.perf_counter()
+    typst_importer.unregister()
+    return {
+        "import_ms": (imported - start) * 1000,
+        "register_ms": (registered - imported) * 1000,
+        "first_use_ms": (pipeline - registered) * 1000,
+        "modules": loaded,
+        "heavy": sorted(
+            {name.split(".")[0] for name in loaded} & set(HEAVY_MODULES)
+        ),
+    }
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+    if "--measure" in sys.argv:
+        print("RESULT " + json.dumps(_measure()), flush=True)
+        return
+
+    import bpy
+
+    completed = subprocess.run(
+        [
+            bpy.app.binary_path,
+            "--background",
+            "--factory-startup",
+            "--python",
+            str(Path(__file__).resolve()),
+            "--",
+            "--measure",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    line = next(
+        line for line in completed.stdout.splitlines() if line.startswith("RESULT ")
+    )
+    result = json.loads(line[len("RESULT ") :])
+    print(f"import typst_importer: {result['import_ms']:8.1f} ms")
+    print(f"register():            {result['register_ms']:8.1f} ms")
+    print(f"first pipeline import: {result['first_use_ms']:8.1f} ms")
+    print(f"modules loaded:        {len(result['modules'])}")
+    print(f"heavy modules loaded:  {', '.join(result['heavy']) or 'none'}")
+    if "--verbose" in sys.argv:
+        for name in result["modules"]:
+            print(f"  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare frame evaluation time of the two visibility backends.
+
+Run with Blender from the project root::
+
+    blender --background --factory-startup --python benchmarks/visibility.py -- --count 2000
+
+For each backend, ``--count`` small glyph-like meshes get a visibility switch
+at staggered frames through ``toggle_visibility``.  The script then steps
+through the animation with ``frame_set`` and reports the mean time per frame,
+which includes the depsgraph evaluation of every visible object.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+
+
+FRAMES = 100
+
+
+def _glyph_mesh(bpy):
+    mesh = bpy.data.meshes.new("BenchmarkGlyph")
+    mesh.from_pydata(
+        [(0.0, 0.0, 0.0), (0.1, 0.0, 0.0), (0.1, 0.1, 0.0), (0.0, 0.1, 0.0)],
+        [],
+        [(0, 1, 2, 3)],
+    )
+    return mesh
+
+
+def _measure(backend: str, count: int) -> tuple[float, float]:
+    import bpy
+
+    from typst_importer.operators.visibility import toggle_visibility
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    scene = bpy.context.scene
+    scene.frame_start = 1
+    scene.frame_end = FRAMES
+    mesh = _glyph_mesh(bpy)
+
+    start = time.perf_counter()
+    for index in range(count):
+        obj = bpy.data.objects.new(f"Glyph{index:05d}", mesh)
+        obj.location.x = (index % 100) * 0.12
+        obj.location.y = (index // 100) * 0.12
+        scene.collection.objects.link(obj)
+        # Reveal the glyphs one after another over the animation.
+        toggle_visibility(
+            obj, 2 + index * (FRAMES - 2) // count, True, backend=backend
+        )
+    keyed = time.perf_counter()
+
+    scene.frame_set(1)
+    frames_start = time.perf_counter()
+    for frame in range(1, FRAMES + 1):
+        scene.frame_set(frame)
+    frames_end = time.perf_counter()
+    return (keyed - start) * 1000, (frames_end - frames_start) * 1000 / FRAMES
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.count} objects, {FRAMES} frames")
+    for backend in ("MODIFIER", "HIDE"):
+        keying_ms, frame_ms = _measure(backend, args.count)
+        print(
+            f"{backend:<8}  keying {keying_ms:8.1f} ms  "
+            f"per frame {frame_ms:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
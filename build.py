@@ -25,11 +25,8 @@ WHL_PATH = ADDON_DIR / "wheels"
 # Instead of reading from pyproject.toml, define the required packages here:
 required_packages = [
     "typst",
-    "databpy",
     "svg.path",
     "lxml",
-    "nodebpy==520.5.2",
-    "networkx==3.6.1",
 ]
 
 def run_python(args: str | List[str]):
@@ -3,16 +3,34 @@
 from __future__ import annotations
 
 from pathlib import Path
+import subprocess
+import sys
 from types import SimpleNamespace
 
 import bpy
+from mathutils import Matrix, Vector
 import pytest
 
 import typst_importer
+from typst_importer import typst_to_svg
 from typst_importer.operators import textbox_import
+from typst_importer.operators.alignment import (
+    OBJECT_OT_align_collection,
+    OBJECT_OT_align_to_active,
+)
+from typst_importer.glyph_library import glyph_centre
+from typst_importer.operators.fade import add_reveal_control
+from typst_importer.operators.morph import match_glyphs, morph_collections
+from typst_importer.operators.op_utils import (
+    animation_fcurves,
+    duplicate_objects,
+    insert_keyframes,
+)
 from typst_importer.node_groups import (
     create_follow_curve_node_group,
+    merge_duplicate_node_groups,
     modifier_input,
+    set_modifier_input_value,
 )
 from typst_importer.operators.path import configure_follow_path_animation
 from typst_importer.operators.textbox_import import ImportFromTextboxAsCurveOperator
@@ -61,6 +79,88 @@ def test_visibility_uses_typed_modifier_input_and_keyframes():
     assert _fcurve_frames(obj, data_path) == [4.0, 5.0]
 
 
+def test_hide_backend_keys_visibility_without_a_modifier():
+    obj = bpy.data.objects.new("HideObject", bpy.data.meshes.new("HideMesh"))
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.scene.typst_visibility_backend = "HIDE"
+
+    assert toggle_visibility(obj, current_frame=5, make_visible=True) is None
+    assert not obj.modifiers
+    for data_path in ("hide_viewport", "hide_render"):
+        assert _fcurve_frames(obj, data_path) == [4.0, 5.0]
+    assert obj.hide_viewport and obj.hide_render
+
+    bpy.context.scene.frame_set(5)
+    assert not obj.hide_viewport and not obj.hide_render
+    bpy.context.scene.frame_set(4)
+    assert obj.hide_viewport and obj.hide_render
+
+
+def test_reveal_control_drives_every_glyph_from_one_value():
+    collection = typst_express("#text[abcd]", name="pytest_reveal")
+    glyphs = list(collection.objects)
+
+    control = add_reveal_control(collection)
+    assert control.name not in {obj.name for obj in glyphs}
+    assert sorted(obj["typst_reveal_index"] for obj in glyphs) == [0, 1, 2, 3]
+
+    control["typst_reveal"] = 1.5
+    bpy.context.scene.frame_set(1)
+    opacities = sorted(
+        (obj["typst_reveal_index"], obj["opacity"]) for obj in glyphs
+    )
+    assert [opacity for _index, opacity in opacities] == pytest.approx(
+        [1.0, 0.5, 0.0, 0.0]
+    )
+
+
+def test_bulk_keyframes_replace_existing_keys_in_one_fcurve():
+    obj = bpy.data.objects.new("FadeObject", None)
+    bpy.context.scene.collection.objects.link(obj)
+    obj["opacity"] = 0.5
+
+    insert_keyframes(obj, '["opacity"]', [(1, 0.0), (6, 0.2), (11, 1.0)])
+    # Both later keys are replaced at once.
+    fcurve = insert_keyframes(
+        obj, '["opacity"]', [(11, 0.25), (6, 0.5)], interpolation="CONSTANT"
+    )
+
+    assert _fcurve_frames(obj, '["opacity"]') == [1.0, 6.0, 11.0]
+    assert [point.co.y for point in fcurve.keyframe_points] == [0.0, 0.5, 0.25]
+    assert [point.interpolation for point in fcurve.keyframe_points] == [
+        "BEZIER",
+        "CONSTANT",
+        "CONSTANT",
+    ]
+    assert obj["opacity"] == 0.5
+    bpy.context.scene.frame_set(8)
+    assert obj["opacity"] == pytest.approx(0.5)
+
+
+def test_duplicated_objects_share_data_but_not_keyframes():
+    collection = bpy.data.collections.new("pytest_duplicates")
+    bpy.context.scene.collection.children.link(collection)
+    mesh = bpy.data.meshes.new("pytest_duplicate_mesh")
+    original = bpy.data.objects.new("pytest_duplicate", mesh)
+    bpy.context.scene.collection.objects.link(original)
+    insert_keyframes(original, "location", [(1, 0.0), (10, 1.0)])
+
+    (copy,) = duplicate_objects([original], collection, "_plane")
+    assert copy.name == "pytest_duplicate_plane"
+    assert copy.data == mesh
+    assert list(copy.users_collection) == [collection]
+    assert copy.animation_data.action != original.animation_data.action
+
+    insert_keyframes(copy, "location", [(20, 2.0)])
+    assert len(animation_fcurves(original)[0].keyframe_points) == 2
+    assert len(animation_fcurves(copy)[0].keyframe_points) == 3
+
+    (static,) = duplicate_objects(
+        [original], collection, "_static", keep_animation=False
+    )
+    assert static.animation_data is None
+
+
 def test_follow_path_uses_typed_object_and_factor_inputs():
     mesh = bpy.data.meshes.new("FollowerMesh")
     follower = bpy.data.objects.new("Follower", mesh)
@@ -128,6 +228,53 @@ def test_typst_import_modes(kwargs, object_type, fill_mode):
         assert all(obj.data.fill_mode == fill_mode for obj in objects)
 
 
+def test_scale_factor_is_applied_before_blender_imports_the_svg():
+    points = {}
+    for scale_factor in (100.0, 250.0):
+        collection = typst_express(
+            '#rect(width: 12pt, height: 12pt, fill: rgb("#336699"))',
+            name=f"pytest_scale_{int(scale_factor)}",
+            scale_factor=scale_factor,
+            convert_to_mesh=False,
+        )
+        (obj,) = collection.objects
+        assert obj.matrix_world == Matrix.Identity(4)
+        assert obj["opacity"] == 1.0
+        assert obj.bl_rna.properties["opacity"].hard_max == 1.0
+        points[scale_factor] = [
+            point.co.copy()
+            for spline in obj.data.splines
+            for point in spline.bezier_points
+        ]
+
+    assert points[100.0]
+    for small, large in zip(points[100.0], points[250.0]):
+        assert (large - small * 2.5).length == pytest.approx(0.0, abs=1e-5)
+
+
+def test_unfoldable_scale_falls_back_to_scaling_the_imported_curves(monkeypatch):
+    self_closing = '<svg xmlns="http://www.w3.org/2000/svg" width="10pt"/>'
+    assert typst_to_svg.fold_svg_scale(self_closing, 100.0) == (self_closing, False)
+
+    folded = typst_express("#text[ab]", name="pytest_scale_folded")
+    monkeypatch.setattr(
+        typst_to_svg,
+        "fold_svg_scale",
+        lambda svg, _scale, _scale_length=1.0: (svg, False),
+    )
+    fallback = typst_express("#text[ab]", name="pytest_scale_fallback")
+
+    def extents(collection):
+        bounds = []
+        for obj in sorted(collection.objects, key=lambda obj: obj.name):
+            corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+            bounds.extend(min(corner[axis] for corner in corners) for axis in range(3))
+            bounds.extend(max(corner[axis] for corner in corners) for axis in range(3))
+        return bounds
+
+    assert extents(fallback) == pytest.approx(extents(folded), abs=1e-4)
+
+
 def test_material_deduplication_preserves_unrelated_orphan_data():
     unrelated_material = bpy.data.materials.new("KeepThisMaterial")
     collection = bpy.data.collections.new("MaterialDedup")
@@ -143,6 +290,434 @@ def test_material_deduplication_preserves_unrelated_orphan_data():
     assert bpy.data.materials.get(unrelated_material.name) == unrelated_material
 
 
+def test_imports_share_one_material_per_exact_color():
+    collections = [
+        typst_express(
+            '#text(fill: rgb("#000000"))[ab] #text(fill: rgb("#336699"))[c]',
+            name=f"pytest_shared_{index}",
+            convert_to_mesh=False,
+        )
+        for index in range(3)
+    ]
+
+    materials = {
+        obj.data.materials[0]
+        for collection in collections
+        for obj in collection.objects
+    }
+    assert len(materials) == 2
+    assert all(material.get("typst_material_key") for material in materials)
+    assert not any(
+        material.get("typst_svg_blender_material") for material in bpy.data.materials
+    )
+
+    # The lazily built index must notice materials removed behind its back.
+    black = next(material for material in materials if material.diffuse_color[2] == 0)
+    bpy.data.materials.remove(black)
+    collection = typst_express('#text(fill: rgb("#000000"))[a]', convert_to_mesh=False)
+    (obj,) = collection.objects
+    assert tuple(obj.data.materials[0].diffuse_color)[:3] == (0.0, 0.0, 0.0)
+
+
+def test_color_attribute_mode_shares_one_material():
+    collection = typst_express(
+        '#text(fill: rgb("#ff0000"))[a] #text(fill: rgb("#0000ff"))[b]',
+        name="pytest_object_color",
+        use_color_attribute=True,
+    )
+
+    objects = list(collection.objects)
+    assert {obj.type for obj in objects} == {"MESH"}
+    assert len({obj.data.materials[0] for obj in objects}) == 1
+    material = objects[0].data.materials[0]
+    assert any(
+        node.bl_idname == "ShaderNodeObjectInfo" for node in material.node_tree.nodes
+    )
+    colors = {tuple(round(component, 3) for component in obj.color) for obj in objects}
+    assert colors == {(1.0, 0.0, 0.0, 1.0), (0.0, 0.0, 1.0, 1.0)}
+
+
+def test_materials_are_copied_from_templates_and_node_groups_shared():
+    red = typst_to_svg.create_material((1.0, 0.0, 0.0, 1.0), "Red")
+    blue = typst_to_svg.create_material((0.0, 0.0, 1.0, 1.0), "Blue")
+
+    templates = [
+        material for material in bpy.data.materials if material.name.startswith(".")
+    ]
+    assert len(templates) == 1
+    for material, color in ((red, (1.0, 0.0, 0.0, 1.0)), (blue, (0.0, 0.0, 1.0, 1.0))):
+        assert "typst_material_template" not in material
+        emission = material.node_tree.nodes["Emission"]
+        assert tuple(emission.inputs["Color"].default_value) == color
+        assert tuple(material.diffuse_color) == color
+
+    first = create_follow_curve_node_group()
+    assert create_follow_curve_node_group() == first
+    assert first.name == "Follow Path"
+
+    objects = []
+    for index in range(3):
+        obj = bpy.data.objects.new(f"Glyph{index}", None)
+        bpy.context.scene.collection.objects.link(obj)
+        objects.append(obj)
+        toggle_visibility(obj, current_frame=5, make_visible=index != 1)
+    shared = objects[0].modifiers["Visibility"].node_group
+    assert {obj.modifiers["Visibility"].node_group for obj in objects} == {shared}
+
+    # Older versions gave every modifier a private copy.
+    copy = shared.copy()
+    del copy["typst_importer_template"]
+    objects[1].modifiers["Visibility"].node_group = copy
+    set_modifier_input_value(objects[1].modifiers["Visibility"], "Visibility", True)
+    node_group_count = len(bpy.data.node_groups)
+    assert merge_duplicate_node_groups() == 1
+    assert len(bpy.data.node_groups) == node_group_count - 1
+    modifier = objects[1].modifiers["Visibility"]
+    assert modifier.node_group == shared
+    assert modifier_input(modifier, "Visibility")[0].value is True
+
+
+def test_joined_imports_merge_paths_before_blender_creates_objects(monkeypatch):
+    joined_counts = []
+    join_curves = typst_to_svg._join_curves
+
+    def counting_join(collection, name):
+        joined_counts.append(
+            sum(obj.type == "CURVE" for obj in collection.objects)
+        )
+        join_curves(collection, name)
+
+    monkeypatch.setattr(typst_to_svg, "_join_curves", counting_join)
+    collection = typst_express(
+        '#text[Hello World] #text(fill: rgb("#336699"))[again]',
+        name="pytest_merged",
+        convert_to_mesh=False,
+        join_curves=True,
+    )
+
+    assert joined_counts == [2]
+    (obj,) = collection.objects
+    assert obj.type == "CURVE"
+    assert len(obj.data.materials) == 2
+    assert len(obj.data.splines) > 10
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"convert_to_mesh": False}, {}, {"use_grease_pencil": True}],
+)
+def test_origin_to_char_centres_each_glyph(kwargs):
+    reference = typst_express("#text[ab]", name="pytest_origin_ref", **kwargs)
+    collection = typst_express(
+        "#text[ab]", name="pytest_origin", origin_to_char=True, **kwargs
+    )
+
+    objects = sorted(collection.objects, key=lambda obj: obj.location.x)
+    assert len(objects) == 2
+    for obj in objects:
+        points = typst_to_svg._object_points(obj)
+        assert points.mean(axis=0) == pytest.approx((0.0, 0.0, 0.0), abs=1e-5)
+    assert objects[0].location.x < objects[1].location.x
+
+    # World-space geometry is unchanged.
+    for obj, ref in zip(
+        objects, sorted(reference.objects, key=lambda obj: obj.location.x)
+    ):
+        world = typst_to_svg._object_points(obj).mean(axis=0)
+        world = obj.matrix_world @ Vector(world.tolist())
+        ref_world = ref.matrix_world @ Vector(
+            typst_to_svg._object_points(ref).mean(axis=0).tolist()
+        )
+        assert tuple(world) == pytest.approx(tuple(ref_world), abs=1e-5)
+
+
+def test_index_labels_overlay_is_a_single_object():
+    collection = typst_express("#text[abc]", name="pytest_indices", origin_to_char=True)
+    objects = list(collection.objects)
+
+    indices = typst_to_svg.add_indices_to_collection(collection)
+    (overlay,) = indices.objects
+    modifier = overlay.modifiers[0]
+    assert modifier_input(modifier, "Collection")[0].value == collection
+    labels = modifier_input(modifier, "Labels")[0].value.split("\n")
+    assert sorted(labels, key=int) == [str(i) for i in range(len(objects))]
+
+    evaluated = overlay.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    assert len(evaluated.data.polygons) > 0
+
+    fallback = typst_to_svg.add_indices_to_collection(collection, mode="OBJECTS")
+    circles = [obj for obj in fallback.objects if obj.type == "MESH"]
+    texts = [obj for obj in fallback.objects if obj.type == "FONT"]
+    assert len(circles) == len(texts) == len(objects)
+    assert len({obj.data for obj in circles}) == 1
+    assert [obj.data.body for obj in texts] == [str(i) for i in range(len(objects))]
+
+
+def test_index_labels_sit_on_their_objects():
+    collection = bpy.data.collections.new("pytest_label_order")
+    bpy.context.scene.collection.children.link(collection)
+    # Collection order, natural name order and plain string order all differ.
+    numbers = [5, 10, 1, 11, 2, 0, 3, 4, 6, 7, 8, 9]
+    for index, number in enumerate(numbers):
+        obj = bpy.data.objects.new(f"pytest_label_{number}", None)
+        obj.location = (float(index), 0.0, 0.0)
+        collection.objects.link(obj)
+
+    indices = typst_to_svg.add_indices_to_collection(collection)
+    (overlay,) = indices.objects
+    evaluated = overlay.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    xs = [vertex.co.x for vertex in evaluated.data.vertices]
+    for index in range(len(numbers)):
+        near = [x for x in xs if abs(x - index) < 0.45]
+        # Only the labels 10 and 11 are two digits wide.
+        assert (max(near) - min(near) > 0.12) == (index >= 10)
+
+
+def test_index_labels_skip_the_root_empty():
+    collection = typst_express(
+        "#text[abc]",
+        name="pytest_rooted_indices",
+        origin_to_char=True,
+        show_indices=True,
+        use_root_empty=True,
+    )
+    root = typst_to_svg.collection_root(collection)
+    glyphs = [obj for obj in collection.objects if obj != root]
+    (overlay,) = bpy.data.collections[f"{collection.name}_Indice^s"].objects
+    labels = modifier_input(overlay.modifiers[0], "Labels")[0].value.split("\n")
+    assert sorted(labels, key=int) == [str(i) for i in range(len(glyphs))]
+
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    circles = [
+        instance.matrix_world.translation.xy.copy()
+        for instance in depsgraph.object_instances
+        if instance.is_instance and instance.parent.original == overlay
+    ]
+    assert len(circles) == len(glyphs)
+    for obj in glyphs:
+        assert any(
+            (circle - obj.matrix_world.translation.xy).length < 1e-4
+            for circle in circles
+        )
+
+
+def test_root_empty_positions_and_aligns_the_whole_import():
+    plain = typst_express("#text[ab]", name="pytest_plain", origin_to_char=True)
+    collection = typst_express(
+        "#text[ab]",
+        name="pytest_rooted",
+        origin_to_char=True,
+        position=(1.0, 2.0, 0.0),
+        use_root_empty=True,
+    )
+
+    root = typst_to_svg.collection_root(collection)
+    assert root.type == "EMPTY"
+    assert root.name == "pytest_rooted"
+    assert tuple(root.location) == pytest.approx((1.0, 2.0, 0.0))
+    glyphs = [obj for obj in collection.objects if obj != root]
+    assert all(obj.parent == root for obj in glyphs)
+    assert sorted(tuple(obj.location) for obj in glyphs) == pytest.approx(
+        sorted(tuple(obj.location) for obj in plain.objects)
+    )
+
+    destination = bpy.data.objects.new("AlignTarget", None)
+    destination.location = (5.0, -3.0, 0.0)
+    bpy.context.scene.collection.objects.link(destination)
+    bpy.context.view_layer.update()
+    glyph_locations = [tuple(obj.location) for obj in glyphs]
+    context = SimpleNamespace(
+        active_object=destination, selected_objects=[glyphs[0], destination]
+    )
+    operator = SimpleNamespace(report=lambda _level, _message: None)
+    assert OBJECT_OT_align_collection.execute(operator, context) == {"FINISHED"}
+
+    assert [tuple(obj.location) for obj in glyphs] == glyph_locations
+    bpy.context.view_layer.update()
+    assert tuple(glyphs[0].matrix_world.translation.xy) == pytest.approx((5.0, -3.0))
+
+
+def test_alignment_moves_a_selected_child_with_its_parent():
+    collections = []
+    for name in ("pytest_align_parent", "pytest_align_child"):
+        collection = bpy.data.collections.new(name)
+        bpy.context.scene.collection.children.link(collection)
+        collections.append(collection)
+    parent = bpy.data.objects.new("pytest_align_parent", None)
+    child = bpy.data.objects.new("pytest_align_child", None)
+    child.parent = parent
+    child.location = (0.0, 1.0, 0.0)
+    collections[0].objects.link(parent)
+    collections[1].objects.link(child)
+    destination = bpy.data.objects.new("pytest_align_target", None)
+    destination.location = (5.0, -3.0, 0.0)
+    bpy.context.scene.collection.objects.link(destination)
+    context = SimpleNamespace(
+        active_object=destination, selected_objects=[child, parent, destination]
+    )
+    operator = SimpleNamespace(report=lambda _level, _message: None)
+
+    for operator_class in (OBJECT_OT_align_to_active, OBJECT_OT_align_collection):
+        parent.location = (1.0, 0.0, 0.0)
+        bpy.context.view_layer.update()
+        assert operator_class.execute(operator, context) == {"FINISHED"}
+        bpy.context.view_layer.update()
+        assert tuple(parent.matrix_world.translation.xy) == pytest.approx((5.0, -3.0))
+        assert tuple(child.matrix_world.translation.xy) == pytest.approx((5.0, -2.0))
+
+
+def test_glyph_library_shares_outlines_across_imports():
+    first = typst_express("#text[aba]", name="pytest_glyphs_1", use_glyph_library=True)
+    second = typst_express(
+        '#text(fill: rgb("#ff0000"))[ab]',
+        name="pytest_glyphs_2",
+        use_glyph_library=True,
+    )
+
+    glyphs = list(first.objects) + list(second.objects)
+    assert len({obj.data for obj in glyphs}) == 2
+    assert all(obj.data.get("typst_glyph_hash") for obj in glyphs)
+    assert (first["typst_glyphs_reused"], first["typst_glyphs_total"]) == (1, 3)
+    assert (second["typst_glyphs_reused"], second["typst_glyphs_total"]) == (2, 2)
+
+    # Colour lives on the objects, so differently coloured glyphs share data.
+    colors = {
+        tuple(round(c, 3) for c in obj.material_slots[0].material.diffuse_color)[:3]
+        for obj in glyphs
+    }
+    assert colors == {(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)}
+    assert all(slot.link == "OBJECT" for obj in glyphs for slot in obj.material_slots)
+    library = bpy.data.collections["Typst Glyph Library"]
+    assert len(library.objects) == 2
+
+
+def test_glyph_library_shares_glyphs_far_from_the_origin():
+    collection = typst_express(
+        "#text[a #h(4cm) a #h(4cm) a]",
+        name="pytest_glyphs_far",
+        use_glyph_library=True,
+    )
+
+    glyphs = list(collection.objects)
+    assert max(abs(obj.location.x) for obj in glyphs) > 5.0
+    assert len({obj.data for obj in glyphs}) == 1
+    assert collection["typst_glyphs_reused"] == 2
+    assert collection["typst_glyphs_total"] == 3
+
+
+def test_morph_matches_glyphs_by_outline_and_animates_the_transition():
+    source = typst_express("#text[ab]", name="pytest_morph_1", use_glyph_library=True)
+    target = typst_express("#text[bac]", name="pytest_morph_2")
+
+    pairs, removed, added = match_glyphs(source, target)
+    assert len(pairs) == 2
+    assert removed == []
+    assert len(added) == 1
+    assert len({target_obj for _source_obj, target_obj in pairs}) == 2
+
+    assert morph_collections(source, target, frame=1, duration=10) == (2, 0, 1)
+    bpy.context.scene.frame_set(11)
+    for source_obj, target_obj in pairs:
+        source_centre = source_obj.matrix_world @ Vector(
+            glyph_centre(source_obj.data).tolist()
+        )
+        target_centre = target_obj.matrix_world @ Vector(
+            glyph_centre(target_obj.data).tolist()
+        )
+        assert tuple(source_centre) == pytest.approx(tuple(target_centre), abs=1e-4)
+    assert added[0]["opacity"] == pytest.approx(1.0)
+
+
+def test_morph_matches_wide_formulas_and_ignores_index_labels():
+    source = typst_express("#text[a #h(5cm) b #h(5cm) a]", name="pytest_morph_wide_1")
+    target = typst_express("#text[b #h(5cm) a #h(5cm) a]", name="pytest_morph_wide_2")
+    typst_to_svg.add_indices_to_collection(source, mode="OBJECTS")
+    assert max(abs(obj.location.x) for obj in target.objects) > 5.0
+
+    pairs, removed, added = match_glyphs(source, target)
+    assert len(pairs) == 3
+    assert removed == added == []
+    assert all(
+        len(source_obj.data.splines) == len(target_obj.data.splines)
+        for source_obj, target_obj in pairs
+    )
+
+
+def test_instancing_mode_imports_one_object():
+    collection = typst_express(
+        '#text[ab] #text(fill: rgb("#ff0000"))[a]',
+        name="pytest_instanced",
+        use_instancing=True,
+    )
+
+    (instancer,) = collection.objects
+    attributes = instancer.data.attributes
+    glyph_ids = [item.value for item in attributes["glyph_id"].data]
+    assert len(instancer.data.vertices) == 3
+    assert glyph_ids[0] == glyph_ids[2] != glyph_ids[1]
+    assert [item.value for item in attributes["paint_index"].data] == [0, 1, 2]
+    colors = [tuple(item.color)[:3] for item in attributes["color"].data]
+    assert colors[0] != colors[2]
+
+    glyphs = modifier_input(instancer.modifiers[0], "Glyphs")[0].value
+    assert len(glyphs.objects) == 2
+    assert typst_to_svg.glyph_prototypes(collection) == glyphs
+    assert glyphs.name == "pytest_instanced Glyphs"
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    instances = [
+        instance
+        for instance in depsgraph.object_instances
+        if instance.is_instance and instance.parent.original == instancer
+    ]
+    assert len(instances) == 3
+
+
+def test_instancing_keeps_colours_from_the_color_attribute_mode():
+    collection = typst_express(
+        '#text[a] #text(fill: rgb("#ff0000"))[a]',
+        name="pytest_instanced_colors",
+        use_instancing=True,
+        use_color_attribute=True,
+    )
+
+    (instancer,) = collection.objects
+    colors = [
+        tuple(round(c, 3) for c in item.color)[:3]
+        for item in instancer.data.attributes["color"].data
+    ]
+    assert colors == [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)]
+
+
+def test_failed_import_rolls_back_only_its_own_data(monkeypatch):
+    keep_material = bpy.data.materials.new("KeepThisMaterial")
+    keep_mesh = bpy.data.meshes.new("KeepThisMesh")
+    counts = (
+        len(bpy.data.collections),
+        len(bpy.data.objects),
+        len(bpy.data.curves),
+        len(bpy.data.materials),
+    )
+
+    def fail(*_args, **_kwargs):
+        raise RuntimeError("conversion failed")
+
+    monkeypatch.setattr(typst_to_svg, "_convert_to_meshes", fail)
+    with pytest.raises(RuntimeError, match="conversion failed"):
+        typst_express(
+            '#rect(width: 12pt, height: 12pt, fill: rgb("#336699"))',
+            name="pytest_rollback",
+        )
+
+    assert (
+        len(bpy.data.collections),
+        len(bpy.data.objects),
+        len(bpy.data.curves),
+        len(bpy.data.materials),
+    ) == counts
+    assert bpy.data.materials.get("KeepThisMaterial") == keep_material
+    assert bpy.data.meshes.get("KeepThisMesh") == keep_mesh
+
+
 def test_textbox_curve_importer_smoke_test(tmp_path: Path):
     typst_file = tmp_path / "textbox_input.typ"
     typst_file.write_text('#rect(width: 12pt, height: 12pt, fill: rgb("#336699"))')
@@ -184,3 +759,23 @@ def test_addon_registers_and_unregisters_cleanly():
         assert hasattr(bpy.ops.export_scene, "typst_svg")
     finally:
         typst_importer.unregister()
+
+
+def test_registering_the_addon_does_not_load_the_import_pipeline():
+    script = (
+        "import sys, typst_importer\n"
+        "typst_importer.register()\n"
+        "loaded = {name.split('.')[0] for name in sys.modules}\n"
+        "print(sorted(loaded & {'typst', 'lxml', 'svg', 'databpy', 'nodebpy'}))\n"
+        "print('typst_importer.typst_to_svg' in sys.modules)\n"
+        "typst_importer.unregister()\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).resolve().parents[1],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert completed.stdout.splitlines()[-2:] == ["[]", "False"]
@@ -3,10 +3,19 @@
 from __future__ import annotations
 
 import inspect
+from types import SimpleNamespace
 
 import bpy
 import pytest
 
+from typst_importer.node_groups import (
+    modifier_input,
+    restore_grease_pencil_stroke_radius_modifier,
+    set_modifier_input_value,
+)
+from typst_importer.operators.grease_pencil import (
+    OBJECT_OT_bake_grease_pencil_stroke_radius,
+)
 from typst_importer.typst_to_svg import (
     _convert_to_grease_pencil,
     typst_to_blender_curves,
@@ -321,6 +330,89 @@ def test_stroke_radius_modifier_is_shared_adjustable_and_preserves_fill_ids():
     )
 
 
+def test_baked_stroke_radius_needs_no_modifier_and_can_be_edited_again():
+    collection = typst_express(
+        '#rect(width: 12pt, height: 12pt, fill: rgb("#336699"))',
+        name="pytest_grease_pencil_baked",
+        use_grease_pencil=True,
+        grease_pencil_stroke_radius=0.05,
+        bake_grease_pencil_stroke_radius=True,
+    )
+
+    objects = list(collection.objects)
+    assert objects
+    for obj in objects:
+        assert not obj.modifiers
+        drawing = _drawing(obj)
+        assert _attribute_values(drawing, "radius") == pytest.approx(
+            [0.05] * len(drawing.attributes["radius"].data)
+        )
+        assert not any(_attribute_values(drawing, "hide_stroke"))
+
+    obj = objects[0]
+    modifier = restore_grease_pencil_stroke_radius_modifier(obj)
+    assert _modifier_radius_input(modifier).value == pytest.approx(0.05)
+    _modifier_radius_input(modifier).value = 0.02
+    context = SimpleNamespace(selected_objects=[obj])
+    operator = SimpleNamespace(report=lambda _level, _message: None)
+    assert OBJECT_OT_bake_grease_pencil_stroke_radius.execute(
+        operator, context
+    ) == {"FINISHED"}
+    assert not obj.modifiers
+    radii = _attribute_values(_drawing(obj), "radius")
+    assert radii == pytest.approx([0.02] * len(radii))
+
+
+def test_merged_grease_pencil_import_is_one_object_with_glyph_indices():
+    imported = _new_collection("MergedGlyphs")
+    for name, offset in (("Left", 0.0), ("Right", 3.0), ("Far", 6.0)):
+        _new_filled_curve(
+            imported,
+            name,
+            contours=[
+                [
+                    (offset, 0.0, 0.0),
+                    (offset + 2.0, 0.0, 0.0),
+                    (offset + 2.0, 2.0, 0.0),
+                    (offset, 2.0, 0.0),
+                ]
+            ],
+            color=(0.2, 0.5, 0.8, 1.0),
+        )
+
+    _convert_to_grease_pencil(imported, merge_name="Merged")
+
+    (merged,) = imported.objects
+    assert merged.name == "GP_Merged"
+    assert [modifier.name for modifier in merged.modifiers] == [
+        "Typst Glyph Reveal",
+        "Typst Stroke Radius",
+    ]
+
+    def strokes(data):
+        glyphs = []
+        fill_ids = []
+        for layer in data.layers:
+            for frame in layer.frames:
+                if not len(frame.drawing.strokes):
+                    continue
+                glyphs += _attribute_values(frame.drawing, "glyph_index")
+                fill_ids += _attribute_values(frame.drawing, "fill_id")
+        return glyphs, fill_ids
+
+    glyphs, fill_ids = strokes(merged.data)
+    assert sorted(glyphs) == [0, 1, 2]
+    assert len(set(fill_ids)) == 3
+
+    reveal = merged.modifiers["Typst Glyph Reveal"]
+    assert modifier_input(reveal, "Visible Glyphs")[0].value == 3
+    set_modifier_input_value(reveal, "Visible Glyphs", 1)
+    merged.update_tag()
+    bpy.context.view_layer.update()
+    evaluated = merged.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    assert strokes(evaluated.data)[0] == [0]
+
+
 def test_stroke_radius_group_is_shared_despite_a_name_collision():
     bpy.data.node_groups.new("Typst Stroke Radius", "ShaderNodeTree")
     imported = _new_collection("StrokeRadiusNameCollision")
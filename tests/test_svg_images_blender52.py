@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import base64
+import os
 from pathlib import Path
 import struct
 import zlib
@@ -11,7 +12,15 @@ import bpy
 from lxml import etree
 import pytest
 
-from typst_importer.image_import import extract_svg_images
+from typst_importer import image_import, image_proxy, typst_to_svg
+from typst_importer.image_atlas import image_dimensions, pack_rectangles
+from typst_importer.image_import import (
+    extract_svg_images,
+    prepare_svg_images,
+    rehydrate_svg_images,
+)
+from typst_importer.image_store import prune_image_cache
+from typst_importer.operators.images import OBJECT_OT_pack_typst_images
 from typst_importer.svg_preprocessing import SVG_NS, preprocess_svg
 from typst_importer.typst_to_svg import typst_to_blender_curves
 
@@ -120,6 +129,27 @@ def test_preprocessing_bounds_recursive_use_expansion():
         preprocess_svg(svg)
 
 
+def test_image_extraction_follows_use_chains_and_skips_image_free_svgs():
+    data = base64.b64encode(_png_bytes()).decode("ascii")
+    svg = f'''<svg xmlns="{SVG_NS}" width="10" height="10">
+      <defs>
+        <g id="inner"><image width="2" height="2" href="data:image/png;base64,{data}"/></g>
+        <g id="outer"><path d="M0 0 L1 1"/><use href="#inner" x="3"/></g>
+      </defs>
+      <path d="M0 0 L1 1"/>
+      <use href="#outer" x="1"/>
+    </svg>'''
+
+    images, warnings, _marked_svg, marker_ids = prepare_svg_images(svg)
+
+    assert warnings == []
+    assert len(images) == len(marker_ids) == 1
+    assert images[0]["corners"][0] == pytest.approx((4.0, 0.0))
+
+    image_free = f'<svg xmlns="{SVG_NS}" width="10" height="10"><path d="M0 0"/></svg>'
+    assert prepare_svg_images(image_free) == ([], [], image_free, [])
+
+
 def test_typst_image_becomes_a_packed_textured_plane(tmp_path: Path):
     image_file = tmp_path / "pixel.png"
     image_file.write_bytes(_png_bytes())
@@ -164,3 +194,238 @@ def test_typst_image_becomes_a_packed_textured_plane(tmp_path: Path):
         material.get("typst_svg_blender_material") and material.users == 0
         for material in bpy.data.materials
     )
+
+
+def test_atlas_packing_keeps_padded_rectangles_apart():
+    sizes = [(30, 10), (10, 30), (64, 64), (5, 5), (200, 40)]
+    origins, bins = pack_rectangles(sizes, bin_size=128, padding=2)
+
+    assert origins[4] is None
+    assert image_dimensions(_png_bytes(3, 7)) == (3, 7)
+    boxes = [
+        (origin[0], origin[1] - 2, origin[2] - 2, origin[1] + w + 2, origin[2] + h + 2)
+        for origin, (w, h) in zip(origins, sizes)
+        if origin is not None
+    ]
+    for index, (bin_index, x0, y0, x1, y1) in enumerate(boxes):
+        assert x1 <= bins[bin_index][0] and y1 <= bins[bin_index][1]
+        for other in boxes[index + 1 :]:
+            assert other[0] != bin_index or (
+                x1 <= other[1] or other[3] <= x0 or y1 <= other[2] or other[4] <= y0
+            )
+
+
+def test_small_images_share_one_atlas_material(tmp_path: Path):
+    lines = ["#set page(width: auto, height: auto, margin: 0pt, fill: none)"]
+    for index, (width, height) in enumerate(((1, 1), (2, 1), (1, 2))):
+        (tmp_path / f"icon{index}.png").write_bytes(_png_bytes(width, height))
+        lines.append(f'#image("icon{index}.png", width: 10pt)')
+    typst_file = tmp_path / "icons.typ"
+    typst_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    collection = typst_to_blender_curves(
+        typst_file,
+        convert_to_mesh=False,
+        use_image_atlas=True,
+    )
+
+    planes = [obj for obj in collection.objects if obj.get("typst_svg_image_object")]
+    assert len(planes) == 3
+    materials = {plane.data.materials[0] for plane in planes}
+    assert len(materials) == 1
+    texture = next(
+        node
+        for node in materials.pop().node_tree.nodes
+        if node.bl_idname == "ShaderNodeTexImage"
+    )
+    assert texture.image.get("typst_svg_atlas") is True
+    assert texture.image.packed_file
+    for plane in planes:
+        uvs = [loop.uv for loop in plane.data.uv_layers[0].data]
+        assert all(0.0 <= uv.x <= 1.0 and 0.0 <= uv.y <= 1.0 for uv in uvs)
+        assert max(uv.x for uv in uvs) - min(uv.x for uv in uvs) < 1.0
+
+
+def test_large_images_use_a_viewport_proxy_until_final_render(tmp_path: Path):
+    (tmp_path / "wide.png").write_bytes(_png_bytes(1500, 3))
+    typst_file = tmp_path / "wide.typ"
+    typst_file.write_text(
+        "#set page(width: auto, height: auto, margin: 0pt, fill: none)\n"
+        '#image("wide.png", width: 100pt)\n',
+        encoding="utf-8",
+    )
+
+    collection = typst_to_blender_curves(
+        typst_file,
+        convert_to_mesh=False,
+        use_image_proxies=True,
+    )
+
+    plane = next(obj for obj in collection.objects if obj.type == "MESH")
+    texture = next(
+        node
+        for node in plane.data.materials[0].node_tree.nodes
+        if node.bl_idname == "ShaderNodeTexImage"
+    )
+    proxy = texture.image
+    assert max(proxy.size) <= image_proxy.IMAGE_PROXY_MAX_SIZE
+    assert tuple(proxy["typst_proxy_size"]) == (1500, 3)
+    assert image_proxy.proxy_source_path(proxy).is_file()
+
+    image_proxy.use_full_resolution_images(bpy.context.scene)
+    assert tuple(texture.image.size) == (1500, 3)
+    image_proxy.restore_proxy_images()
+    assert texture.image == proxy
+
+    bpy.utils.register_class(OBJECT_OT_pack_typst_images)
+    try:
+        bpy.ops.object.pack_typst_images()
+    finally:
+        bpy.utils.unregister_class(OBJECT_OT_pack_typst_images)
+    packed = proxy[image_proxy.PACKED_SOURCE_PROPERTY]
+    assert packed.packed_file
+    assert tuple(packed.size) == (1500, 3)
+
+
+def test_image_cache_evicts_least_recently_used_files(tmp_path: Path):
+    for age, name in enumerate(["new.png", "old.png", "kept.png"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (1000.0 - age, 1000.0 - age))
+
+    removed = prune_image_cache(
+        tmp_path, max_bytes=20, keep=[tmp_path / "kept.png"]
+    )
+
+    assert removed == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["kept.png", "new.png"]
+
+
+def test_image_store_references_deduplicated_external_files(tmp_path: Path):
+    (tmp_path / "pixel.png").write_bytes(_png_bytes())
+    typst_file = tmp_path / "stored.typ"
+    typst_file.write_text(
+        "#set page(width: auto, height: auto, margin: 0pt, fill: none)\n"
+        '#image("pixel.png", width: 10pt)\n'
+        '#image("pixel.png", width: 20pt)\n',
+        encoding="utf-8",
+    )
+    store = tmp_path / "store"
+
+    collection = typst_to_blender_curves(
+        typst_file,
+        convert_to_mesh=False,
+        image_directory=str(store),
+    )
+
+    images = {
+        node.image
+        for obj in collection.objects
+        if obj.type == "MESH"
+        for node in obj.data.materials[0].node_tree.nodes
+        if node.bl_idname == "ShaderNodeTexImage"
+    }
+    assert len(images) == 1
+    image = images.pop()
+    assert image.packed_file is None
+    assert [path.suffix for path in store.iterdir()] == [".png"]
+    assert Path(bpy.path.abspath(image.filepath)).parent == store
+
+    bpy.utils.register_class(OBJECT_OT_pack_typst_images)
+    try:
+        bpy.ops.object.pack_typst_images()
+    finally:
+        bpy.utils.unregister_class(OBJECT_OT_pack_typst_images)
+    assert image.packed_file
+
+
+def test_failed_import_keeps_stored_images_it_reused(tmp_path: Path, monkeypatch):
+    (tmp_path / "pixel.png").write_bytes(_png_bytes())
+    typst_file = tmp_path / "reused.typ"
+    typst_file.write_text(
+        "#set page(width: auto, height: auto, margin: 0pt, fill: none)\n"
+        '#image("pixel.png", width: 10pt)\n',
+        encoding="utf-8",
+    )
+    store = tmp_path / "store"
+    collection = typst_to_blender_curves(
+        typst_file, convert_to_mesh=True, image_directory=str(store)
+    )
+    # Leave the stored image behind without users.
+    materials = {
+        slot.material
+        for obj in collection.objects
+        for slot in obj.material_slots
+        if slot.material is not None
+    }
+    bpy.data.batch_remove([*collection.objects, collection, *materials])
+    images = set(bpy.data.images)
+
+    def fail(*_args, **_kwargs):
+        raise RuntimeError("conversion failed")
+
+    monkeypatch.setattr(typst_to_svg, "_convert_to_meshes", fail)
+    with pytest.raises(RuntimeError, match="conversion failed"):
+        typst_to_blender_curves(
+            typst_file, convert_to_mesh=True, image_directory=str(store)
+        )
+
+    assert set(bpy.data.images) == images
+
+
+def test_streamed_images_are_stored_as_hash_references(tmp_path: Path):
+    (tmp_path / "pixel.png").write_bytes(_png_bytes(2, 2))
+    typst_file = tmp_path / "streamed.typ"
+    typst_file.write_text(
+        "#set page(width: auto, height: auto, margin: 0pt, fill: none)\n"
+        '#image("pixel.png", width: 10pt)\n',
+        encoding="utf-8",
+    )
+
+    collection = typst_to_blender_curves(
+        typst_file,
+        convert_to_mesh=False,
+        stream_images=True,
+    )
+
+    plane = next(obj for obj in collection.objects if obj.type == "MESH")
+    texture = next(
+        node
+        for node in plane.data.materials[0].node_tree.nodes
+        if node.bl_idname == "ShaderNodeTexImage"
+    )
+    assert texture.image.packed_file
+    assert "typst-image:" in collection.processed_svg
+    assert "base64" not in collection.processed_svg
+
+    exported = rehydrate_svg_images(collection.processed_svg)
+    images, warnings = extract_svg_images(exported)
+    assert warnings == []
+    assert [info["data"] for info in images] == [
+        bytes(texture.image.packed_file.data)
+    ]
+
+
+def test_streamed_images_that_fail_to_load_stay_embedded(
+    tmp_path: Path, monkeypatch
+):
+    (tmp_path / "broken.png").write_bytes(_png_bytes(3, 5))
+    typst_file = tmp_path / "broken.typ"
+    typst_file.write_text(
+        "#set page(width: auto, height: auto, margin: 0pt, fill: none)\n"
+        '#image("broken.png", width: 10pt)\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        image_import, "_load_packed_image", lambda *_args, **_kwargs: None
+    )
+
+    collection = typst_to_blender_curves(
+        typst_file,
+        convert_to_mesh=False,
+        stream_images=True,
+    )
+
+    assert not any(obj.type == "MESH" for obj in collection.objects)
+    assert "typst-image:" not in collection.processed_svg
+    assert "base64" in collection.processed_svg
@@ -1,7 +1,11 @@
 import bpy
 
+from . import glyph_library, image_proxy, material_registry
 
-# Import the operators from the operators package
+
+# Import the operators from the operators package. They load the Typst
+# compiler and the SVG pipeline (typst, lxml, svg.path) on first use, so
+# registering the add-on stays cheap.
 from .operators.alignment import (
     OBJECT_OT_align_to_active,
     OBJECT_OT_align_collection,
@@ -32,9 +36,13 @@ from .operators.fade import (
     OBJECT_OT_fade_in,
     OBJECT_OT_fade_out,
     OBJECT_OT_fade_in_to_plane,
+    OBJECT_OT_reveal_collection,
 )
 
+from .operators.morph import OBJECT_OT_morph_collections
+
 from .operators.utility import (
+    FILE_OT_merge_typst_node_groups,
     OBJECT_OT_copy_without_keyframes,
 )
 
@@ -51,6 +59,12 @@ from .operators.export_svg import (
     DEFAULT_EXPORT_PATH,
 )
 
+from .operators.images import OBJECT_OT_pack_typst_images
+from .operators.grease_pencil import (
+    OBJECT_OT_bake_grease_pencil_stroke_radius,
+    OBJECT_OT_edit_grease_pencil_stroke_radius,
+)
+
 
 # Global list to store our keymap entries for cleanup.
 addon_keymaps = []
@@ -84,6 +98,49 @@ bpy.types.WindowManager.typst_custom_header = bpy.props.StringProperty(
     default=DEFAULT_CUSTOM_HEADER,
 )
 
+# Register the property for collections
+bpy.types.Collection.processed_svg = bpy.props.StringProperty(
+    name="Processed SVG",
+    description="Processed SVG content from Typst",
+)
+
+# Store the most recently generated processed SVG on the scene for easy export
+bpy.types.Scene.typst_last_processed_svg = bpy.props.StringProperty(
+    name="Last Processed SVG",
+    description="Most recently generated processed SVG from Typst",
+)
+
+# How the visibility tools hide and show objects
+bpy.types.Scene.typst_visibility_backend = bpy.props.EnumProperty(
+    name="Visibility Backend",
+    description="How the visibility and fade tools animate visibility",
+    items=(
+        (
+            "MODIFIER",
+            "Modifier",
+            "Key the input of a Visibility Geometry Nodes modifier",
+        ),
+        (
+            "HIDE",
+            "Hide Keys",
+            "Key Disable in Viewports and Renders; hidden objects cost nothing "
+            "to evaluate",
+        ),
+    ),
+    default="MODIFIER",
+)
+
+# Opacity read by the importer materials.  Declaring it once gives every
+# object's opacity slider its 0-1 limits without per-object UI data.
+bpy.types.Object.opacity = bpy.props.FloatProperty(
+    name="Opacity",
+    description="Opacity of imported Typst objects",
+    default=1.0,
+    min=0.0,
+    max=1.0,
+    step=10,
+)
+
 # Property for SVG export path (default: user's Downloads folder)
 bpy.types.WindowManager.typst_export_filepath = bpy.props.StringProperty(
     name="Export Path",
@@ -206,10 +263,16 @@ class VIEW3D_PT_typst_animation_tools(bpy.types.Panel):
             text="Arc and Follow",
             icon="FORCE_CURVE",
         )
+        box.operator(
+            OBJECT_OT_morph_collections.bl_idname,
+            text="Morph Collections",
+            icon="MOD_SIMPLEDEFORM",
+        )
 
         # Visibility tools
         box = layout.box()
         box.label(text="Visibility")
+        box.prop(context.scene, "typst_visibility_backend", text="")
         row = box.row(align=True)
         row.operator(
             OBJECT_OT_copy_to_plane.bl_idname, text="On to 🌀", icon="HIDE_OFF"
@@ -238,6 +301,11 @@ class VIEW3D_PT_typst_animation_tools(bpy.types.Panel):
             icon="TRIA_RIGHT",
         )
         row.operator(OBJECT_OT_fade_out.bl_idname, text="FadeOut ", icon="TRIA_LEFT")
+        box.operator(
+            OBJECT_OT_reveal_collection.bl_idname,
+            text="Reveal Collection",
+            icon="SEQ_STRIP_DUPLICATE",
+        )
 
         # Arc and path tools
         box = layout.box()
@@ -250,6 +318,25 @@ class VIEW3D_PT_typst_animation_tools(bpy.types.Panel):
             icon="DUPLICATE",
         )
 
+        row = box.row(align=True)
+        row.operator(
+            OBJECT_OT_bake_grease_pencil_stroke_radius.bl_idname,
+            text="Bake GP Radius",
+            icon="GREASEPENCIL",
+        )
+        row.operator(
+            OBJECT_OT_edit_grease_pencil_stroke_radius.bl_idname,
+            text="Edit GP Radius",
+            icon="MODIFIER",
+        )
+
+        row = box.row(align=True)
+        row.operator(
+            FILE_OT_merge_typst_node_groups.bl_idname,
+            text="Merge Node Groups",
+            icon="NODETREE",
+        )
+
 
 # Export panel (appears last in Typst Tools)
 class VIEW3D_PT_typst_export(bpy.types.Panel):
@@ -280,6 +367,16 @@ class VIEW3D_PT_typst_export(bpy.types.Panel):
         else:
             layout.label(text="Import Typst content first", icon="INFO")
 
+        # Only imports with proxies or an image store leave images to pack.
+        if OBJECT_OT_pack_typst_images.poll(context):
+            box = layout.box()
+            box.label(text="Images")
+            box.operator(
+                OBJECT_OT_pack_typst_images.bl_idname,
+                text="Pack Typst Images",
+                icon="PACKAGE",
+            )
+
 
 def menu_func_import(self, context):
     """Add an entry into the File > Import menu."""
@@ -293,6 +390,7 @@ def register():
     bpy.utils.register_class(OBJECT_OT_create_arc)
     bpy.utils.register_class(OBJECT_OT_arc_and_follow)
     bpy.utils.register_class(OBJECT_OT_follow_path)
+    bpy.utils.register_class(OBJECT_OT_morph_collections)
     bpy.utils.register_class(OBJECT_OT_visibility_on)
     bpy.utils.register_class(OBJECT_OT_visibility_off)
     bpy.utils.register_class(OBJECT_OT_join_on_objects_off)
@@ -300,8 +398,12 @@ def register():
     # bpy.utils.register_class(OBJECT_OT_fade_in)
     bpy.utils.register_class(OBJECT_OT_fade_in_to_plane)
     bpy.utils.register_class(OBJECT_OT_fade_out)
+    bpy.utils.register_class(OBJECT_OT_reveal_collection)
     # bpy.utils.register_class(OBJECT_OT_hide_bezier_collection)
     bpy.utils.register_class(OBJECT_OT_copy_without_keyframes)
+    bpy.utils.register_class(OBJECT_OT_bake_grease_pencil_stroke_radius)
+    bpy.utils.register_class(OBJECT_OT_edit_grease_pencil_stroke_radius)
+    bpy.utils.register_class(FILE_OT_merge_typst_node_groups)
     bpy.utils.register_class(ImportTypstOperator)
     bpy.utils.register_class(TXT_FH_import)
     bpy.utils.register_class(VIEW3D_PT_typst_animation_tools)
@@ -313,11 +415,18 @@ def register():
     bpy.utils.register_class(ImportFromTextboxAsUnfilledCurveOperator)
     bpy.utils.register_class(VIEW3D_PT_typst_textbox_import)
     bpy.utils.register_class(ExportTypstSvgOperator)
+    bpy.utils.register_class(OBJECT_OT_pack_typst_images)
     bpy.utils.register_class(VIEW3D_PT_typst_export)
 
     # Add menu entries
     bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
 
+    # Swap proxy image textures to full resolution for final renders
+    image_proxy.register_handlers()
+    # Rebuild the shared material and glyph indexes after loading files or undoing
+    material_registry.register_handlers()
+    glyph_library.register_handlers()
+
     # Set up keyboard shortcuts
     wm = bpy.context.window_manager
     km = wm.keyconfigs.addon.keymaps.new(name="Object Mode", space_type="EMPTY")
@@ -335,12 +444,17 @@ def unregister():
         km.keymap_items.remove(kmi)
     addon_keymaps.clear()
 
+    image_proxy.unregister_handlers()
+    material_registry.unregister_handlers()
+    glyph_library.unregister_handlers()
+
     # Remove menu entries
     # 1. Remove from File > Import menu
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
 
     # Unregister Blender classes in reverse order
     bpy.utils.unregister_class(VIEW3D_PT_typst_export)
+    bpy.utils.unregister_class(OBJECT_OT_pack_typst_images)
     bpy.utils.unregister_class(ExportTypstSvgOperator)
     bpy.utils.unregister_class(VIEW3D_PT_typst_textbox_import)
     bpy.utils.unregister_class(ImportFromTextboxAsUnfilledCurveOperator)
@@ -353,7 +467,11 @@ def unregister():
     bpy.utils.unregister_class(TXT_FH_import)
     bpy.utils.unregister_class(ImportTypstOperator)
     # bpy.utils.unregister_class(OBJECT_OT_hide_bezier_collection)
+    bpy.utils.unregister_class(FILE_OT_merge_typst_node_groups)
+    bpy.utils.unregister_class(OBJECT_OT_edit_grease_pencil_stroke_radius)
+    bpy.utils.unregister_class(OBJECT_OT_bake_grease_pencil_stroke_radius)
     bpy.utils.unregister_class(OBJECT_OT_copy_without_keyframes)
+    bpy.utils.unregister_class(OBJECT_OT_reveal_collection)
     bpy.utils.unregister_class(OBJECT_OT_fade_out)
     bpy.utils.unregister_class(OBJECT_OT_fade_in_to_plane)
     # bpy.utils.unregister_class(OBJECT_OT_fade_in)
@@ -362,6 +480,7 @@ def unregister():
     bpy.utils.unregister_class(OBJECT_OT_visibility_off)
     bpy.utils.unregister_class(OBJECT_OT_visibility_on)
     bpy.utils.unregister_class(OBJECT_OT_arc_and_follow)
+    bpy.utils.unregister_class(OBJECT_OT_morph_collections)
     bpy.utils.unregister_class(OBJECT_OT_follow_path)
     bpy.utils.unregister_class(OBJECT_OT_create_arc)
     bpy.utils.unregister_class(OBJECT_OT_align_collection)
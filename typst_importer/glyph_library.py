@@ -0,0 +1,395 @@
+"""Session-wide library of glyph outlines shared between imports.
+
+Every formula brings its own copy of the same outlines: each "x" or "=" is a
+separate Curve or Mesh datablock.  The library keeps one datablock per
+distinct outline, and objects are pointed at the library datablock instead
+of their own copy.
+
+Outlines are found in two steps.  :func:`glyph_hash` keys an outline by its
+structure only: topology, point counts, handle types and curve settings.
+Within a key, :func:`same_outline` compares the coordinates measured from
+each outline's centre with a tolerance relative to the glyph's size.  Exact
+coordinates cannot be part of the key: glyph data is stored as float32, so
+two copies of a glyph placed a few units apart differ in the last bits, and
+any rounding grid splits some of them into different buckets.
+
+Library data carries its key in the ``typst_glyph_hash`` custom property and
+is held by one master object in the hidden ``Typst Glyph Library``
+collection, which has a fake user so the data survives while no import uses
+it.  As with :mod:`material_registry`, the key-to-data index is built lazily
+and dropped whenever Blender replaces its data.
+
+:func:`save_glyph_library` writes the library to an external .blend file
+with the master objects marked as assets, and :func:`load_glyph_library`
+reads such a file back into the session.
+"""
+
+import hashlib
+
+import bpy
+from bpy.app.handlers import persistent
+
+
+GLYPH_HASH_PROPERTY = "typst_glyph_hash"
+LIBRARY_COLLECTION_NAME = "Typst Glyph Library"
+LIBRARY_OBJECT_PREFIX = "TypstGlyph."
+
+# Largest coordinate difference between two copies of one outline, as a
+# fraction of the outline's size.  Float32 storage error is far below this,
+# and distinct glyphs differ by far more.
+OUTLINE_TOLERANCE = 1e-4
+
+# Structural key -> [(datablock, centred points)].
+_index = None
+
+
+def _array(collection, attribute, width, dtype="float32"):
+    import numpy as np
+
+    values = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attribute, values)
+    return values
+
+
+def _hash_mesh(mesh, digest) -> None:
+    digest.update(b"MESH")
+    digest.update(str(len(mesh.vertices)).encode())
+    digest.update(_array(mesh.edges, "vertices", 2, "int32").tobytes())
+    digest.update(_array(mesh.polygons, "loop_total", 1, "int32").tobytes())
+    digest.update(_array(mesh.polygons, "material_index", 1, "int32").tobytes())
+    digest.update(_array(mesh.loops, "vertex_index", 1, "int32").tobytes())
+
+
+def _hash_curve(curve, digest) -> None:
+    digest.update(b"CURVE")
+    digest.update(
+        repr(
+            (
+                curve.dimensions,
+                curve.fill_mode,
+                curve.resolution_u,
+                curve.bevel_depth,
+                curve.extrude,
+                curve.offset,
+            )
+        ).encode()
+    )
+    for spline in curve.splines:
+        digest.update(
+            repr(
+                (
+                    spline.type,
+                    spline.use_cyclic_u,
+                    spline.resolution_u,
+                    spline.material_index,
+                )
+            ).encode()
+        )
+        if spline.type == "BEZIER":
+            handle_types = [
+                (point.handle_left_type, point.handle_right_type)
+                for point in spline.bezier_points
+            ]
+            digest.update(repr(handle_types).encode())
+        else:
+            digest.update(str(len(spline.points)).encode())
+
+
+def _control_points(data):
+    """Return the vertices or curve control points of ``data`` as rows."""
+    import numpy as np
+
+    if isinstance(data, bpy.types.Mesh):
+        return _array(data.vertices, "co", 3).reshape(-1, 3)
+    chunks = []
+    for spline in data.splines:
+        if spline.type == "BEZIER":
+            chunks.append(_array(spline.bezier_points, "co", 3).reshape(-1, 3))
+        else:
+            chunks.append(_array(spline.points, "co", 4).reshape(-1, 4)[:, :3])
+    return np.concatenate(chunks) if chunks else np.empty((0, 3), np.float32)
+
+
+def glyph_centre(data):
+    """Return the mean of the vertices or control points of a Mesh or Curve.
+
+    Returns ``None`` for data without points.
+    """
+    import numpy as np
+
+    points = _control_points(data)
+    if not len(points):
+        return None
+    return points.mean(axis=0, dtype=np.float64)
+
+
+def glyph_points(data):
+    """Return every coordinate of an outline, measured from its centre.
+
+    Curves include their Bézier handles.  The rows are float64 and in a
+    fixed order, so two outlines with the same :func:`glyph_hash` can be
+    compared row by row.
+    """
+    import numpy as np
+
+    if isinstance(data, bpy.types.Mesh):
+        points = _control_points(data)
+    else:
+        chunks = []
+        for spline in data.splines:
+            if spline.type == "BEZIER":
+                for attribute in ("co", "handle_left", "handle_right"):
+                    chunks.append(
+                        _array(spline.bezier_points, attribute, 3).reshape(-1, 3)
+                    )
+            else:
+                chunks.append(_array(spline.points, "co", 4).reshape(-1, 4)[:, :3])
+        points = np.concatenate(chunks) if chunks else np.empty((0, 3))
+    points = points.astype(np.float64)
+    centre = glyph_centre(data)
+    if centre is not None:
+        points -= centre
+    return points
+
+
+def same_outline(points, other) -> bool:
+    """Return whether two :func:`glyph_points` arrays show the same outline."""
+    import numpy as np
+
+    if points.shape != other.shape:
+        return False
+    if not len(points):
+        return True
+    size = float(np.ptp(points, axis=0).max())
+    return float(np.abs(points - other).max()) <= OUTLINE_TOLERANCE * size
+
+
+def glyph_hash(data) -> str:
+    """Return the structural key of a Mesh or Curve datablock.
+
+    The key covers topology, point counts, material indices and the curve
+    settings that affect its shape, but neither coordinates nor the
+    materials themselves.  Outlines sharing a key are told apart with
+    :func:`same_outline`.
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, bpy.types.Mesh):
+        _hash_mesh(data, digest)
+    else:
+        _hash_curve(data, digest)
+    digest.update(str(len(data.materials)).encode())
+    return digest.hexdigest()
+
+
+def library_collection() -> bpy.types.Collection:
+    """Return the hidden collection holding the library's master objects."""
+    collection = bpy.data.collections.get(LIBRARY_COLLECTION_NAME)
+    if collection is None or collection.library is not None:
+        collection = bpy.data.collections.new(LIBRARY_COLLECTION_NAME)
+        collection.use_fake_user = True
+    return collection
+
+
+def _build_index():
+    index = {}
+    for datablocks in (bpy.data.meshes, bpy.data.curves):
+        for data in datablocks:
+            key = data.get(GLYPH_HASH_PROPERTY)
+            if key:
+                index.setdefault(key, []).append((data, glyph_points(data)))
+    return index
+
+
+def _entries(key) -> list:
+    """Return the ``(datablock, points)`` library entries under ``key``."""
+    global _index
+    if _index is None:
+        _index = _build_index()
+    entries = _index.get(key, [])
+    try:
+        if all(data.get(GLYPH_HASH_PROPERTY) == key for data, _points in entries):
+            return entries
+    except ReferenceError:
+        # A datablock was removed since the index was built.
+        pass
+    _index = _build_index()
+    return _index.get(key, [])
+
+
+def lookup_glyph(key, points):
+    """Return the library datablock with the outline ``points``, or ``None``.
+
+    Args:
+        key: The :func:`glyph_hash` of the outline.
+        points: The :func:`glyph_points` of the outline.
+    """
+    for data, library_points in _entries(key):
+        if same_outline(library_points, points):
+            return data
+    return None
+
+
+def register_glyph(data, key, points=None) -> bpy.types.Object:
+    """Add ``data`` to the library under ``key`` and return its master object.
+
+    Material slots of library data are cleared; glyph objects carry their
+    colour in object-linked slots instead.
+    """
+    if points is None:
+        points = glyph_points(data)
+    entries = _entries(key)
+    data[GLYPH_HASH_PROPERTY] = key
+    data.name = f"{LIBRARY_OBJECT_PREFIX}{key[:12]}"
+    for index in range(len(data.materials)):
+        data.materials[index] = None
+    master = bpy.data.objects.new(data.name, data)
+    library_collection().objects.link(master)
+    entries.append((data, points))
+    _index[key] = entries
+    return master
+
+
+def use_object_material_slots(obj: bpy.types.Object) -> None:
+    """Move an object's materials from its data to object-linked slots."""
+    for slot in obj.material_slots:
+        if slot.link == "OBJECT":
+            continue
+        material = slot.material
+        slot.link = "OBJECT"
+        slot.material = material
+
+
+def adopt_glyphs(objects, journal=None) -> tuple:
+    """Point each centred glyph object at shared library data.
+
+    Objects must already have their origin at :func:`glyph_centre`.
+    Unshared data that matches a library entry is removed; new outlines are
+    added to the library.  Created master objects are recorded in
+    ``journal["objects"]`` when a journal is given.
+
+    Returns:
+        tuple: ``(reused, total)`` glyph counts.
+    """
+    reused = 0
+    total = 0
+    replaced = []
+    for obj in objects:
+        data = obj.data
+        if obj.type not in {"MESH", "CURVE"} or data is None:
+            continue
+        total += 1
+        key = data.get(GLYPH_HASH_PROPERTY)
+        if key is not None and any(entry == data for entry, _points in _entries(key)):
+            reused += 1
+            continue
+        key = glyph_hash(data)
+        points = glyph_points(data)
+        use_object_material_slots(obj)
+        shared = lookup_glyph(key, points)
+        if shared is None:
+            master = register_glyph(data, key, points)
+            if journal is not None:
+                journal["objects"].add(master)
+            continue
+        obj.data = shared
+        replaced.append(data)
+        reused += 1
+    bpy.data.batch_remove([data for data in replaced if data.users == 0])
+    return reused, total
+
+
+def save_glyph_library(filepath) -> int:
+    """Write the glyph library to a .blend file usable as an asset library.
+
+    Returns:
+        int: The number of glyphs written.
+    """
+    collection = bpy.data.collections.get(LIBRARY_COLLECTION_NAME)
+    if collection is None or not collection.objects:
+        return 0
+    masters = list(collection.objects)
+    marked = []
+    for obj in masters:
+        if obj.asset_data is None:
+            obj.asset_mark()
+            marked.append(obj)
+    try:
+        bpy.data.libraries.write(str(filepath), {collection}, fake_user=True)
+    finally:
+        # The marks only belong in the written file.
+        for obj in marked:
+            obj.asset_clear()
+    return len(masters)
+
+
+def load_glyph_library(filepath, link: bool = False) -> int:
+    """Add the glyphs of a library .blend file to this session's library.
+
+    Glyphs whose outline is already known are skipped.  With ``link`` the
+    data stays in the external file and is read-only here.
+
+    Returns:
+        int: The number of glyphs added.
+    """
+    global _index
+    # Index the session's glyphs before the file's glyphs join bpy.data.
+    if _index is None:
+        _index = _build_index()
+    with bpy.data.libraries.load(str(filepath), link=link) as (data_from, data_to):
+        data_to.objects = [
+            name for name in data_from.objects if name.startswith(LIBRARY_OBJECT_PREFIX)
+        ]
+
+    collection = library_collection()
+    added = 0
+    duplicates = []
+    for obj in data_to.objects:
+        if obj is None:
+            continue
+        key = obj.data.get(GLYPH_HASH_PROPERTY) if obj.data is not None else None
+        if key is None:
+            duplicates.append(obj)
+            continue
+        points = glyph_points(obj.data)
+        if lookup_glyph(key, points) not in {None, obj.data}:
+            duplicates.append(obj)
+            continue
+        entries = _entries(key)
+        if all(data != obj.data for data, _points in entries):
+            entries.append((obj.data, points))
+            _index[key] = entries
+        if collection not in obj.users_collection:
+            collection.objects.link(obj)
+        added += 1
+    if not link:
+        data = [obj.data for obj in duplicates if obj.data is not None]
+        bpy.data.batch_remove(duplicates)
+        bpy.data.batch_remove([item for item in data if item.users == 0])
+    return added
+
+
+@persistent
+def clear_index(*_args):
+    """Forget the index after Blender swaps out its data."""
+    global _index
+    _index = None
+
+
+_HANDLERS = (
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
+
+
+def register_handlers():
+    for handlers in _HANDLERS:
+        if clear_index not in handlers:
+            handlers.append(clear_index)
+
+
+def unregister_handlers():
+    for handlers in _HANDLERS:
+        if clear_index in handlers:
+            handlers.remove(clear_index)
+    clear_index()
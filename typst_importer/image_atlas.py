@@ -0,0 +1,237 @@
+"""Pack small raster images into shared atlas textures.
+
+Documents full of emoji or icons otherwise produce one image datablock, one
+material, and one draw batch per distinct bitmap.  The atlas stage runs after
+:func:`~.image_import.prepare_svg_images`: every distinct image below a size
+threshold is copied into a shared texture, and each of its placements records
+the sub-rectangle that :func:`~.image_import.create_image_planes` maps the
+plane UVs into.  All placements on one atlas then share a single material.
+"""
+
+import hashlib
+import struct
+
+from .image_store import image_file, image_header, image_key
+
+
+# Images whose larger side exceeds this many pixels keep their own texture.
+ATLAS_MAX_IMAGE_SIZE = 256
+ATLAS_SIZE = 2048
+# Edge pixels are repeated into the padding so linear filtering at a
+# sub-image border never samples its neighbour.
+ATLAS_PADDING = 2
+
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+}
+
+
+def image_dimensions(data):
+    """Return ``(width, height)`` from a PNG, GIF, JPEG, or BMP header.
+
+    Reading the header keeps large images from being decoded only to learn
+    that they are too big for an atlas.  Unknown formats return ``None``.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:4] == b"GIF8" and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:2] == b"BM" and len(data) >= 26:
+        width, height = struct.unpack("<ii", data[18:26])
+        return abs(width), abs(height)
+    if data[:2] == b"\xff\xd8":
+        index = 2
+        while index + 9 <= len(data):
+            if data[index] != 0xFF:
+                return None
+            marker = data[index + 1]
+            if marker == 0xFF:
+                index += 1
+                continue
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack(">HH", data[index + 5 : index + 9])
+                return width, height
+            length = struct.unpack(">H", data[index + 2 : index + 4])[0]
+            index += 2 + length
+    return None
+
+
+def pack_rectangles(sizes, bin_size=ATLAS_SIZE, padding=ATLAS_PADDING):
+    """Shelf-pack ``(width, height)`` rectangles into square bins.
+
+    Rectangles are placed tallest first; each goes onto the first shelf with
+    room, then onto a new shelf, then into a new bin.  Returns one
+    ``(bin_index, x, y)`` content origin per input size (``None`` when a
+    rectangle cannot fit an empty bin) and the used ``(width, height)`` of
+    every bin.
+    """
+    placements = [None] * len(sizes)
+    bins = []  # [shelves, used_width, used_height]; shelf = [y, height, x]
+    order = sorted(
+        range(len(sizes)), key=lambda index: (-sizes[index][1], -sizes[index][0])
+    )
+    for index in order:
+        width = sizes[index][0] + 2 * padding
+        height = sizes[index][1] + 2 * padding
+        if width > bin_size or height > bin_size:
+            continue
+
+        placed = None
+        for bin_index, atlas in enumerate(bins):
+            shelves = atlas[0]
+            for shelf in shelves:
+                if shelf[2] + width <= bin_size and height <= shelf[1]:
+                    placed = bin_index, shelf
+                    break
+            if placed is None:
+                top = shelves[-1][0] + shelves[-1][1] if shelves else 0
+                if top + height <= bin_size:
+                    shelf = [top, height, 0]
+                    shelves.append(shelf)
+                    placed = bin_index, shelf
+            if placed is not None:
+                break
+        if placed is None:
+            shelf = [0, height, 0]
+            bins.append([[shelf], 0, 0])
+            placed = len(bins) - 1, shelf
+
+        bin_index, shelf = placed
+        placements[index] = (bin_index, shelf[2] + padding, shelf[0] + padding)
+        shelf[2] += width
+        atlas = bins[bin_index]
+        atlas[1] = max(atlas[1], shelf[2])
+        atlas[2] = max(atlas[2], shelf[0] + shelf[1])
+
+    return placements, [(atlas[1], atlas[2]) for atlas in bins]
+
+
+def _decode_pixels(info, warnings):
+    """Return straight RGBA float pixels (bottom row first) for one image."""
+    import bpy
+    import numpy as np
+
+    image = None
+    try:
+        with image_file(info) as path:
+            image = bpy.data.images.load(path, check_existing=False)
+            width, height = image.size
+            channels = image.channels
+            if image.is_float or width <= 0 or height <= 0 or channels not in (3, 4):
+                return None
+            pixels = np.empty(width * height * channels, dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+    except (OSError, RuntimeError) as exc:
+        warnings.append(f"Could not load image {info['name']}: {exc}")
+        return None
+    finally:
+        if image is not None:
+            bpy.data.images.remove(image)
+
+    pixels = pixels.reshape(height, width, channels)
+    if channels == 3:
+        alpha = np.ones((height, width, 1), dtype=np.float32)
+        pixels = np.concatenate((pixels, alpha), axis=2)
+    return pixels
+
+
+def build_image_atlases(
+    images,
+    warnings=None,
+    max_image_size=ATLAS_MAX_IMAGE_SIZE,
+    atlas_size=ATLAS_SIZE,
+    padding=ATLAS_PADDING,
+):
+    """Pack small extracted images into shared, packed atlas textures.
+
+    Every placement of an image that was packed gains an ``"atlas"`` entry
+    holding the atlas image, the normalised ``(u0, v0, u1, v1)`` sub-rectangle,
+    and the source pixel size.  Placements of other images are left alone and
+    keep their own texture.  Returns the created atlas images.
+    """
+    import bpy
+    import numpy as np
+
+    warnings = warnings if warnings is not None else []
+    placements_by_key = {}
+    for info in images:
+        size = image_dimensions(image_header(info))
+        if size is None or max(size) > max_image_size or min(size) <= 0:
+            continue
+        key = image_key(info)
+        placements_by_key.setdefault(key, []).append(info)
+    # A single small image gains nothing from an atlas.
+    if len(placements_by_key) < 2:
+        return []
+
+    keys = []
+    pixels = []
+    for key, infos in placements_by_key.items():
+        decoded = _decode_pixels(infos[0], warnings)
+        if decoded is not None:
+            keys.append(key)
+            pixels.append(decoded)
+    if len(keys) < 2:
+        return []
+
+    sizes = [(image.shape[1], image.shape[0]) for image in pixels]
+    origins, bin_sizes = pack_rectangles(sizes, atlas_size, padding)
+
+    atlases = []
+    for bin_index, (width, height) in enumerate(bin_sizes):
+        members = [
+            index
+            for index, origin in enumerate(origins)
+            if origin is not None and origin[0] == bin_index
+        ]
+        if len(members) < 2:
+            continue
+
+        buffer = np.zeros((height, width, 4), dtype=np.float32)
+        for index in members:
+            _bin, x, y = origins[index]
+            padded = np.pad(
+                pixels[index],
+                ((padding, padding), (padding, padding), (0, 0)),
+                mode="edge",
+            )
+            buffer[
+                y - padding : y - padding + padded.shape[0],
+                x - padding : x - padding + padded.shape[1],
+            ] = padded
+
+        atlas = bpy.data.images.new(
+            f"TypstAtlas{len(atlases) + 1}", width, height, alpha=True
+        )
+        atlas.pixels.foreach_set(buffer.ravel())
+        atlas.pack()
+        atlas["typst_svg_source_hash"] = hashlib.sha256(
+            "".join(sorted(keys[index] for index in members)).encode("ascii")
+        ).hexdigest()
+        atlas["typst_svg_atlas"] = True
+        atlases.append(atlas)
+
+        for index in members:
+            _bin, x, y = origins[index]
+            image_w, image_h = sizes[index]
+            entry = {
+                "image": atlas,
+                "rect": (
+                    x / width,
+                    y / height,
+                    (x + image_w) / width,
+                    (y + image_h) / height,
+                ),
+                "size": (image_w, image_h),
+            }
+            for info in placements_by_key[keys[index]]:
+                info["atlas"] = entry
+
+    return atlases
+
+
+def atlas_uvs(uvs, rect):
+    """Map per-vertex image UVs into an atlas sub-rectangle."""
+    u0, v0, u1, v1 = rect
+    return [(u0 + u * (u1 - u0), v0 + v * (v1 - v0)) for u, v in uvs]
@@ -10,10 +10,8 @@ collection order and preserve the SVG painter model.
 
 import base64
 import hashlib
-import math
-import os
+import html
 import re
-import tempfile
 import urllib.parse
 import urllib.request
 import uuid
@@ -21,24 +19,35 @@ from pathlib import Path
 
 from lxml import etree
 
-from .svg_preprocessing import NS_MAP, SVG_NS, parse_svg_string
+from .image_atlas import atlas_uvs
+from .image_store import (
+    ImagePayload,
+    image_file,
+    image_key,
+    release_image,
+    store_image,
+)
+from .svg_preprocessing import _ensure_unicode, parse_svg_string
+from .svg_utils import (
+    NS_MAP,
+    ROOT_PARENT_STATE,
+    SKIP_TAGS,
+    element_state,
+    mat_apply,
+    mat_inverse,
+    mat_mul,
+    mat_scale,
+    mat_translate,
+    parse_coord,
+    parse_transform,
+    style_property,
+    svg_tag,
+    svg_viewport_matrix,
+)
 
 
 XLINK_HREF = f"{{{NS_MAP['xlink']}}}href"
 
-# Same unit table as io_curve_svg (90 dpi user units).
-SVG_UNITS = {
-    "": 1.0,
-    "px": 1.0,
-    "in": 90.0,
-    "mm": 90.0 / 25.4,
-    "cm": 90.0 / 2.54,
-    "pt": 1.25,
-    "pc": 15.0,
-    "em": 1.0,
-    "ex": 1.0,
-}
-
 # io_curve_svg maps 90 SVG user units to 1 inch (0.0254 m), Y pointing down.
 BLENDER_SCALE = 1.0 / 90.0 * 0.3048 / 12.0
 
@@ -52,12 +61,19 @@ MAX_TOTAL_IMAGE_BYTES = 512 * 1024 * 1024
 MAX_IMAGE_PLACEMENTS = 10_000
 MAX_SVG_TRAVERSAL_DEPTH = 256
 
-_FLOAT_RE = re.compile(r"[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?")
-_TRANSFORM_RE = re.compile(r"\s*([A-Za-z]+)\s*\((.*?)\)")
 _DATA_URI_RE = re.compile(
     r"data:(?P<mime>[^;,]*)(?P<params>(?:;[^;,]*)*),(?P<data>.*)",
     re.DOTALL | re.IGNORECASE,
 )
+# Cheap textual test that lets image-free documents skip parsing entirely.
+_IMAGE_TAG_RE = re.compile(r"<(?:[\w.-]+:)?image[\s/>]")
+_DATA_HREF_RE = re.compile(
+    r"""(\b(?:xlink:)?href\s*=\s*)(["'])(data:[^"']*)\2""", re.IGNORECASE
+)
+_IMAGE_REFERENCE_RE = re.compile(
+    r"""(\b(?:xlink:)?href\s*=\s*)(["'])"""
+    r"""typst-image:(?P<key>[0-9a-f]{64})(?P<ext>\.[A-Za-z0-9]+)\2"""
+)
 _WINDOWS_PATH_RE = re.compile(r"^(?:[A-Za-z]:[\\/]|\\\\)")
 _BLENDER_SUFFIX_RE = re.compile(r"^(.*)\.\d{3}$")
 
@@ -73,108 +89,6 @@ _MIME_EXTENSIONS = {
 }
 
 
-# --- 2D affine matrices, stored as (a, b, c, d, e, f) like SVG matrix():
-#     x' = a*x + c*y + e
-#     y' = b*x + d*y + f
-
-MAT_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
-
-
-def mat_mul(m, n):
-    """Return matrix product ``m @ n`` (``n`` is applied first)."""
-    a1, b1, c1, d1, e1, f1 = m
-    a2, b2, c2, d2, e2, f2 = n
-    return (
-        a1 * a2 + c1 * b2,
-        b1 * a2 + d1 * b2,
-        a1 * c2 + c1 * d2,
-        b1 * c2 + d1 * d2,
-        a1 * e2 + c1 * f2 + e1,
-        b1 * e2 + d1 * f2 + f1,
-    )
-
-
-def mat_apply(m, point):
-    a, b, c, d, e, f = m
-    x, y = point
-    return (a * x + c * y + e, b * x + d * y + f)
-
-
-def mat_translate(tx, ty):
-    return (1.0, 0.0, 0.0, 1.0, tx, ty)
-
-
-def mat_scale(sx, sy):
-    return (sx, 0.0, 0.0, sy, 0.0, 0.0)
-
-
-def parse_transform(transform):
-    """Parse an SVG transform list into a single affine matrix."""
-    m = MAT_IDENTITY
-    for match in _TRANSFORM_RE.finditer(transform):
-        func = match.group(1)
-        params = [float(p) for p in _FLOAT_RE.findall(match.group(2))]
-        if func == "matrix" and len(params) == 6:
-            t = tuple(params)
-        elif func == "translate" and params:
-            t = mat_translate(params[0], params[1] if len(params) > 1 else 0.0)
-        elif func == "scale" and params:
-            t = mat_scale(params[0], params[1] if len(params) > 1 else params[0])
-        elif func == "rotate" and params:
-            angle = math.radians(params[0])
-            rotation = (
-                math.cos(angle),
-                math.sin(angle),
-                -math.sin(angle),
-                math.cos(angle),
-                0.0,
-                0.0,
-            )
-            if len(params) >= 3:
-                cx, cy = params[1], params[2]
-                t = mat_mul(
-                    mat_mul(mat_translate(cx, cy), rotation),
-                    mat_translate(-cx, -cy),
-                )
-            else:
-                t = rotation
-        elif func == "skewX" and params:
-            t = (
-                1.0,
-                0.0,
-                math.tan(math.radians(params[0])),
-                1.0,
-                0.0,
-                0.0,
-            )
-        elif func == "skewY" and params:
-            t = (
-                1.0,
-                math.tan(math.radians(params[0])),
-                0.0,
-                1.0,
-                0.0,
-                0.0,
-            )
-        else:
-            continue
-        m = mat_mul(m, t)
-    return m
-
-
-def parse_coord(coord, size=0.0):
-    """Parse an SVG coordinate or length against the active viewport size."""
-    coord = coord.strip()
-    match = _FLOAT_RE.match(coord)
-    if not match:
-        return 0.0
-    value = float(match.group(0))
-    unit = coord[match.end() :].strip()
-    if unit == "%":
-        return float(size) / 100.0 * value
-    return value * SVG_UNITS.get(unit, 1.0)
-
-
 def _parse_image_length(value, size):
     """Return a used image length, or ``None`` for SVG 2 ``auto``."""
     if value is None or value.strip().lower() == "auto":
@@ -182,67 +96,52 @@ def _parse_image_length(value, size):
     return parse_coord(value, size)
 
 
-def _parse_viewbox(el):
-    raw = el.get("viewBox")
-    if not raw:
-        return None
-    values = [float(part) for part in _FLOAT_RE.findall(raw)]
-    if len(values) != 4:
-        return None
-    return tuple(values)
-
-
-def _svg_viewport_matrix(el, parent_rect, nested, scene_scale_length=1.0):
-    """Replicate Blender io_curve_svg's SVG viewport matrix and child rect."""
-    parent_w, parent_h = parent_rect
-    x = parse_coord(el.get("x", "0"), parent_w)
-    y = parse_coord(el.get("y", "0"), parent_h)
-    width_attr = el.get("width")
-    height_attr = el.get("height")
-    width = parse_coord(width_attr, parent_w) if width_attr else parent_w
-    height = parse_coord(height_attr, parent_h) if height_attr else parent_h
-
-    matrix = mat_translate(x, y)
-    if nested and parent_w != 0 and parent_h != 0:
-        matrix = mat_mul(matrix, mat_scale(width / parent_w, height / parent_h))
-
-    viewbox = _parse_viewbox(el)
-    if viewbox is not None:
-        vx, vy, vw, vh = viewbox
-        if vw != 0 and vh != 0:
-            if nested or (width != 0 and height != 0):
-                scale = min(width / vw, height / vh)
-            else:
-                scale = 1.0
-                width, height = vw, vh
-            tx = (width - vw * scale) / 2.0
-            ty = (height - vh * scale) / 2.0
-            matrix = mat_mul(matrix, mat_translate(tx, ty))
-            matrix = mat_mul(matrix, mat_translate(-vx, -vy))
-            matrix = mat_mul(matrix, mat_scale(scale, scale))
-
-        unit = ""
-        if height_attr:
-            match = _FLOAT_RE.match(height_attr.strip())
-            if match:
-                unit = height_attr.strip()[match.end() :].strip()
-        if unit in ("cm", "mm", "in", "pt", "pc"):
-            unitscale = SVG_UNITS[unit] / 90.0 * 1000.0 / 39.3701
-            unitscale /= scene_scale_length or 1.0
-            matrix = mat_mul(matrix, mat_scale(unitscale, unitscale))
-
-        # This is a Blender importer convention, including for nested SVGs.
-        matrix = mat_mul(matrix, mat_translate(0.0, -vy - vh))
-        child_rect = (vw, vh)
-    else:
-        child_rect = (width, height)
+_ROOT_START_TAG_RE = re.compile(r"""<svg\b(?:[^>"']|"[^"]*"|'[^']*')*>""")
 
-    return matrix, child_rect
+
+def fold_svg_scale(svg_content, scale_factor, scene_scale_length=1.0):
+    """Fold ``scale_factor`` into the SVG root and report whether it worked.
+
+    Blender maps SVG coordinates through the root viewport matrix ``M``.  A
+    group with transform ``M^-1 S M`` around the root's children therefore
+    scales the imported geometry about the Blender origin, exactly like
+    transforming every curve afterwards, without a pass over the curve data.
+    Only the root start tag is parsed; the rest of the text is untouched.
+
+    Returns:
+        tuple: ``(svg, folded)``.  ``folded`` is False when the root element
+        cannot be parsed or its viewport matrix is singular; the SVG is then
+        returned unscaled and the caller has to scale the imported geometry.
+    """
+    svg_content = _ensure_unicode(svg_content)
+    if scale_factor == 1:
+        return svg_content, True
+    match = _ROOT_START_TAG_RE.search(svg_content)
+    end = svg_content.rfind("</svg>")
+    if match is None or match.group(0).endswith("/>") or end < match.end():
+        return svg_content, False
+    try:
+        root = etree.fromstring(match.group(0) + "</svg>")
+        matrix, _rect = svg_viewport_matrix(
+            root, (0.0, 0.0), nested=False, scene_scale_length=scene_scale_length
+        )
+        wrapper = mat_mul(
+            mat_inverse(matrix),
+            mat_mul(mat_scale(scale_factor, scale_factor), matrix),
+        )
+    except (etree.XMLSyntaxError, ValueError):
+        return svg_content, False
+    values = " ".join(repr(float(value)) for value in wrapper)
+    return (
+        f"{svg_content[: match.end()]}<g transform=\"matrix({values})\">"
+        f"{svg_content[match.end() : end]}</g>{svg_content[end:]}",
+        True,
+    )
 
 
 def _root_matrix(root, scene_scale_length=1.0):
     """Compatibility wrapper returning the root viewport matrix."""
-    matrix, _rect = _svg_viewport_matrix(
+    matrix, _rect = svg_viewport_matrix(
         root, (0.0, 0.0), nested=False, scene_scale_length=scene_scale_length
     )
     return matrix
@@ -253,92 +152,15 @@ def _warn_once(warnings, message):
         warnings.append(message)
 
 
-def _style_map(el):
-    declarations = {}
-    for declaration in (el.get("style") or "").split(";"):
-        if ":" not in declaration:
-            continue
-        key, value = declaration.split(":", 1)
-        important_match = re.search(
-            r"\s*!\s*important\s*$", value, flags=re.IGNORECASE
-        )
-        important = important_match is not None
-        if important_match:
-            value = value[: important_match.start()]
-        key = key.strip().lower()
-        previous = declarations.get(key)
-        if previous is None or important or not previous[1]:
-            declarations[key] = (value.strip(), important)
-    return {key: value for key, (value, _important) in declarations.items()}
-
-
-def _property(el, styles, name):
-    return styles.get(name, el.get(name))
-
-
-def _parse_opacity(value):
-    if value is None or value.strip().lower() == "inherit":
-        return 1.0
-    raw = value.strip()
-    try:
-        parsed = float(raw[:-1]) / 100.0 if raw.endswith("%") else float(raw)
-    except ValueError:
-        return 1.0
-    return max(0.0, min(1.0, parsed))
-
-
-def _element_state(el, parent_state):
-    styles = _style_map(el)
-    display_value = (_property(el, styles, "display") or "inline").strip().lower()
-    if display_value == "inherit":
-        display = parent_state["display"]
-    elif display_value in {"initial", "unset", "revert", "revert-layer"}:
-        display = "inline"
-    else:
-        display = display_value
-    if not parent_state["displayed"] or display == "none":
-        return None
-
-    visibility_value = _property(el, styles, "visibility")
-    visibility = parent_state["visibility"]
-    if visibility_value:
-        visibility_value = visibility_value.strip().lower()
-        if visibility_value in {"initial", "revert", "revert-layer"}:
-            visibility = "visible"
-        elif visibility_value not in {"inherit", "unset"}:
-            visibility = visibility_value
-
-    opacity_value = _property(el, styles, "opacity")
-    if opacity_value:
-        opacity_value = opacity_value.strip().lower()
-    if opacity_value == "inherit":
-        local_opacity = parent_state["local_opacity"]
-    elif opacity_value in {"initial", "unset", "revert", "revert-layer"}:
-        local_opacity = 1.0
-    else:
-        local_opacity = _parse_opacity(opacity_value)
-    opacity = parent_state["opacity"] * local_opacity
-    effects = set(parent_state["effects"])
-    for name in ("clip-path", "mask", "filter"):
-        value = _property(el, styles, name)
-        if value and value.strip().lower() != "none":
-            effects.add(name)
-
+def _resource_state(spill_directory=None):
     return {
-        "displayed": True,
-        "display": display,
-        "visibility": visibility,
-        "opacity": opacity,
-        "local_opacity": local_opacity,
-        "effects": frozenset(effects),
-        "styles": styles,
+        "items": {},
+        "total_bytes": 0,
+        "placements": 0,
+        "spill_directory": spill_directory,
     }
 
 
-def _resource_state():
-    return {"items": {}, "total_bytes": 0, "placements": 0}
-
-
 def _cache_resource(state, key, value):
     state["items"][key] = value
     return value
@@ -398,7 +220,11 @@ def _decode_href(
     resources=None,
     allow_external_outside_svg=False,
 ):
-    """Return decoded ``(bytes, extension)`` with caching and safety limits."""
+    """Return decoded ``(bytes, extension)`` with caching and safety limits.
+
+    With a spill directory in ``resources`` the bytes are written to disk at
+    once and an :class:`~.image_store.ImagePayload` is returned in their place.
+    """
     resources = resources or _resource_state()
     href = href.strip()
     if href in resources["items"]:
@@ -451,6 +277,14 @@ def _decode_href(
         return _cache_resource(resources, href, (None, None))
 
     resources["total_bytes"] += len(data)
+    if resources["spill_directory"] is not None:
+        try:
+            data = ImagePayload.spill(
+                data, extension, resources["spill_directory"]
+            )
+        except OSError as exc:
+            # Keep the bytes inline rather than losing the image.
+            _warn_once(warnings, f"Could not spill image data to disk: {exc}")
     return _cache_resource(resources, href, (data, extension))
 
 
@@ -466,7 +300,7 @@ def _emit_image(
     allow_external_outside_svg,
     marker_id=None,
 ):
-    if state["visibility"] in {"hidden", "collapse"} or state["opacity"] <= 0:
+    if state.visibility in {"hidden", "collapse"} or state.opacity <= 0:
         return None
     # SVG 2 plain href takes precedence when both forms are present.
     href = el.get("href")
@@ -485,16 +319,16 @@ def _emit_image(
     if data is None:
         return None
 
-    styles = state["styles"]
+    styles = state.styles
     viewport_w, viewport_h = viewport
-    width = _parse_image_length(_property(el, styles, "width"), viewport_w)
-    height = _parse_image_length(_property(el, styles, "height"), viewport_h)
+    width = _parse_image_length(style_property(el, styles, "width"), viewport_w)
+    height = _parse_image_length(style_property(el, styles, "height"), viewport_h)
     if (width is not None and width <= 0) or (height is not None and height <= 0):
         return None
-    x = parse_coord(_property(el, styles, "x") or "0", viewport_w)
-    y = parse_coord(_property(el, styles, "y") or "0", viewport_h)
+    x = parse_coord(style_property(el, styles, "x") or "0", viewport_w)
+    y = parse_coord(style_property(el, styles, "y") or "0", viewport_h)
 
-    if state["effects"]:
+    if state.effects:
         _warn_once(
             warnings,
             "Image clipping, masking, and filters are not currently imported",
@@ -512,44 +346,76 @@ def _emit_image(
             )
         ]
 
+    payload = data if isinstance(data, ImagePayload) else None
     info = {
         "name": el.get("id") or f"Image{len(images) + 1}",
-        "data": data,
+        "data": None if payload is not None else data,
+        "payload": payload,
         "ext": extension,
         "rect": (x, y, width, height),
         "matrix": ctm,
         "corners": corners,
         "preserve_aspect_ratio": el.get("preserveAspectRatio")
         or "xMidYMid meet",
-        "opacity": state["opacity"],
+        "opacity": state.opacity,
         "marker_id": marker_id,
     }
     images.append(info)
     return info
 
 
-# Definition-only and otherwise non-rendered containers.
-_SKIP_TAGS = {
-    "defs",
-    "symbol",
-    "clipPath",
-    "mask",
-    "marker",
-    "pattern",
-    "switch",
-    "foreignObject",
-    "style",
-    "script",
-    "metadata",
-}
+def _use_target(el, ids):
+    href = el.get("href")
+    if href is None:
+        href = el.get(XLINK_HREF)
+    if not href or not href.startswith("#"):
+        return None
+    return ids.get(href[1:])
+
+
+def _image_bearing_elements(root, ids, image_elements, use_elements):
+    """Return every element whose rendering can reach an ``<image>``.
+
+    An element qualifies when it is an image, has one below it, or is a
+    ``<use>`` whose target qualifies.  ``<use>`` chains are resolved to a
+    fixpoint, so the walker can skip everything else without evaluating its
+    style.
+    """
+    bearing = set()
+
+    def mark(el):
+        while el is not None and el not in bearing:
+            bearing.add(el)
+            el = el.getparent()
+
+    for el in image_elements:
+        mark(el)
+    pending = [
+        (el, target)
+        for el in use_elements
+        if (target := _use_target(el, ids)) is not None
+    ]
+    changed = True
+    while changed and pending:
+        changed = False
+        remaining = []
+        for el, target in pending:
+            if target in bearing:
+                mark(el)
+                changed = True
+            else:
+                remaining.append((el, target))
+        pending = remaining
+    return bearing
 
 
 def _walk(
-    el,
+    root,
     ctm,
     viewport,
-    parent_state,
+    root_state,
     ids,
+    bearing,
     images,
     warnings,
     svg_dir,
@@ -557,123 +423,87 @@ def _walk(
     allow_external_outside_svg,
     scene_scale_length,
     marker_callback=None,
-    depth=0,
 ):
-    if depth > MAX_SVG_TRAVERSAL_DEPTH:
-        _warn_once(warnings, "Skipped SVG content beyond the traversal depth limit")
-        return
-    if not isinstance(el.tag, str):
-        return
-    qname = etree.QName(el.tag)
-    if qname.namespace not in (None, SVG_NS):
-        return
-    tag = qname.localname
-    if tag in _SKIP_TAGS:
-        return
-
-    state = _element_state(el, parent_state)
-    if state is None:
-        return
-
-    transform = el.get("transform")
-    if transform:
-        ctm = mat_mul(ctm, parse_transform(transform))
-
-    if tag == "svg":
-        viewport_matrix, viewport = _svg_viewport_matrix(
-            el,
-            viewport,
-            nested=True,
-            scene_scale_length=scene_scale_length,
-        )
-        ctm = mat_mul(ctm, viewport_matrix)
-
-    if tag == "image":
-        if resources["placements"] >= MAX_IMAGE_PLACEMENTS:
-            _warn_once(warnings, "Skipped images after reaching the placement limit")
-            return
-        resources["placements"] += 1
-        marker_id = marker_callback(el) if marker_callback else None
-        _emit_image(
-            el,
-            ctm,
-            viewport,
-            state,
-            images,
-            warnings,
-            svg_dir,
-            resources,
-            allow_external_outside_svg,
-            marker_id,
-        )
-        return
-
-    if tag == "use":
-        href = el.get("href")
-        if href is None:
-            href = el.get(XLINK_HREF)
-        if not href or not href.startswith("#"):
-            return
-        target = ids.get(href[1:])
-        if target is None:
-            return
-        x = parse_coord(el.get("x", "0"), viewport[0])
-        y = parse_coord(el.get("y", "0"), viewport[1])
-        ctm = mat_mul(ctm, mat_translate(x, y))
-        target_tag = etree.QName(target.tag).localname
-        if target_tag in {"symbol", "svg"}:
-            # Match flatten_svg: these containers contribute their children.
-            for child in list(target):
-                _walk(
-                    child,
-                    ctm,
-                    viewport,
-                    state,
-                    ids,
-                    images,
-                    warnings,
-                    svg_dir,
-                    resources,
-                    allow_external_outside_svg,
-                    scene_scale_length,
-                    marker_callback,
-                    depth + 1,
-                )
-        else:
-            _walk(
-                target,
+    """Emit the images below ``root`` in document order.
+
+    The traversal uses an explicit stack of ``(element, ctm, viewport,
+    parent_state, depth)`` tuples.  Children are pushed in reverse so they
+    are popped in paint order, and elements outside ``bearing`` are never
+    pushed.
+    """
+    stack = [
+        (child, ctm, viewport, root_state, 0)
+        for child in reversed(root)
+        if child in bearing
+    ]
+    while stack:
+        el, ctm, viewport, parent_state, depth = stack.pop()
+        if depth > MAX_SVG_TRAVERSAL_DEPTH:
+            _warn_once(warnings, "Skipped SVG content beyond the traversal depth limit")
+            continue
+        tag = svg_tag(el)
+        if tag is None or tag in SKIP_TAGS:
+            continue
+
+        state = element_state(el, parent_state)
+        if state is None:
+            continue
+
+        transform = el.get("transform")
+        if transform:
+            ctm = mat_mul(ctm, parse_transform(transform))
+
+        if tag == "svg":
+            viewport_matrix, viewport = svg_viewport_matrix(
+                el,
+                viewport,
+                nested=True,
+                scene_scale_length=scene_scale_length,
+            )
+            ctm = mat_mul(ctm, viewport_matrix)
+
+        if tag == "image":
+            if resources["placements"] >= MAX_IMAGE_PLACEMENTS:
+                _warn_once(warnings, "Skipped images after reaching the placement limit")
+                continue
+            resources["placements"] += 1
+            marker_id = marker_callback(el) if marker_callback else None
+            _emit_image(
+                el,
                 ctm,
                 viewport,
                 state,
-                ids,
                 images,
                 warnings,
                 svg_dir,
                 resources,
                 allow_external_outside_svg,
-                scene_scale_length,
-                marker_callback,
-                depth + 1,
+                marker_id,
             )
-        return
+            continue
 
-    if tag not in {"svg", "g", "a"}:
-        return
-    for child in list(el):
-        _walk(
-            child,
-            ctm,
-            viewport,
-            state,
-            ids,
-            images,
-            warnings,
-            svg_dir,
-            resources,
-            allow_external_outside_svg,
-            scene_scale_length,
-            marker_callback,
-            depth + 1,
+        if tag == "use":
+            target = _use_target(el, ids)
+            if target is None:
+                continue
+            x = parse_coord(el.get("x", "0"), viewport[0])
+            y = parse_coord(el.get("y", "0"), viewport[1])
+            ctm = mat_mul(ctm, mat_translate(x, y))
+            if etree.QName(target.tag).localname in {"symbol", "svg"}:
+                # Match flatten_svg: these containers contribute their children.
+                children = target
+            else:
+                children = (target,)
+        elif tag in {"svg", "g", "a"}:
+            children = el
+        else:
+            continue
+
+        depth += 1
+        stack.extend(
+            (child, ctm, viewport, state, depth)
+            for child in reversed(children)
+            if child in bearing
         )
 
 
@@ -683,54 +513,55 @@ def _extract_svg_images(
     scene_scale_length=1.0,
     allow_external_outside_svg=False,
     add_markers=False,
+    spill_directory=None,
 ):
+    svg_content = _ensure_unicode(svg_content)
+    if not _IMAGE_TAG_RE.search(svg_content):
+        return [], [], svg_content if add_markers else None, []
+
     root = parse_svg_string(svg_content)
     ids = {}
-    existing_ids = set()
     has_embedded_stylesheet = False
-    has_image_element = False
+    image_elements = []
+    use_elements = []
     for el in root.iter():
-        if not isinstance(el.tag, str):
+        tag = svg_tag(el)
+        if tag is None:
+            if isinstance(el.tag, str) and el.get("id"):
+                ids[el.get("id")] = el
             continue
-        qname = etree.QName(el.tag)
-        if qname.namespace in (None, SVG_NS):
-            has_embedded_stylesheet |= qname.localname == "style"
-            has_image_element |= qname.localname == "image"
+        if tag == "image":
+            image_elements.append(el)
+        elif tag == "use":
+            use_elements.append(el)
+        elif tag == "style":
+            has_embedded_stylesheet = True
         element_id = el.get("id")
         if element_id:
             ids[element_id] = el
-            existing_ids.add(element_id)
 
     images = []
     warnings = []
-    if has_embedded_stylesheet and has_image_element:
+    if not image_elements:
+        # Nothing to extract or mark; hand the SVG through untouched.
+        return images, warnings, svg_content if add_markers else None, []
+    if has_embedded_stylesheet:
         warnings.append(
             "Embedded CSS stylesheets are not evaluated for image visibility "
             "or opacity"
         )
-    resources = _resource_state()
-    root_matrix, root_rect = _svg_viewport_matrix(
+    resources = _resource_state(spill_directory)
+    root_matrix, root_rect = svg_viewport_matrix(
         root,
         (0.0, 0.0),
         nested=False,
         scene_scale_length=scene_scale_length,
     )
-    root_state = _element_state(
-        root,
-        {
-            "displayed": True,
-            "display": "inline",
-            "visibility": "visible",
-            "opacity": 1.0,
-            "local_opacity": 1.0,
-            "effects": frozenset(),
-            "styles": {},
-        },
-    )
+    root_state = element_state(root, ROOT_PARENT_STATE)
 
     marker_ids = []
     marker_prefix = f"__ESVG_IMG_{uuid.uuid4().hex[:12]}_"
-    while any(value.startswith(marker_prefix) for value in existing_ids):
+    while any(value.startswith(marker_prefix) for value in ids):
         marker_prefix = f"_{marker_prefix}"
 
     def add_marker(image_el):
@@ -750,21 +581,21 @@ def _extract_svg_images(
         return marker_id
 
     if root_state is not None:
-        for child in list(root):
-            _walk(
-                child,
-                root_matrix,
-                root_rect,
-                root_state,
-                ids,
-                images,
-                warnings,
-                svg_dir,
-                resources,
-                allow_external_outside_svg,
-                scene_scale_length,
-                add_marker if add_markers else None,
-            )
+        _walk(
+            root,
+            root_matrix,
+            root_rect,
+            root_state,
+            ids,
+            _image_bearing_elements(root, ids, image_elements, use_elements),
+            images,
+            warnings,
+            svg_dir,
+            resources,
+            allow_external_outside_svg,
+            scene_scale_length,
+            add_marker if add_markers else None,
+        )
 
     marked_svg = (
         etree.tostring(root, encoding="unicode", pretty_print=True)
@@ -796,35 +627,154 @@ def prepare_svg_images(
     svg_dir=None,
     scene_scale_length=1.0,
     allow_external_outside_svg=False,
+    spill_directory=None,
 ):
-    """Extract images and return an import SVG containing paint-order markers."""
+    """Extract images and return an import SVG containing paint-order markers.
+
+    With a ``spill_directory``, placements carry an ``ImagePayload`` handle
+    under ``"payload"`` instead of their decoded bytes under ``"data"``.
+    Pass SVG already scaled by :func:`fold_svg_scale`; image corners follow
+    whatever scale the SVG carries.
+    """
     return _extract_svg_images(
         processed_svg,
         svg_dir,
         scene_scale_length,
         allow_external_outside_svg,
         add_markers=True,
+        spill_directory=spill_directory,
     )
 
 
+def externalize_svg_images(svg_content, images):
+    """Replace the data URIs of extracted images with hash references.
+
+    Call this after :func:`create_image_planes`.  Each ``data:`` href whose
+    bytes can be found again becomes ``typst-image:<sha256><ext>``, so a
+    stored SVG no longer carries a base64 copy of every image.
+    :func:`rehydrate_svg_images` restores the bytes from Blender's image
+    datablocks or the image cache.  Placements packed into an atlas have no
+    datablock of their own, so their bytes are copied to the image cache
+    here.  Images that failed to load stay embedded.
+    """
+    import bpy
+    from .image_store import default_cache_directory
+
+    loaded = {image.get("typst_svg_source_hash") for image in bpy.data.images}
+    keys = set()
+    for info in images:
+        key = image_key(info)
+        if info.get("atlas") is not None:
+            try:
+                store_image(info, default_cache_directory(), key)
+            except OSError:
+                # Keep this image embedded rather than losing it on export.
+                continue
+        elif key not in loaded:
+            continue
+        keys.add(key)
+    if not keys:
+        return svg_content
+
+    def replace(match):
+        # A fresh resource state per URI keeps at most one decoded image alive.
+        data, extension = _decode_href(
+            html.unescape(match.group(3)), None, [], _resource_state()
+        )
+        if data is None:
+            return match.group(0)
+        key = hashlib.sha256(data).hexdigest()
+        if key not in keys:
+            return match.group(0)
+        quote = match.group(2)
+        return f"{match.group(1)}{quote}typst-image:{key}{extension}{quote}"
+
+    return _DATA_HREF_RE.sub(replace, svg_content)
+
+
+def _referenced_image_bytes(key, extension):
+    import bpy
+    from .image_store import default_cache_directory
+
+    candidates = []
+    for image in bpy.data.images:
+        if image.get("typst_svg_source_hash") != key:
+            continue
+        source = image.get("typst_proxy_source")
+        if source:
+            candidates.append(bpy.path.abspath(source))
+        elif image.packed_file is not None:
+            return bytes(image.packed_file.data)
+        elif image.filepath:
+            candidates.append(bpy.path.abspath(image.filepath))
+    candidates.append(default_cache_directory() / f"{key}{extension}")
+    for candidate in candidates:
+        try:
+            return Path(candidate).read_bytes()
+        except OSError:
+            continue
+    return None
+
+
+def rehydrate_svg_images(svg_content, warnings=None):
+    """Turn ``typst-image:`` references back into embedded data URIs."""
+    warnings = warnings if warnings is not None else []
+    mime_types = {}
+    for mime, extension in _MIME_EXTENSIONS.items():
+        mime_types.setdefault(extension, mime)
+
+    def replace(match):
+        key = match.group("key")
+        extension = match.group("ext")
+        data = _referenced_image_bytes(key, extension)
+        if data is None:
+            _warn_once(warnings, f"Could not find image data for {key[:12]}")
+            return match.group(0)
+        mime = mime_types.get(extension.lower(), "image/png")
+        encoded = base64.b64encode(data).decode("ascii")
+        quote = match.group(2)
+        return f"{match.group(1)}{quote}data:{mime};base64,{encoded}{quote}"
+
+    return _IMAGE_REFERENCE_RE.sub(replace, svg_content)
+
+
 # --- Blender-side image datablocks, materials, geometry, and paint order ---
 
 
-def _load_packed_image(info, cache, warnings):
+def _load_packed_image(
+    info, cache, warnings, use_proxy=False, directory=None, journal=None
+):
     import bpy
 
-    key = hashlib.sha256(info["data"]).hexdigest()
+    key = image_key(info)
     if key in cache:
         return cache[key]
 
+    if use_proxy:
+        from .image_proxy import load_proxy_image
+
+        image = load_proxy_image(info, key, warnings, directory=directory)
+        if image is not None:
+            image["typst_svg_source_hash"] = key
+            if journal is not None:
+                journal["images"].add(image)
+            cache[key] = image
+            release_image(info)
+            return image
+
+    if directory is not None:
+        image = _load_stored_image(info, key, directory, warnings, journal)
+        if image is not None:
+            cache[key] = image
+            release_image(info)
+        return image
+
     image = None
-    tmp = tempfile.NamedTemporaryFile(suffix=info["ext"], delete=False)
     try:
-        tmp.write(info["data"])
-        tmp.close()
-        image = bpy.data.images.load(tmp.name, check_existing=False)
-        image.name = info["name"]
-        image.pack()
+        with image_file(info) as path:
+            image = bpy.data.images.load(path, check_existing=False)
+            image.name = info["name"]
+            image.pack()
         image.filepath = ""
         image["typst_svg_source_hash"] = key
     except (OSError, RuntimeError) as exc:
@@ -832,14 +782,49 @@ def _load_packed_image(info, cache, warnings):
         if image is not None and image.users == 0:
             bpy.data.images.remove(image)
         return None
-    finally:
-        try:
-            tmp.close()
-            os.unlink(tmp.name)
-        except OSError:
-            pass
 
+    if journal is not None:
+        journal["images"].add(image)
     cache[key] = image
+    # The packed datablock now owns the bytes.
+    release_image(info)
+    return image
+
+
+def _load_stored_image(info, key, directory, warnings, journal=None):
+    """Reference an image from the content-addressed store without packing.
+
+    Only a newly created datablock is recorded in ``journal``; one reused
+    from an earlier import is left alone by a rollback.
+    """
+    import bpy
+
+    image = None
+    created = False
+    try:
+        path = store_image(info, directory, key)
+        # check_existing reuses the datablock of an earlier import of the same
+        # bytes without scanning every image in the file.
+        count = len(bpy.data.images)
+        image = bpy.data.images.load(str(path), check_existing=True)
+        created = len(bpy.data.images) > count
+        if created and journal is not None:
+            journal["images"].add(image)
+        if image.get("typst_svg_source_hash") == key:
+            return image
+        image.name = info["name"]
+        if bpy.data.filepath:
+            try:
+                image.filepath = bpy.path.relpath(str(path))
+            except ValueError:
+                # Store and .blend are on different drives.
+                pass
+        image["typst_svg_source_hash"] = key
+    except (OSError, RuntimeError) as exc:
+        warnings.append(f"Could not store image {info['name']}: {exc}")
+        if created and image.users == 0:
+            bpy.data.images.remove(image)
+        return None
     return image
 
 
@@ -985,19 +970,44 @@ def create_image_planes(
     use_emission=False,
     warnings=None,
     scale_factor=1.0,
+    use_proxies=False,
+    image_directory=None,
+    journal=None,
 ):
-    """Create packed, UV-mapped image planes for extracted placements."""
+    """Create packed, UV-mapped image planes for extracted placements.
+
+    With ``use_proxies``, large images are packed as downscaled viewport
+    previews and swapped back to full resolution for final renders.  With an
+    ``image_directory``, images are written once to that content-addressed
+    store and referenced as external files instead of being packed.  A
+    ``journal`` dict of sets records every object, mesh, material, and image
+    as it is created, so a failed import can be rolled back.
+    """
     import bpy
+    from .image_proxy import image_source_size
 
     warnings = warnings if warnings is not None else []
     created = []
     image_cache = {}
     material_cache = {}
+    atlases = set()
     for info in images:
-        image = _load_packed_image(info, image_cache, warnings)
-        if image is None:
-            continue
-        corners, corner_uvs = _placement_geometry(info, image.size)
+        atlas = info.get("atlas")
+        if atlas is not None:
+            image = atlas["image"]
+            atlases.add(image)
+            corners, corner_uvs = _placement_geometry(info, atlas["size"])
+            if corner_uvs:
+                corner_uvs = atlas_uvs(corner_uvs, atlas["rect"])
+        else:
+            image = _load_packed_image(
+                info, image_cache, warnings, use_proxies, image_directory, journal
+            )
+            if image is None:
+                continue
+            corners, corner_uvs = _placement_geometry(
+                info, image_source_size(image)
+            )
         if not corners:
             warnings.append(f"Skipped image with invalid geometry: {info['name']}")
             continue
@@ -1021,6 +1031,8 @@ def create_image_planes(
         loop_order = (0, 1, 2, 3) if area > 0 else (0, 3, 2, 1)
 
         mesh = bpy.data.meshes.new(f"Image_{info['name']}")
+        if journal is not None:
+            journal["meshes"].add(mesh)
         mesh["typst_svg_image_mesh"] = True
         mesh.from_pydata(verts, [], [loop_order])
         uv_layer = mesh.uv_layers.new(name="UVMap")
@@ -1032,21 +1044,28 @@ def create_image_planes(
         if material is None:
             material = _create_image_material(image, use_emission)
             material_cache[material_key] = material
+            if journal is not None:
+                journal["materials"].add(material)
         mesh.materials.append(material)
 
         obj = bpy.data.objects.new(f"Image_{info['name']}", mesh)
+        if journal is not None:
+            journal["objects"].add(obj)
         obj["typst_svg_image_object"] = True
         collection.objects.link(obj)
         obj["opacity"] = float(info.get("opacity", 1.0))
-        obj.id_properties_ui("opacity").update(min=0.0, max=1.0, step=0.1)
         if info.get("marker_id"):
             obj["svg_marker_id"] = info["marker_id"]
         info["_created_object"] = obj
         created.append(obj)
 
-    for image in tuple(image_cache.values()):
+    for image in (*image_cache.values(), *atlases):
         if image.users == 0:
             bpy.data.images.remove(image)
+    if use_proxies and image_directory is None:
+        from .image_proxy import prune_proxy_cache
+
+        prune_proxy_cache()
     return created
 
 
@@ -0,0 +1,232 @@
+"""Viewport proxies for large embedded images.
+
+In proxy mode an image larger than :data:`IMAGE_PROXY_MAX_SIZE` is packed as
+a downscaled preview only.  Its full-resolution bytes are written once to a
+hash-named cache file, and final renders swap the preview for that file
+between the ``render_init`` and ``render_complete``/``render_cancel``
+handlers.  Viewport memory and .blend size then no longer grow with the
+source resolution.
+
+The preview is scaled with :mod:`imbuf`, so the full-resolution pixels are
+decoded once outside ``bpy.data`` and never become an image datablock.
+After each import, :func:`prune_proxy_cache` trims the per-user cache to
+:data:`image_store.IMAGE_CACHE_MAX_BYTES`, least recently used first; a
+proxy whose source was evicted renders with its preview unless
+:func:`pack_proxy_source` packed the source beforehand.
+"""
+
+import contextlib
+import os
+from pathlib import Path
+import tempfile
+
+import bpy
+from bpy.app.handlers import persistent
+
+from .image_atlas import image_dimensions
+from .image_store import (
+    default_cache_directory,
+    image_header,
+    prune_image_cache,
+    store_image,
+)
+
+
+IMAGE_PROXY_MAX_SIZE = 1024
+
+# Custom property pointing a proxy at its packed full-resolution image.
+PACKED_SOURCE_PROPERTY = "typst_proxy_packed_source"
+
+# (material name, node name, proxy image name) for every swapped texture.
+_swapped_textures = []
+
+
+def _blend_relative(path):
+    """Return ``path`` relative to the .blend file where one can be formed."""
+    if not bpy.data.filepath:
+        return str(path)
+    try:
+        return bpy.path.relpath(str(path))
+    except ValueError:
+        # On another drive than the .blend file.
+        return str(path)
+
+
+def proxy_source_path(image):
+    """Return the full-resolution file of a proxy image, or ``None``.
+
+    Sources are looked up where they were stored and, failing that, in the
+    per-user cache under their hash name, which survives moving the .blend.
+    """
+    source = image.get("typst_proxy_source")
+    if not source:
+        return None
+    path = Path(bpy.path.abspath(source))
+    if not path.is_file():
+        path = default_cache_directory() / path.name
+        if not path.is_file():
+            return None
+    with contextlib.suppress(OSError):
+        # Mark the file as recently used for the cache eviction.
+        os.utime(path)
+    return path
+
+
+def prune_proxy_cache():
+    """Trim the per-user cache, keeping the sources of every proxy image.
+
+    Run once per import, after all of its proxies exist.
+    """
+    keep = []
+    for image in bpy.data.images:
+        path = proxy_source_path(image)
+        if path is not None:
+            keep.append(path)
+    prune_image_cache(default_cache_directory(), keep=keep)
+
+
+def _write_preview(source, preview, max_size):
+    """Write a downscaled PNG of ``source`` to ``preview``; return the full size."""
+    import imbuf
+
+    buffer = imbuf.load(str(source))
+    try:
+        width, height = buffer.size
+        factor = max_size / max(width, height)
+        buffer.resize(
+            (max(1, round(width * factor)), max(1, round(height * factor))),
+            method="BILINEAR",
+        )
+        buffer.file_type = "PNG"
+        imbuf.write(buffer, filepath=preview)
+    finally:
+        buffer.free()
+    return width, height
+
+
+def load_proxy_image(
+    info, key, warnings, max_size=IMAGE_PROXY_MAX_SIZE, directory=None
+):
+    """Return a packed, downscaled proxy image, or ``None`` for small images.
+
+    Images with an unknown format or no side above ``max_size`` are left to
+    the regular full-resolution loader.  The full-resolution file goes to
+    ``directory`` when given, otherwise to the per-user cache.
+    """
+    size = image_dimensions(image_header(info))
+    if size is None or max(size) <= max_size:
+        return None
+
+    image = None
+    handle, preview = tempfile.mkstemp(suffix=".png")
+    os.close(handle)
+    try:
+        source = store_image(
+            info,
+            directory if directory is not None else default_cache_directory(),
+            key,
+        )
+        full_size = _write_preview(source, preview, max_size)
+        image = bpy.data.images.load(preview, check_existing=False)
+        image.pack()
+        image.filepath = ""
+        image.name = info["name"]
+        image["typst_proxy_source"] = _blend_relative(source)
+        image["typst_proxy_size"] = full_size
+    except (OSError, RuntimeError, ValueError) as exc:
+        warnings.append(f"Could not create a proxy for image {info['name']}: {exc}")
+        if image is not None and image.users == 0:
+            bpy.data.images.remove(image)
+        return None
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(preview)
+    return image
+
+
+def pack_proxy_source(image):
+    """Pack the full-resolution file behind a proxy into the .blend file.
+
+    The packed image keeps a fake user and is used by final renders instead
+    of the cache file, which may since have been evicted.
+
+    Returns:
+        The packed image, or ``None`` when the source file is gone.
+    """
+    full_image = image.get(PACKED_SOURCE_PROPERTY)
+    if full_image is not None and full_image.packed_file is not None:
+        return full_image
+    source = proxy_source_path(image)
+    if source is None:
+        return None
+    full_image = bpy.data.images.load(str(source), check_existing=True)
+    full_image.pack()
+    full_image.use_fake_user = True
+    image[PACKED_SOURCE_PROPERTY] = full_image
+    return full_image
+
+
+def image_source_size(image):
+    """Return the full-resolution pixel size of a possibly proxied image."""
+    return tuple(image.get("typst_proxy_size", image.size))
+
+
+@persistent
+def use_full_resolution_images(_scene, *_args):
+    """Swap proxy textures for their cached full-resolution files."""
+    restore_proxy_images()
+    for material in bpy.data.materials:
+        if not material.get("typst_svg_image_material") or material.node_tree is None:
+            continue
+        for node in material.node_tree.nodes:
+            image = getattr(node, "image", None)
+            if image is None or not image.get("typst_proxy_source"):
+                continue
+            full_image = image.get(PACKED_SOURCE_PROPERTY)
+            if full_image is None:
+                source = proxy_source_path(image)
+                if source is None:
+                    continue
+                full_image = bpy.data.images.load(str(source), check_existing=True)
+            _swapped_textures.append((material.name, node.name, image.name))
+            node.image = full_image
+
+
+@persistent
+def restore_proxy_images(*_args):
+    """Put proxy textures back and free the full-resolution images."""
+    released = set()
+    for material_name, node_name, image_name in _swapped_textures:
+        material = bpy.data.materials.get(material_name)
+        proxy = bpy.data.images.get(image_name)
+        if material is None or material.node_tree is None or proxy is None:
+            continue
+        node = material.node_tree.nodes.get(node_name)
+        if node is None:
+            continue
+        if node.image is not None and node.image != proxy:
+            released.add(node.image)
+        node.image = proxy
+    _swapped_textures.clear()
+    for image in released:
+        if image.users == 0:
+            bpy.data.images.remove(image)
+
+
+_HANDLERS = (
+    (bpy.app.handlers.render_init, use_full_resolution_images),
+    (bpy.app.handlers.render_complete, restore_proxy_images),
+    (bpy.app.handlers.render_cancel, restore_proxy_images),
+)
+
+
+def register_handlers():
+    for handlers, handler in _HANDLERS:
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unregister_handlers():
+    for handlers, handler in _HANDLERS:
+        if handler in handlers:
+            handlers.remove(handler)
@@ -0,0 +1,227 @@
+"""Content-addressed on-disk storage for decoded SVG image bytes.
+
+Files are named after the SHA-256 of their contents, so writing the same
+image twice is a no-op and independent imports share one copy.  Writes go
+through a temporary file in the target directory followed by an atomic
+rename, which keeps a crashed or concurrent import from leaving a truncated
+image behind under a valid name.
+
+Image placements carry their bytes either inline as ``info["data"]`` or, in
+streaming mode, as an :class:`ImagePayload` spilled to disk.  The
+``image_*`` helpers below accept both forms.
+"""
+
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+CACHE_DIRECTORY_NAME = "typst_importer_images"
+
+# Total size the per-user image cache is trimmed back to.
+IMAGE_CACHE_MAX_BYTES = 2 << 30
+
+
+def default_cache_directory():
+    """Return the per-user directory for cached full-resolution images."""
+    try:
+        import bpy
+
+        return Path(
+            bpy.utils.extension_path_user(
+                __package__, path="image_cache", create=True
+            )
+        )
+    except (ImportError, ValueError):
+        # Running from a plain checkout rather than an installed extension.
+        return Path(tempfile.gettempdir()) / CACHE_DIRECTORY_NAME
+
+
+def prune_image_cache(directory, max_bytes=IMAGE_CACHE_MAX_BYTES, keep=()):
+    """Delete the least recently used files until ``directory`` fits ``max_bytes``.
+
+    Files are ranked by modification time, which readers refresh with
+    :func:`os.utime`.  Paths in ``keep`` are never removed.
+
+    Returns:
+        int: The number of files removed.
+    """
+    keep = {os.path.normcase(os.path.abspath(path)) for path in keep}
+    try:
+        entries = [
+            entry
+            for entry in os.scandir(directory)
+            if entry.is_file() and not entry.name.startswith(".")
+        ]
+    except OSError:
+        return 0
+    stats = sorted(
+        ((entry.stat(), entry.path) for entry in entries),
+        key=lambda item: item[0].st_mtime,
+    )
+    total = sum(stat.st_size for stat, _path in stats)
+    removed = 0
+    for stat, path in stats:
+        if total <= max_bytes:
+            break
+        if os.path.normcase(os.path.abspath(path)) in keep:
+            continue
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= stat.st_size
+        removed += 1
+    return removed
+
+
+def resolve_store_directory(directory, warnings=None):
+    """Return an absolute store path for a possibly blend-relative directory.
+
+    A ``//`` path cannot be resolved before the .blend file has been saved;
+    the per-user cache is used instead and a warning is recorded.
+    """
+    import bpy
+
+    directory = str(directory)
+    if directory.startswith("//") and not bpy.data.filepath:
+        if warnings is not None:
+            warnings.append(
+                f"Image store {directory} is relative to an unsaved .blend file; "
+                "using the image cache instead"
+            )
+        return default_cache_directory()
+    return Path(bpy.path.abspath(directory))
+
+
+def _write_atomically(directory, key, extension, size, write):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{key}{extension}"
+    if path.is_file() and path.stat().st_size == size:
+        return path
+
+    handle, temporary = tempfile.mkstemp(
+        dir=directory, prefix=f".{key}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(handle, "wb") as file:
+            write(file)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def store_image_bytes(data, extension, directory, key=None):
+    """Write ``data`` once under its content hash and return the file path."""
+    key = key or hashlib.sha256(data).hexdigest()
+    return _write_atomically(
+        directory, key, extension, len(data), lambda file: file.write(data)
+    )
+
+
+class ImagePayload:
+    """Decoded image bytes spilled to a hash-named file.
+
+    Placements hold this small handle instead of the bytes, so the extracted
+    image list stays a few hundred bytes per image regardless of resolution.
+    """
+
+    __slots__ = ("key", "extension", "size", "path")
+
+    def __init__(self, key, extension, size, path):
+        self.key = key
+        self.extension = extension
+        self.size = size
+        self.path = Path(path)
+
+    @classmethod
+    def spill(cls, data, extension, directory):
+        key = hashlib.sha256(data).hexdigest()
+        path = store_image_bytes(data, extension, directory, key)
+        return cls(key, extension, len(data), path)
+
+    def read(self, size=-1):
+        with open(self.path, "rb") as file:
+            return file.read(size)
+
+    def release(self):
+        """Delete the spill file once the bytes live in a datablock."""
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def image_key(info):
+    """Return the SHA-256 content key of a placement's image."""
+    payload = info.get("payload")
+    if payload is not None:
+        return payload.key
+    key = info.get("key")
+    if key is None:
+        key = info["key"] = hashlib.sha256(info["data"]).hexdigest()
+    return key
+
+
+def image_header(info, size=1 << 20):
+    """Return enough leading bytes of a placement's image to read its size."""
+    payload = info.get("payload")
+    if payload is not None:
+        return payload.read(size)
+    return info["data"]
+
+
+@contextlib.contextmanager
+def image_file(info):
+    """Yield a path holding the placement's image bytes.
+
+    Spilled payloads are used in place; inline bytes go through a temporary
+    file that is removed on exit.
+    """
+    payload = info.get("payload")
+    if payload is not None:
+        yield str(payload.path)
+        return
+
+    tmp = tempfile.NamedTemporaryFile(suffix=info["ext"], delete=False)
+    try:
+        tmp.write(info["data"])
+        tmp.close()
+        yield tmp.name
+    finally:
+        try:
+            tmp.close()
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+
+
+def store_image(info, directory, key=None):
+    """Write a placement's image into a content-addressed store."""
+    payload = info.get("payload")
+    if payload is None:
+        return store_image_bytes(info["data"], info["ext"], directory, key)
+
+    def copy(file):
+        with open(payload.path, "rb") as source:
+            shutil.copyfileobj(source, file)
+
+    return _write_atomically(
+        directory, key or payload.key, info["ext"], payload.size, copy
+    )
+
+
+def release_image(info):
+    """Drop a placement's spilled bytes once they are no longer needed."""
+    payload = info.get("payload")
+    if payload is not None:
+        payload.release()
@@ -0,0 +1,117 @@
+"""Session-wide registry of importer materials keyed by exact colour.
+
+Every shared material carries its key in the ``typst_material_key`` custom
+property, so the registry survives saving and reloading.  The key-to-material
+index is built lazily with one pass over ``bpy.data.materials`` the first
+time it is needed in a session and dropped whenever Blender replaces its data
+(file load, undo, redo).  Lookups after that are a dict access.
+"""
+
+import bpy
+from bpy.app.handlers import persistent
+
+
+MATERIAL_KEY_PROPERTY = "typst_material_key"
+
+# Shader variants sharing the registry.
+EMISSION_VARIANT = "emission"
+GREASE_PENCIL_VARIANT = "grease_pencil"
+OBJECT_COLOR_VARIANT = "object_color"
+INSTANCE_ATTRIBUTE_VARIANT = "instance_attribute"
+
+_index = None
+
+
+def material_key(variant, *values):
+    """Return the registry key of a shader variant and its exact settings.
+
+    ``values`` may mix scalars, strings, and colour sequences.  Floats are
+    written with nine significant digits, which round-trips Blender's
+    single-precision colours exactly.
+    """
+    parts = [variant]
+    for value in values:
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, bool):
+            parts.append(str(int(value)))
+        elif isinstance(value, (int, float)):
+            parts.append(f"{value:.9g}")
+        else:
+            parts.append(",".join(f"{component:.9g}" for component in value))
+    return "|".join(parts)
+
+
+def _build_index():
+    index = {}
+    for material in bpy.data.materials:
+        key = material.get(MATERIAL_KEY_PROPERTY)
+        if key:
+            index.setdefault(key, material)
+    return index
+
+
+def lookup_material(key):
+    """Return the registered material for ``key``, or ``None``."""
+    global _index
+    if _index is None:
+        _index = _build_index()
+    material = _index.get(key)
+    if material is None:
+        return None
+    try:
+        if material.get(MATERIAL_KEY_PROPERTY) == key:
+            return material
+    except ReferenceError:
+        # The material was removed since the index was built.
+        pass
+    _index = _build_index()
+    return _index.get(key)
+
+
+def register_material(material, key):
+    """Mark ``material`` as the shared material for ``key``."""
+    global _index
+    if _index is None:
+        _index = _build_index()
+    material[MATERIAL_KEY_PROPERTY] = key
+    _index[key] = material
+
+
+def shared_material(key, create):
+    """Return the registered material for ``key``, creating it if needed.
+
+    ``create`` is called without arguments and must return a new material.
+    """
+    material = lookup_material(key)
+    if material is None:
+        material = create()
+        register_material(material, key)
+    return material
+
+
+@persistent
+def clear_index(*_args):
+    """Forget the index after Blender swaps out its data."""
+    global _index
+    _index = None
+
+
+_HANDLERS = (
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
+
+
+def register_handlers():
+    for handlers in _HANDLERS:
+        if clear_index not in handlers:
+            handlers.append(clear_index)
+
+
+def unregister_handlers():
+    for handlers in _HANDLERS:
+        if clear_index in handlers:
+            handlers.remove(clear_index)
+    clear_index()
@@ -1,13 +1,22 @@
 import bpy
-from nodebpy import geometry as g
 
 
 GREASE_PENCIL_STROKE_NODE_GROUP = "Typst Stroke Radius"
 DEFAULT_GREASE_PENCIL_STROKE_RADIUS = 0.01
+STROKE_RADIUS_PROPERTY = "typst_stroke_radius"
 _GREASE_PENCIL_STROKE_NODE_GROUP_MARKER_KEY = "typst_importer_node_group"
 _GREASE_PENCIL_STROKE_NODE_GROUP_MARKER = (
     "typst_importer.grease_pencil_stroke_radius.v1"
 )
+_TEMPLATE_MARKER_KEY = "typst_importer_template"
+_FOLLOW_PATH_MARKER = "typst_importer.follow_path.v2"
+_VISIBILITY_MARKER = "typst_importer.visibility.v2"
+INDEX_LABELS_NODE_GROUP = "Typst Index Labels"
+_INDEX_LABELS_MARKER = "typst_importer.index_labels.v2"
+GLYPH_INSTANCES_NODE_GROUP = "Typst Glyph Instances"
+_GLYPH_INSTANCES_MARKER = "typst_importer.glyph_instances.v1"
+GLYPH_REVEAL_NODE_GROUP = "Typst Glyph Reveal"
+_GLYPH_REVEAL_MARKER = "typst_importer.glyph_reveal.v1"
 
 
 def _interface_input(node_group, name):
@@ -48,6 +57,22 @@ def modifier_input_data_path(modifier, socket_name):
     return f'modifiers["{modifier.name}"].properties.inputs.{socket.identifier}.value'
 
 
+def _new_socket(node_group, name, in_out, socket_type, description=""):
+    return node_group.interface.new_socket(
+        name, in_out=in_out, socket_type=socket_type, description=description
+    )
+
+
+def _add_node(node_group, bl_idname, location, name=None):
+    """Add a node at a fixed location, optionally renaming and labelling it."""
+    node = node_group.nodes.new(bl_idname)
+    node.location = location
+    if name is not None:
+        node.name = name
+        node.label = name
+    return node
+
+
 def create_grease_pencil_stroke_radius_node_group():
     """Create the shared Blender 5.2 node group for Typst GP outlines."""
     for existing in bpy.data.node_groups:
@@ -59,44 +84,49 @@ def create_grease_pencil_stroke_radius_node_group():
         ):
             return existing
 
-    with g.tree(GREASE_PENCIL_STROKE_NODE_GROUP, arrange="sugiyama") as tree:
-        node_group = tree.tree
-        node_group.is_modifier = True
-        node_group.description = (
-            "Show Typst Grease Pencil strokes and control their radius"
-        )
-        node_group[_GREASE_PENCIL_STROKE_NODE_GROUP_MARKER_KEY] = (
-            _GREASE_PENCIL_STROKE_NODE_GROUP_MARKER
-        )
+    node_group = bpy.data.node_groups.new(
+        GREASE_PENCIL_STROKE_NODE_GROUP, "GeometryNodeTree"
+    )
+    node_group.is_modifier = True
+    node_group.description = (
+        "Show Typst Grease Pencil strokes and control their radius"
+    )
+    node_group[_GREASE_PENCIL_STROKE_NODE_GROUP_MARKER_KEY] = (
+        _GREASE_PENCIL_STROKE_NODE_GROUP_MARKER
+    )
 
-        geometry = tree.inputs.geometry("Geometry")
-        stroke_radius = tree.inputs.float(
-            "Stroke Radius",
-            DEFAULT_GREASE_PENCIL_STROKE_RADIUS,
-            "Radius of the visible Grease Pencil stroke",
-            min_value=0.0,
-            max_value=10.0,
-            subtype="DISTANCE",
-        )
-        geometry_output = tree.outputs.geometry("Geometry")
+    _new_socket(node_group, "Geometry", "INPUT", "NodeSocketGeometry")
+    stroke_radius = _new_socket(
+        node_group,
+        "Stroke Radius",
+        "INPUT",
+        "NodeSocketFloat",
+        "Radius of the visible Grease Pencil stroke",
+    )
+    stroke_radius.default_value = DEFAULT_GREASE_PENCIL_STROKE_RADIUS
+    stroke_radius.min_value = 0.0
+    stroke_radius.max_value = 10.0
+    stroke_radius.subtype = "DISTANCE"
+    _new_socket(node_group, "Geometry", "OUTPUT", "NodeSocketGeometry")
 
-        show_stroke = g.StoreNamedAttribute.spline.boolean(
-            geometry=geometry, name="hide_stroke", value=False
-        )
-        show_stroke.node.name = "Show Stroke"
-        show_stroke.node.label = "Show Stroke"
-        set_radius = g.SetCurveRadius(show_stroke, radius=stroke_radius)
-        set_radius.node.name = "Set Stroke Radius"
-        set_radius.node.label = "Set Stroke Radius"
-        set_radius >> geometry_output
-
-        tree.node_positions = {
-            "Group Input": (-500.0, 0.0),
-            "Show Stroke": (-260.0, 0.0),
-            "Set Stroke Radius": (20.0, 0.0),
-            "Group Output": (280.0, 0.0),
-        }
+    group_input = _add_node(node_group, "NodeGroupInput", (-500.0, 0.0))
+    show_stroke = _add_node(
+        node_group, "GeometryNodeStoreNamedAttribute", (-260.0, 0.0), "Show Stroke"
+    )
+    show_stroke.data_type = "BOOLEAN"
+    show_stroke.domain = "CURVE"
+    show_stroke.inputs["Name"].default_value = "hide_stroke"
+    show_stroke.inputs["Value"].default_value = False
+    set_radius = _add_node(
+        node_group, "GeometryNodeSetCurveRadius", (20.0, 0.0), "Set Stroke Radius"
+    )
+    group_output = _add_node(node_group, "NodeGroupOutput", (280.0, 0.0))
 
+    links = node_group.links
+    links.new(group_input.outputs["Geometry"], show_stroke.inputs["Geometry"])
+    links.new(show_stroke.outputs["Geometry"], set_radius.inputs["Curve"])
+    links.new(group_input.outputs["Stroke Radius"], set_radius.inputs["Radius"])
+    links.new(set_radius.outputs["Curve"], group_output.inputs["Geometry"])
     return node_group
 
 
@@ -120,65 +150,566 @@ def add_grease_pencil_stroke_radius_modifier(
     return modifier
 
 
-def create_follow_curve_node_group():
-    """Create a Geometry Nodes group that makes an object follow a curve."""
-    with g.tree("Follow Path", arrange="sugiyama") as tree:
-        follow_path = tree.tree
-        follow_path.color_tag = "NONE"
-        follow_path.description = ""
-        follow_path.default_group_node_width = 140
-        follow_path.is_modifier = True
-
-        geometry = tree.inputs.geometry("Geometry")
-        curve_object = tree.inputs.object("Object")
-        factor = tree.inputs.float(
-            "Factor", 0.0, min_value=0.0, max_value=1.0, subtype="FACTOR"
-        )
-        output = tree.outputs.geometry("Geometry")
+def _stroke_radius_modifiers(obj):
+    return [
+        modifier
+        for modifier in obj.modifiers
+        if modifier.type == "NODES"
+        and modifier.node_group is not None
+        and modifier.node_group.get(_GREASE_PENCIL_STROKE_NODE_GROUP_MARKER_KEY)
+        == _GREASE_PENCIL_STROKE_NODE_GROUP_MARKER
+    ]
 
-        object_info = g.ObjectInfo(
-            object=curve_object, as_instance=False, transform_space="RELATIVE"
-        )
-        sample_curve = g.SampleCurve.factor.float(
-            curves=object_info.o.geometry,
-            factor=factor,
-            use_all_curves=False,
-        )
-        transformed = g.TransformGeometry(
-            geometry=geometry,
-            mode="Components",
-            translation=sample_curve.o.position,
-            rotation=(0.0, 0.0, 0.0),
-            scale=(1.0, 1.0, 1.0),
-        )
-        in_bounds = g.BooleanMath.l_and(
-            g.Compare.float.greater_than(factor, 0.0010000000474974513),
-            g.Compare.float.less_than(factor, 0.9990000128746033),
+
+def bake_grease_pencil_stroke_radius(obj, stroke_radius=None):
+    """Write the stroke radius into an object's drawings and drop the modifier.
+
+    Every point gets ``radius`` and every stroke ``hide_stroke = False``, which
+    is what the stroke-radius modifier computes on each evaluation.  Without
+    ``stroke_radius``, the value of the object's modifier is baked.  The
+    radius is remembered in the ``typst_stroke_radius`` property for
+    :func:`restore_grease_pencil_stroke_radius_modifier`.
+    """
+    if obj.type != "GREASEPENCIL":
+        raise TypeError("Baking a stroke radius requires a Grease Pencil object")
+    modifiers = _stroke_radius_modifiers(obj)
+    if stroke_radius is None:
+        if modifiers:
+            stroke_radius = modifier_input(modifiers[0], "Stroke Radius")[0].value
+        else:
+            stroke_radius = obj.get(
+                STROKE_RADIUS_PROPERTY, DEFAULT_GREASE_PENCIL_STROKE_RADIUS
+            )
+    if stroke_radius < 0.0:
+        raise ValueError("Grease Pencil stroke radius must be non-negative")
+
+    for layer in obj.data.layers:
+        for frame in layer.frames:
+            drawing = frame.drawing
+            if drawing is None:
+                continue
+            attributes = drawing.attributes
+            position = attributes.get("position")
+            point_count = len(position.data) if position is not None else 0
+            curve_count = len(drawing.strokes)
+            radius = attributes.get("radius") or attributes.new(
+                "radius", "FLOAT", "POINT"
+            )
+            radius.data.foreach_set("value", [float(stroke_radius)] * point_count)
+            hide_stroke = attributes.get("hide_stroke") or attributes.new(
+                "hide_stroke", "BOOLEAN", "CURVE"
+            )
+            hide_stroke.data.foreach_set("value", [False] * curve_count)
+    obj.data.update_tag()
+
+    for modifier in modifiers:
+        obj.modifiers.remove(modifier)
+    obj[STROKE_RADIUS_PROPERTY] = float(stroke_radius)
+    return stroke_radius
+
+
+def restore_grease_pencil_stroke_radius_modifier(obj):
+    """Re-add the stroke-radius modifier of a baked object for editing."""
+    modifiers = _stroke_radius_modifiers(obj)
+    if modifiers:
+        return modifiers[0]
+    return add_grease_pencil_stroke_radius_modifier(
+        obj, obj.get(STROKE_RADIUS_PROPERTY, DEFAULT_GREASE_PENCIL_STROKE_RADIUS)
+    )
+
+
+def create_glyph_reveal_node_group():
+    """Create the shared group that shows the first glyphs of a merged import.
+
+    Curves whose ``glyph_index`` attribute is at least ``Visible Glyphs`` are
+    removed, so keyframing that one input reveals the glyphs in order.
+    """
+    for existing in bpy.data.node_groups:
+        if (
+            existing.get(_TEMPLATE_MARKER_KEY) == _GLYPH_REVEAL_MARKER
+            and existing.bl_idname == "GeometryNodeTree"
+        ):
+            return existing
+
+    node_group = bpy.data.node_groups.new(GLYPH_REVEAL_NODE_GROUP, "GeometryNodeTree")
+    node_group.is_modifier = True
+    node_group.description = "Show the glyphs before a glyph index"
+    node_group[_TEMPLATE_MARKER_KEY] = _GLYPH_REVEAL_MARKER
+
+    _new_socket(node_group, "Geometry", "INPUT", "NodeSocketGeometry")
+    visible = _new_socket(
+        node_group,
+        "Visible Glyphs",
+        "INPUT",
+        "NodeSocketInt",
+        "Number of glyphs shown, in import order",
+    )
+    visible.default_value = 0
+    visible.min_value = 0
+    _new_socket(node_group, "Geometry", "OUTPUT", "NodeSocketGeometry")
+
+    group_input = _add_node(node_group, "NodeGroupInput", (-500.0, 0.0))
+    glyph_index = _add_node(
+        node_group, "GeometryNodeInputNamedAttribute", (-500.0, -200.0)
+    )
+    glyph_index.data_type = "INT"
+    glyph_index.inputs["Name"].default_value = "glyph_index"
+    hidden = _add_node(node_group, "FunctionNodeCompare", (-260.0, -120.0))
+    hidden.data_type = "INT"
+    hidden.operation = "GREATER_EQUAL"
+    delete = _add_node(node_group, "GeometryNodeDeleteGeometry", (0.0, 0.0))
+    delete.domain = "CURVE"
+    group_output = _add_node(node_group, "NodeGroupOutput", (240.0, 0.0))
+
+    links = node_group.links
+    links.new(glyph_index.outputs["Attribute"], hidden.inputs[2])
+    links.new(group_input.outputs["Visible Glyphs"], hidden.inputs[3])
+    links.new(group_input.outputs["Geometry"], delete.inputs["Geometry"])
+    links.new(hidden.outputs["Result"], delete.inputs["Selection"])
+    links.new(delete.outputs["Geometry"], group_output.inputs["Geometry"])
+    return node_group
+
+
+def add_glyph_reveal_modifier(obj, glyph_count):
+    """Attach a Glyph Reveal modifier that initially shows every glyph."""
+    modifier = obj.modifiers.new(name=GLYPH_REVEAL_NODE_GROUP, type="NODES")
+    modifier.node_group = create_glyph_reveal_node_group()
+    set_modifier_input_value(modifier, "Visible Glyphs", int(glyph_count))
+    return modifier
+
+
+def _shared_node_group(name, marker, build):
+    """Return the one node group tagged with ``marker``, building it once.
+
+    Every modifier uses the same group; the values it needs live in the
+    modifier's inputs.  The version suffix of ``marker`` is bumped whenever
+    ``build`` changes, so a file holding an older build gets a fresh group
+    and :func:`merge_duplicate_node_groups` can move modifiers over.
+    """
+    node_group = bpy.data.node_groups.get(name)
+    if node_group is None or node_group.get(_TEMPLATE_MARKER_KEY) != marker:
+        node_group = next(
+            (
+                existing
+                for existing in bpy.data.node_groups
+                if existing.get(_TEMPLATE_MARKER_KEY) == marker
+                and existing.bl_idname == "GeometryNodeTree"
+            ),
+            None,
         )
-        switched = g.Switch.geometry(switch=in_bounds, true=transformed)
-        g.SetPosition(switched, offset=(0.0, 0.0, 0.05)) >> output
+    if node_group is None:
+        node_group = bpy.data.node_groups.new(name, "GeometryNodeTree")
+        node_group[_TEMPLATE_MARKER_KEY] = marker
+        build(node_group)
+    return node_group
+
+
+def _build_follow_curve(follow_path):
+    follow_path.color_tag = "NONE"
+    follow_path.description = ""
+    follow_path.default_group_node_width = 140
+    follow_path.is_modifier = True
+
+    _new_socket(follow_path, "Geometry", "INPUT", "NodeSocketGeometry")
+    _new_socket(follow_path, "Object", "INPUT", "NodeSocketObject")
+    factor = _new_socket(follow_path, "Factor", "INPUT", "NodeSocketFloat")
+    factor.default_value = 0.0
+    factor.min_value = 0.0
+    factor.max_value = 1.0
+    factor.subtype = "FACTOR"
+    _new_socket(follow_path, "Geometry", "OUTPUT", "NodeSocketGeometry")
+
+    group_input = _add_node(follow_path, "NodeGroupInput", (-900.0, 0.0))
+    object_info = _add_node(follow_path, "GeometryNodeObjectInfo", (-660.0, -60.0))
+    object_info.transform_space = "RELATIVE"
+    object_info.inputs["As Instance"].default_value = False
+    sample_curve = _add_node(follow_path, "GeometryNodeSampleCurve", (-440.0, -60.0))
+    sample_curve.data_type = "FLOAT"
+    sample_curve.mode = "FACTOR"
+    sample_curve.use_all_curves = False
+    transform = _add_node(follow_path, "GeometryNodeTransform", (-220.0, 120.0))
+    transform.inputs["Mode"].default_value = "Components"
+    transform.inputs["Rotation"].default_value = (0.0, 0.0, 0.0)
+    transform.inputs["Scale"].default_value = (1.0, 1.0, 1.0)
+    above = _add_node(follow_path, "FunctionNodeCompare", (-440.0, -300.0))
+    above.data_type = "FLOAT"
+    above.operation = "GREATER_THAN"
+    above.inputs[1].default_value = 0.0010000000474974513
+    below = _add_node(follow_path, "FunctionNodeCompare", (-440.0, -480.0))
+    below.data_type = "FLOAT"
+    below.operation = "LESS_THAN"
+    below.inputs[1].default_value = 0.9990000128746033
+    in_bounds = _add_node(follow_path, "FunctionNodeBooleanMath", (-220.0, -300.0))
+    in_bounds.operation = "AND"
+    switch = _add_node(follow_path, "GeometryNodeSwitch", (0.0, 0.0))
+    switch.input_type = "GEOMETRY"
+    set_position = _add_node(follow_path, "GeometryNodeSetPosition", (200.0, 0.0))
+    set_position.inputs["Offset"].default_value = (0.0, 0.0, 0.05)
+    group_output = _add_node(follow_path, "NodeGroupOutput", (400.0, 0.0))
+
+    links = follow_path.links
+    links.new(group_input.outputs["Object"], object_info.inputs["Object"])
+    links.new(object_info.outputs["Geometry"], sample_curve.inputs["Curves"])
+    links.new(group_input.outputs["Factor"], sample_curve.inputs["Factor"])
+    links.new(group_input.outputs["Geometry"], transform.inputs["Geometry"])
+    links.new(sample_curve.outputs["Position"], transform.inputs["Translation"])
+    links.new(group_input.outputs["Factor"], above.inputs[0])
+    links.new(group_input.outputs["Factor"], below.inputs[0])
+    links.new(above.outputs["Result"], in_bounds.inputs[0])
+    links.new(below.outputs["Result"], in_bounds.inputs[1])
+    links.new(in_bounds.outputs["Boolean"], switch.inputs["Switch"])
+    links.new(transform.outputs["Geometry"], switch.inputs["True"])
+    links.new(switch.outputs["Output"], set_position.inputs["Geometry"])
+    links.new(set_position.outputs["Geometry"], group_output.inputs["Geometry"])
 
-    return follow_path
+
+def create_follow_curve_node_group():
+    """Return the shared Geometry Nodes group that makes an object follow a
+    curve."""
+    return _shared_node_group("Follow Path", _FOLLOW_PATH_MARKER, _build_follow_curve)
+
+
+def _build_visibility(visibility):
+    visibility.color_tag = "NONE"
+    visibility.description = ""
+    visibility.default_group_node_width = 140
+    visibility.is_modifier = True
+
+    _new_socket(visibility, "Geometry", "INPUT", "NodeSocketGeometry")
+    is_visible = _new_socket(visibility, "Visibility", "INPUT", "NodeSocketBool")
+    is_visible.default_value = False
+    _new_socket(visibility, "Geometry", "OUTPUT", "NodeSocketGeometry")
+
+    group_input = _add_node(visibility, "NodeGroupInput", (-234.0, -30.0))
+    switch = _add_node(visibility, "GeometryNodeSwitch", (-34.0, 33.0))
+    switch.input_type = "GEOMETRY"
+    group_output = _add_node(visibility, "NodeGroupOutput", (139.0, 24.0))
+
+    links = visibility.links
+    links.new(group_input.outputs["Visibility"], switch.inputs["Switch"])
+    links.new(group_input.outputs["Geometry"], switch.inputs["True"])
+    links.new(switch.outputs["Output"], group_output.inputs["Geometry"])
 
 
 def visibility_node_group():
-    """Create a Geometry Nodes group that controls object visibility."""
-    with g.tree("Visibility", arrange="sugiyama") as tree:
-        visibility = tree.tree
-        visibility.color_tag = "NONE"
-        visibility.description = ""
-        visibility.default_group_node_width = 140
-        visibility.is_modifier = True
-
-        geometry = tree.inputs.geometry("Geometry")
-        is_visible = tree.inputs.boolean("Visibility", False)
-        output = tree.outputs.geometry("Geometry")
-        g.Switch.geometry(switch=is_visible, true=geometry) >> output
-
-        tree.node_positions = {
-            "Group Input": (-234, -30),
-            "Group Output": (139, 24),
-            "Switch": (-34, 33),
+    """Return the shared Geometry Nodes group that controls object visibility."""
+    return _shared_node_group("Visibility", _VISIBILITY_MARKER, _build_visibility)
+
+
+_SHARED_NODE_GROUPS = (
+    ("Follow Path", _FOLLOW_PATH_MARKER, _build_follow_curve),
+    ("Visibility", _VISIBILITY_MARKER, _build_visibility),
+)
+
+
+def _interface_signature(node_group):
+    return tuple(
+        (item.in_out, item.name, item.socket_type, item.identifier)
+        for item in node_group.interface.items_tree
+        if item.item_type == "SOCKET"
+    )
+
+
+def _is_outdated_copy(node_group, name, marker):
+    """Return whether a group is an older build or private copy of ``name``."""
+    if node_group.bl_idname != "GeometryNodeTree":
+        return False
+    tag = node_group.get(_TEMPLATE_MARKER_KEY)
+    if tag is not None:
+        # Any other version of the same group, including old templates.
+        return tag != marker and tag.rsplit(".v", 1)[0] == marker.rsplit(".v", 1)[0]
+    # Per-modifier copies were untagged and only share the name.
+    base, _, suffix = node_group.name.rpartition(".")
+    return node_group.name == name or (base == name and suffix.isdigit())
+
+
+def merge_duplicate_node_groups():
+    """Point modifiers at the shared Follow Path and Visibility groups.
+
+    Copies made per modifier by older versions, and groups built for an
+    older marker version, are replaced by the current shared group when
+    their interface matches it socket for socket, which keeps modifier
+    values and keyframes intact.  Replaced groups left without users are
+    removed.
+
+    Returns:
+        int: The number of node groups removed.
+    """
+    removed = set()
+    for name, marker, build in _SHARED_NODE_GROUPS:
+        duplicates = [
+            node_group
+            for node_group in bpy.data.node_groups
+            if _is_outdated_copy(node_group, name, marker)
+        ]
+        if not duplicates:
+            continue
+        shared = _shared_node_group(name, marker, build)
+        signature = _interface_signature(shared)
+        mergeable = {
+            node_group
+            for node_group in duplicates
+            if node_group != shared and _interface_signature(node_group) == signature
         }
+        for obj in bpy.data.objects:
+            for modifier in obj.modifiers:
+                if modifier.type == "NODES" and modifier.node_group in mergeable:
+                    modifier.node_group = shared
+        removed.update(
+            node_group
+            for node_group in mergeable
+            if node_group.users == int(node_group.use_fake_user)
+        )
+    bpy.data.batch_remove(removed)
+    return len(removed)
+
+
+def create_index_labels_node_group():
+    """Create the shared group that draws index labels over a collection.
+
+    One label and one background circle are instanced at every object of the
+    ``Collection`` input, read live through Collection Info.  ``Labels``
+    holds one line per instance in Collection Info order; String to Curves
+    lays all lines over each other (zero line spacing) and each character is
+    moved to the object its line belongs to.  The instance at ``Skip Index``,
+    such as a root empty, gets no label and is left out of the line count.
+    """
+    for existing in bpy.data.node_groups:
+        if (
+            existing.get(_TEMPLATE_MARKER_KEY) == _INDEX_LABELS_MARKER
+            and existing.bl_idname == "GeometryNodeTree"
+        ):
+            return existing
+
+    node_group = bpy.data.node_groups.new(INDEX_LABELS_NODE_GROUP, "GeometryNodeTree")
+    node_group.is_modifier = True
+    node_group.description = "Draw an index label at every object of a collection"
+    node_group[_TEMPLATE_MARKER_KEY] = _INDEX_LABELS_MARKER
+
+    _new_socket(node_group, "Geometry", "INPUT", "NodeSocketGeometry")
+    _new_socket(node_group, "Collection", "INPUT", "NodeSocketCollection")
+    _new_socket(node_group, "Labels", "INPUT", "NodeSocketString")
+    skip_index = _new_socket(node_group, "Skip Index", "INPUT", "NodeSocketInt")
+    skip_index.default_value = -1
+    size = _new_socket(node_group, "Size", "INPUT", "NodeSocketFloat")
+    size.default_value = 0.15
+    size.min_value = 0.0
+    size.subtype = "DISTANCE"
+    _new_socket(node_group, "Text Material", "INPUT", "NodeSocketMaterial")
+    _new_socket(node_group, "Background Material", "INPUT", "NodeSocketMaterial")
+    _new_socket(node_group, "Geometry", "OUTPUT", "NodeSocketGeometry")
+
+    group_input = _add_node(node_group, "NodeGroupInput", (-1100.0, 0.0))
+    collection_info = _add_node(
+        node_group, "GeometryNodeCollectionInfo", (-860.0, 200.0)
+    )
+    collection_info.transform_space = "RELATIVE"
+    collection_info.inputs["Separate Children"].default_value = True
+    collection_info.inputs["Reset Children"].default_value = False
+    instance_index = _add_node(node_group, "GeometryNodeInputIndex", (-860.0, 420.0))
+    skipped = _add_node(node_group, "FunctionNodeCompare", (-860.0, 560.0))
+    skipped.data_type = "INT"
+    skipped.operation = "EQUAL"
+    skip_instance = _add_node(node_group, "GeometryNodeDeleteGeometry", (-740.0, 200.0))
+    skip_instance.domain = "INSTANCE"
+
+    # Labels: every character is moved to the object of its line.
+    string_to_curves = _add_node(
+        node_group, "GeometryNodeStringToCurves", (-860.0, -200.0)
+    )
+    string_to_curves.align_x = "CENTER"
+    string_to_curves.align_y = "MIDDLE"
+    string_to_curves.inputs["Line Spacing"].default_value = 0.0
+    position = _add_node(node_group, "GeometryNodeInputPosition", (-860.0, -520.0))
+    sample_position = _add_node(node_group, "GeometryNodeSampleIndex", (-620.0, -320.0))
+    sample_position.data_type = "FLOAT_VECTOR"
+    sample_position.domain = "INSTANCE"
+    text_offset = _add_node(node_group, "ShaderNodeVectorMath", (-400.0, -320.0))
+    text_offset.operation = "ADD"
+    text_offset.inputs[1].default_value = (0.0, 0.0, 0.009)
+    translate_text = _add_node(
+        node_group, "GeometryNodeTranslateInstances", (-180.0, -200.0)
+    )
+    realize_text = _add_node(node_group, "GeometryNodeRealizeInstances", (40.0, -200.0))
+    fill_text = _add_node(node_group, "GeometryNodeFillCurve", (260.0, -200.0))
+    text_material = _add_node(node_group, "GeometryNodeSetMaterial", (480.0, -200.0))
+
+    # Background circles, one instance of a single circle per object.
+    to_points = _add_node(node_group, "GeometryNodeInstancesToPoints", (-620.0, 200.0))
+    circle = _add_node(node_group, "GeometryNodeMeshCircle", (-620.0, 400.0))
+    circle.fill_type = "NGON"
+    circle.inputs["Vertices"].default_value = 32
+    circle.inputs["Radius"].default_value = 0.07
+    circle_material = _add_node(node_group, "GeometryNodeSetMaterial", (-400.0, 400.0))
+    instance_circles = _add_node(
+        node_group, "GeometryNodeInstanceOnPoints", (-180.0, 200.0)
+    )
+    lift_circles = _add_node(
+        node_group, "GeometryNodeTranslateInstances", (40.0, 200.0)
+    )
+    lift_circles.inputs["Translation"].default_value = (0.0, 0.0, 0.005)
+
+    join = _add_node(node_group, "GeometryNodeJoinGeometry", (700.0, 0.0))
+    group_output = _add_node(node_group, "NodeGroupOutput", (900.0, 0.0))
+
+    links = node_group.links
+    links.new(group_input.outputs["Collection"], collection_info.inputs["Collection"])
+    links.new(group_input.outputs["Labels"], string_to_curves.inputs["String"])
+    links.new(group_input.outputs["Size"], string_to_curves.inputs["Size"])
+    links.new(collection_info.outputs["Instances"], skip_instance.inputs["Geometry"])
+    links.new(instance_index.outputs["Index"], skipped.inputs[2])
+    links.new(group_input.outputs["Skip Index"], skipped.inputs[3])
+    links.new(skipped.outputs["Result"], skip_instance.inputs["Selection"])
+    links.new(skip_instance.outputs["Geometry"], sample_position.inputs["Geometry"])
+    links.new(position.outputs["Position"], sample_position.inputs["Value"])
+    links.new(string_to_curves.outputs["Line"], sample_position.inputs["Index"])
+    links.new(sample_position.outputs["Value"], text_offset.inputs[0])
+    links.new(
+        string_to_curves.outputs["Curve Instances"],
+        translate_text.inputs["Instances"],
+    )
+    links.new(text_offset.outputs["Vector"], translate_text.inputs["Translation"])
+    links.new(translate_text.outputs["Instances"], realize_text.inputs["Geometry"])
+    links.new(realize_text.outputs["Geometry"], fill_text.inputs["Curve"])
+    links.new(fill_text.outputs["Mesh"], text_material.inputs["Geometry"])
+    links.new(group_input.outputs["Text Material"], text_material.inputs["Material"])
 
-    return visibility
+    links.new(skip_instance.outputs["Geometry"], to_points.inputs["Instances"])
+    links.new(circle.outputs["Mesh"], circle_material.inputs["Geometry"])
+    links.new(
+        group_input.outputs["Background Material"],
+        circle_material.inputs["Material"],
+    )
+    links.new(to_points.outputs["Points"], instance_circles.inputs["Points"])
+    links.new(circle_material.outputs["Geometry"], instance_circles.inputs["Instance"])
+    links.new(instance_circles.outputs["Instances"], lift_circles.inputs["Instances"])
+
+    links.new(text_material.outputs["Geometry"], join.inputs["Geometry"])
+    links.new(lift_circles.outputs["Instances"], join.inputs["Geometry"])
+    links.new(join.outputs["Geometry"], group_output.inputs["Geometry"])
+    return node_group
+
+
+def create_glyph_instances_node_group():
+    """Create the shared group that instances glyph outlines onto points.
+
+    Every point of the modified mesh is one glyph placement.  Its
+    ``glyph_id`` picks a child of the ``Glyphs`` collection and its
+    ``transform`` places the instance; ``color`` and ``opacity`` reach the
+    material as instancer attributes.  ``Reveal`` shows the glyphs whose
+    ``paint_index`` falls within that fraction of the points, and ``Opacity``
+    scales every glyph's opacity, so both animate the whole document from
+    one object.
+    """
+    for existing in bpy.data.node_groups:
+        if (
+            existing.get(_TEMPLATE_MARKER_KEY) == _GLYPH_INSTANCES_MARKER
+            and existing.bl_idname == "GeometryNodeTree"
+        ):
+            return existing
+
+    node_group = bpy.data.node_groups.new(
+        GLYPH_INSTANCES_NODE_GROUP, "GeometryNodeTree"
+    )
+    node_group.is_modifier = True
+    node_group.description = "Instance shared glyph outlines onto placement points"
+    node_group[_TEMPLATE_MARKER_KEY] = _GLYPH_INSTANCES_MARKER
+
+    _new_socket(node_group, "Geometry", "INPUT", "NodeSocketGeometry")
+    _new_socket(node_group, "Glyphs", "INPUT", "NodeSocketCollection")
+    for name in ("Reveal", "Opacity"):
+        factor = _new_socket(node_group, name, "INPUT", "NodeSocketFloat")
+        factor.default_value = 1.0
+        factor.min_value = 0.0
+        factor.max_value = 1.0
+        factor.subtype = "FACTOR"
+    _new_socket(node_group, "Geometry", "OUTPUT", "NodeSocketGeometry")
+
+    group_input = _add_node(node_group, "NodeGroupInput", (-1100.0, 0.0))
+
+    def named_attribute(name, data_type, location):
+        node = _add_node(node_group, "GeometryNodeInputNamedAttribute", location)
+        node.data_type = data_type
+        node.inputs["Name"].default_value = name
+        return node
+
+    # Selection: paint_index < Reveal * point count.
+    domain_size = _add_node(
+        node_group, "GeometryNodeAttributeDomainSize", (-860.0, -200.0)
+    )
+    domain_size.component = "MESH"
+    revealed_count = _add_node(node_group, "ShaderNodeMath", (-640.0, -200.0))
+    revealed_count.operation = "MULTIPLY"
+    paint_index = named_attribute("paint_index", "INT", (-640.0, -400.0))
+    revealed = _add_node(node_group, "FunctionNodeCompare", (-420.0, -300.0))
+    revealed.data_type = "FLOAT"
+    revealed.operation = "LESS_THAN"
+
+    opacity = named_attribute("opacity", "FLOAT", (-860.0, 200.0))
+    scaled_opacity = _add_node(node_group, "ShaderNodeMath", (-640.0, 200.0))
+    scaled_opacity.operation = "MULTIPLY"
+    store_opacity = _add_node(
+        node_group, "GeometryNodeStoreNamedAttribute", (-420.0, 100.0)
+    )
+    store_opacity.data_type = "FLOAT"
+    store_opacity.domain = "POINT"
+    store_opacity.inputs["Name"].default_value = "opacity"
+
+    collection_info = _add_node(
+        node_group, "GeometryNodeCollectionInfo", (-420.0, 400.0)
+    )
+    collection_info.transform_space = "ORIGINAL"
+    collection_info.inputs["Separate Children"].default_value = True
+    collection_info.inputs["Reset Children"].default_value = True
+    glyph_id = named_attribute("glyph_id", "INT", (-420.0, -500.0))
+    instance = _add_node(node_group, "GeometryNodeInstanceOnPoints", (-180.0, 0.0))
+    instance.inputs["Pick Instance"].default_value = True
+    transform = named_attribute("transform", "FLOAT4X4", (-180.0, -300.0))
+    set_transform = _add_node(
+        node_group, "GeometryNodeSetInstanceTransform", (60.0, 0.0)
+    )
+    group_output = _add_node(node_group, "NodeGroupOutput", (280.0, 0.0))
+
+    links = node_group.links
+    links.new(group_input.outputs["Geometry"], domain_size.inputs["Geometry"])
+    links.new(domain_size.outputs["Point Count"], revealed_count.inputs[0])
+    links.new(group_input.outputs["Reveal"], revealed_count.inputs[1])
+    links.new(paint_index.outputs["Attribute"], revealed.inputs[0])
+    links.new(revealed_count.outputs["Value"], revealed.inputs[1])
+
+    links.new(opacity.outputs["Attribute"], scaled_opacity.inputs[0])
+    links.new(group_input.outputs["Opacity"], scaled_opacity.inputs[1])
+    links.new(group_input.outputs["Geometry"], store_opacity.inputs["Geometry"])
+    links.new(scaled_opacity.outputs["Value"], store_opacity.inputs["Value"])
+
+    links.new(group_input.outputs["Glyphs"], collection_info.inputs["Collection"])
+    links.new(store_opacity.outputs["Geometry"], instance.inputs["Points"])
+    links.new(revealed.outputs["Result"], instance.inputs["Selection"])
+    links.new(collection_info.outputs["Instances"], instance.inputs["Instance"])
+    links.new(glyph_id.outputs["Attribute"], instance.inputs["Instance Index"])
+    links.new(instance.outputs["Instances"], set_transform.inputs["Instances"])
+    links.new(transform.outputs["Attribute"], set_transform.inputs["Transform"])
+    links.new(set_transform.outputs["Instances"], group_output.inputs["Geometry"])
+    return node_group
+
+
+def arrange_node_tree(node_tree, spacing=(280.0, 200.0)):
+    """Lay out ``node_tree`` in columns by link depth.
+
+    This is a development helper for designing new templates; the importer
+    itself only ever creates nodes at fixed positions.  It needs NetworkX,
+    which is imported here so the add-on does not depend on it at runtime.
+    """
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    graph.add_nodes_from(node.name for node in node_tree.nodes)
+    graph.add_edges_from(
+        (link.from_node.name, link.to_node.name) for link in node_tree.links
+    )
+    for column, names in enumerate(nx.topological_generations(graph)):
+        for row, name in enumerate(sorted(names)):
+            node_tree.nodes[name].location = (
+                column * spacing[0],
+                -row * spacing[1],
+            )
@@ -1,6 +1,23 @@
 import bpy
 
 
+def _has_moving_ancestor(obj, moving):
+    parent = obj.parent
+    while parent is not None:
+        if parent in moving:
+            return True
+        parent = parent.parent
+    return False
+
+
+def _shift_xy(obj, dx, dy):
+    """Move an object by a world-space XY offset, whatever its parent."""
+    matrix = obj.matrix_world.copy()
+    matrix.translation.x += dx
+    matrix.translation.y += dy
+    obj.matrix_world = matrix
+
+
 class OBJECT_OT_align_to_active(bpy.types.Operator):
     """
     Aligns selected objects' X and Y coordinates to match the active object's location, while preserving Z coordinates.
@@ -25,14 +42,18 @@ class OBJECT_OT_align_to_active(bpy.types.Operator):
 
     def execute(self, context):
         active_obj = context.active_object
-        target_loc = (
-            active_obj.location.copy()
-        )  # Copy location to avoid direct reference issues
-        for obj in context.selected_objects:
-            if obj != active_obj:
-                # Only snap X and Y; leave Z unchanged.
-                obj.location.x = target_loc.x
-                obj.location.y = target_loc.y
+        # Copy location to avoid direct reference issues. World positions
+        # keep this correct for objects parented to an import's root empty.
+        target_loc = active_obj.matrix_world.translation.copy()
+        moving = {obj for obj in context.selected_objects if obj != active_obj}
+        for obj in moving:
+            # Selected children follow their selected parent instead of
+            # being moved a second time.
+            if _has_moving_ancestor(obj, moving):
+                continue
+            # Only snap X and Y; leave Z unchanged.
+            current = obj.matrix_world.translation
+            _shift_xy(obj, target_loc.x - current.x, target_loc.y - current.y)
         return {"FINISHED"}
 
 
@@ -74,10 +95,15 @@ class OBJECT_OT_align_collection(bpy.types.Operator):
         # All other selected objects are sources
         source_objects = [obj for obj in context.selected_objects if obj != destination]
 
-        # For each source object, move its entire collection
+        # Work out every object's offset before moving anything, so each
+        # object moves once even if several sources reach it.
+        deltas = {}
         for source in source_objects:
             # Compute the translation vector from source to destination
-            delta = destination.location - source.location
+            delta = (
+                destination.matrix_world.translation
+                - source.matrix_world.translation
+            )
 
             # Gather all objects in every collection that the source object is a member of,
             # including objects in sub-collections
@@ -97,12 +123,19 @@ class OBJECT_OT_align_collection(bpy.types.Operator):
                 # In case the source isn't in any collection (rare), move just the source
                 objects_to_move.add(source)
 
-            # Move each object by delta only in the X and Y axes, except for the destination
             for obj in objects_to_move:
                 if obj == destination or obj in source_objects and obj != source:
                     continue
-                obj.location.x += delta.x
-                obj.location.y += delta.y
+                deltas.setdefault(obj, delta)
+
+        # Move each object by its delta only in the X and Y axes.  Children
+        # follow their parent, so an import parented to a root empty moves by
+        # moving that one empty, and a child of another moving object is not
+        # shifted twice.
+        for obj, delta in deltas.items():
+            if _has_moving_ancestor(obj, deltas):
+                continue
+            _shift_xy(obj, delta.x, delta.y)
 
         self.report(
             {"INFO"}, f"Aligned {len(source_objects)} collections to {destination.name}"
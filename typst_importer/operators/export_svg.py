@@ -23,6 +23,8 @@ class ExportTypstSvgOperator(bpy.types.Operator):
     )
 
     def execute(self, context):
+        from ..image_import import rehydrate_svg_images
+
         # Use the last processed SVG stored on the scene (set after every Typst import)
         processed_svg = getattr(context.scene, "typst_last_processed_svg", None)
 
@@ -33,6 +35,12 @@ class ExportTypstSvgOperator(bpy.types.Operator):
             )
             return {"CANCELLED"}
 
+        # Streamed imports store images as hash references.
+        warnings = []
+        processed_svg = rehydrate_svg_images(processed_svg, warnings)
+        for warning in warnings:
+            self.report({"WARNING"}, warning)
+
         filepath = bpy.path.abspath(self.filepath) or DEFAULT_EXPORT_PATH
         if not filepath.lower().endswith(".svg"):
             filepath += ".svg"
@@ -1,6 +1,11 @@
 import bpy
 from .visibility import toggle_visibility
-from .op_utils import get_or_create_collection
+from .op_utils import (
+    duplicate_objects,
+    get_or_create_collection,
+    insert_keyframes,
+    select_only,
+)
 
 
 class OBJECT_OT_fade_in(bpy.types.Operator):
@@ -27,15 +32,12 @@ class OBJECT_OT_fade_in(bpy.types.Operator):
             if "opacity" not in obj:
                 obj["opacity"] = 0.0
 
-            # Set initial opacity to 0
-            obj["opacity"] = 0.0
-            obj.keyframe_insert(data_path='["opacity"]', frame=current_frame)
-
-            # Set final opacity to 1
-            obj["opacity"] = 1.0
-            obj.keyframe_insert(data_path='["opacity"]', frame=end_frame)
+            # Fade the opacity from 0 to 1
+            insert_keyframes(
+                obj, '["opacity"]', [(current_frame, 0.0), (end_frame, 1.0)]
+            )
 
-            # Reset to initial value for display
+            # Show the initial value for display
             obj["opacity"] = 0.0
 
         self.report(
@@ -66,31 +68,15 @@ class OBJECT_OT_fade_in_to_plane(bpy.types.Operator):
         # Get or create the "AnimationObjs" collection
         target_collection = get_or_create_collection("AnimationObjs")
 
-        created_objects = []
-
-        for obj in context.selected_objects:
-            # Create a copy of the object
-            bpy.ops.object.select_all(action="DESELECT")
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-            bpy.ops.object.duplicate()
-
-            # Get the newly created copy
-            copy_obj = context.active_object
-            copy_obj.name = f"{obj.name}_animation"
+        # Copy the whole selection into the AnimationObjs collection
+        created_objects = duplicate_objects(
+            list(context.selected_objects), target_collection, "_animation"
+        )
 
+        for copy_obj in created_objects:
             # Set z coordinate to 0
             copy_obj.location.z = 0
 
-            # Move the copy to the AnimationObjs collection
-            # First remove from current collections
-            for collection in bpy.data.collections:
-                if copy_obj.name in collection.objects:
-                    collection.objects.unlink(copy_obj)
-
-            # Add to target collection
-            target_collection.objects.link(copy_obj)
-            
             # Make the object visible
             toggle_visibility(copy_obj, current_frame, True)
 
@@ -98,24 +84,16 @@ class OBJECT_OT_fade_in_to_plane(bpy.types.Operator):
             if "opacity" not in copy_obj:
                 copy_obj["opacity"] = 0.0
 
-            # Set initial opacity to 0
-            copy_obj["opacity"] = 0.0
-            copy_obj.keyframe_insert(data_path='["opacity"]', frame=current_frame)
-
-            # Set final opacity to 1
-            copy_obj["opacity"] = 1.0
-            copy_obj.keyframe_insert(data_path='["opacity"]', frame=end_frame)
+            # Fade the opacity from 0 to 1
+            insert_keyframes(
+                copy_obj, '["opacity"]', [(current_frame, 0.0), (end_frame, 1.0)]
+            )
 
-            # Reset to initial value for display
+            # Show the initial value for display
             copy_obj["opacity"] = 0.0
 
-            created_objects.append(copy_obj.name)
-
         # Select all the newly created objects
-        bpy.ops.object.select_all(action="DESELECT")
-        for obj_name in created_objects:
-            if obj_name in bpy.data.objects:
-                bpy.data.objects[obj_name].select_set(True)
+        select_only(context, created_objects)
 
         self.report(
             {"INFO"},
@@ -145,13 +123,10 @@ class OBJECT_OT_fade_out(bpy.types.Operator):
             if "opacity" not in obj:
                 obj["opacity"] = 1.0
 
-            # Set initial opacity to 1
-            obj["opacity"] = 1.0
-            obj.keyframe_insert(data_path='["opacity"]', frame=current_frame)
-
-            # Set final opacity to 0
-            obj["opacity"] = 0.0
-            obj.keyframe_insert(data_path='["opacity"]', frame=end_frame)
+            # Fade the opacity from 1 to 0
+            insert_keyframes(
+                obj, '["opacity"]', [(current_frame, 1.0), (end_frame, 0.0)]
+            )
 
             # After fading out, make the object invisible
             toggle_visibility(obj, end_frame, False)
@@ -163,4 +138,129 @@ class OBJECT_OT_fade_out(bpy.types.Operator):
             {"INFO"},
             f"Fading out {len(context.selected_objects)} objects over 10 frames",
         )
-        return {"FINISHED"} 
\ No newline at end of file
+        return {"FINISHED"} 
+
+
+REVEAL_PROPERTY = "typst_reveal"
+REVEAL_SOFTNESS_PROPERTY = "typst_reveal_softness"
+REVEAL_INDEX_PROPERTY = "typst_reveal_index"
+REVEAL_OPACITY_PROPERTY = "typst_reveal_opacity"
+
+
+def _add_opacity_driver(obj, control, index):
+    obj.driver_remove('["opacity"]')
+    driver = obj.driver_add('["opacity"]').driver
+    driver.type = "SCRIPTED"
+    for name, data_path in (
+        ("reveal", f'["{REVEAL_PROPERTY}"]'),
+        ("softness", f'["{REVEAL_SOFTNESS_PROPERTY}"]'),
+    ):
+        variable = driver.variables.new()
+        variable.name = name
+        variable.type = "SINGLE_PROP"
+        variable.targets[0].id_type = "OBJECT"
+        variable.targets[0].id = control
+        variable.targets[0].data_path = data_path
+    # Plain arithmetic and clamp() run in Blender's fast expression evaluator,
+    # so thousands of these drivers need no Python at frame change.
+    base = float(obj[REVEAL_OPACITY_PROPERTY])
+    driver.expression = (
+        f"{base:.6g} * clamp((reveal - {index}) / softness, 0.0, 1.0)"
+    )
+
+
+def add_reveal_control(collection, softness=1.0):
+    """Drive the opacity of every glyph in a collection from one value.
+
+    Glyphs are numbered in paint order (``svg_paint_index`` where present,
+    otherwise collection order) and get a driver that shows glyph ``i`` once
+    the control's ``typst_reveal`` value passes ``i``, fading in over
+    ``typst_reveal_softness`` glyphs.  Animating ``typst_reveal`` from 0 to the
+    glyph count writes the collection on with a single F-curve.  The control
+    is the collection's root empty when it has one, otherwise a new empty.
+    Drivers take precedence over opacity keyframes on the same glyphs.
+
+    Returns:
+        The control object.
+    """
+    from ..typst_to_svg import collection_root
+
+    control = next(
+        (obj for obj in collection.objects if REVEAL_PROPERTY in obj), None
+    ) or collection_root(collection)
+    if control is None:
+        control = bpy.data.objects.new(f"{collection.name}_reveal", None)
+        control.empty_display_type = "PLAIN_AXES"
+        collection.objects.link(control)
+
+    glyphs = [
+        obj for obj in collection.objects if obj != control and "opacity" in obj
+    ]
+    ordered = sorted(
+        enumerate(glyphs),
+        key=lambda item: (item[1].get("svg_paint_index", item[0]), item[0]),
+    )
+
+    control[REVEAL_PROPERTY] = float(len(glyphs))
+    control.id_properties_ui(REVEAL_PROPERTY).update(min=0.0, max=float(len(glyphs)))
+    control[REVEAL_SOFTNESS_PROPERTY] = float(softness)
+    control.id_properties_ui(REVEAL_SOFTNESS_PROPERTY).update(min=0.001)
+
+    for index, (_position, obj) in enumerate(ordered):
+        obj[REVEAL_INDEX_PROPERTY] = index
+        if REVEAL_OPACITY_PROPERTY not in obj:
+            obj[REVEAL_OPACITY_PROPERTY] = float(obj["opacity"])
+        _add_opacity_driver(obj, control, index)
+    return control
+
+
+class OBJECT_OT_reveal_collection(bpy.types.Operator):
+    """Write on the collections of the selected objects glyph by glyph,
+    animated by one reveal value per collection"""
+
+    bl_idname = "object.reveal_collection"
+    bl_label = "Reveal Collection"
+    bl_options = {"REGISTER", "UNDO"}
+
+    duration: bpy.props.IntProperty(
+        name="Duration",
+        description="Frames until every glyph is visible",
+        default=30,
+        min=1,
+    )
+    softness: bpy.props.FloatProperty(
+        name="Softness",
+        description="Number of glyphs fading in at the same time",
+        default=1.0,
+        min=0.001,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.selected_objects
+
+    def execute(self, context):
+        current_frame = context.scene.frame_current
+        collections = []
+        for obj in context.selected_objects:
+            for collection in obj.users_collection:
+                if collection not in collections:
+                    collections.append(collection)
+
+        for collection in collections:
+            control = add_reveal_control(collection, self.softness)
+            insert_keyframes(
+                control,
+                f'["{REVEAL_PROPERTY}"]',
+                [
+                    (current_frame, 0.0),
+                    (current_frame + self.duration, control[REVEAL_PROPERTY]),
+                ],
+                interpolation="LINEAR",
+            )
+
+        self.report(
+            {"INFO"},
+            f"Revealing {len(collections)} collection(s) over {self.duration} frames",
+        )
+        return {"FINISHED"}
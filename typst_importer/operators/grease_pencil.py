@@ -0,0 +1,54 @@
+import bpy
+
+from ..node_groups import (
+    bake_grease_pencil_stroke_radius,
+    restore_grease_pencil_stroke_radius_modifier,
+)
+
+
+class OBJECT_OT_bake_grease_pencil_stroke_radius(bpy.types.Operator):
+    """Write the stroke radius into the selected Grease Pencil drawings and
+    remove their Stroke Radius modifiers"""
+
+    bl_idname = "object.bake_grease_pencil_stroke_radius"
+    bl_label = "Bake Stroke Radius"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return any(obj.type == "GREASEPENCIL" for obj in context.selected_objects)
+
+    def execute(self, context):
+        baked = 0
+        for obj in context.selected_objects:
+            if obj.type != "GREASEPENCIL":
+                continue
+            bake_grease_pencil_stroke_radius(obj)
+            baked += 1
+        self.report({"INFO"}, f"Baked the stroke radius of {baked} object(s)")
+        return {"FINISHED"}
+
+
+class OBJECT_OT_edit_grease_pencil_stroke_radius(bpy.types.Operator):
+    """Re-add the Stroke Radius modifier to the selected baked Grease Pencil
+    objects so the radius can be edited again"""
+
+    bl_idname = "object.edit_grease_pencil_stroke_radius"
+    bl_label = "Edit Stroke Radius"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return any(obj.type == "GREASEPENCIL" for obj in context.selected_objects)
+
+    def execute(self, context):
+        restored = 0
+        for obj in context.selected_objects:
+            if obj.type != "GREASEPENCIL":
+                continue
+            restore_grease_pencil_stroke_radius_modifier(obj)
+            restored += 1
+        self.report(
+            {"INFO"}, f"Added Stroke Radius modifiers to {restored} object(s)"
+        )
+        return {"FINISHED"}
@@ -0,0 +1,58 @@
+import bpy
+
+
+def _packable_images():
+    """Return the Typst images whose full-resolution pixels are not packed."""
+    from ..image_proxy import PACKED_SOURCE_PROPERTY
+
+    images = []
+    for image in bpy.data.images:
+        if not image.get("typst_svg_source_hash"):
+            continue
+        if image.get("typst_proxy_source"):
+            packed = image.get(PACKED_SOURCE_PROPERTY)
+            if packed is None or packed.packed_file is None:
+                images.append(image)
+        elif image.packed_file is None:
+            images.append(image)
+    return images
+
+
+class OBJECT_OT_pack_typst_images(bpy.types.Operator):
+    """Pack every externally stored Typst image into the .blend file,
+    including the full-resolution sources of viewport proxies"""
+
+    bl_idname = "object.pack_typst_images"
+    bl_label = "Pack Typst Images"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(_packable_images())
+
+    def execute(self, context):
+        from ..image_proxy import pack_proxy_source
+
+        packed = 0
+        failed = []
+        for image in _packable_images():
+            try:
+                if image.get("typst_proxy_source"):
+                    if pack_proxy_source(image) is None:
+                        failed.append(image.name)
+                        continue
+                else:
+                    image.pack()
+            except RuntimeError:
+                failed.append(image.name)
+                continue
+            packed += 1
+
+        if failed:
+            self.report(
+                {"WARNING"},
+                f"Packed {packed} image(s); could not pack {', '.join(failed)}",
+            )
+        else:
+            self.report({"INFO"}, f"Packed {packed} Typst image(s)")
+        return {"FINISHED"}
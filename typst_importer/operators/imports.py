@@ -4,8 +4,6 @@ from bpy.props import BoolProperty, StringProperty
 from pathlib import Path
 import time
 
-from ..typst_to_svg import typst_to_blender_curves
-
 
 # Operator for the button and drag-and-drop
 class ImportTypstOperator(bpy.types.Operator, ImportHelper):
@@ -37,6 +35,8 @@ class ImportTypstOperator(bpy.types.Operator, ImportHelper):
             self.report({"WARNING"}, "Selected file is not a TXT or TYP file")
             return {"CANCELLED"}
 
+        from ..typst_to_svg import typst_to_blender_curves
+
         # Prepare file variables
         typst_file = Path(self.filepath)
         file_name_without_ext = typst_file.stem
@@ -0,0 +1,280 @@
+"""Animate one imported formula into another, glyph by glyph.
+
+:func:`match_glyphs` pairs the glyphs of two collections that have the same
+outline.  Outlines are compared with :func:`glyph_library.glyph_hash` and
+:func:`glyph_library.same_outline` on coordinates relative to each outline's
+centre, so matching works wherever the glyphs sit and whether or not the
+imports were centred or share library data.  Among glyphs with the same
+outline, pairs are chosen nearest first with a KD-tree of the target
+positions.  Mesh and curve imports are supported.
+
+:func:`morph_collections` then keys the whole transition: matched source
+glyphs move onto their targets and hand over to them at the end, unmatched
+source glyphs fade out and unmatched target glyphs fade in.
+"""
+
+import bpy
+from mathutils import Matrix, Vector
+from mathutils.kdtree import KDTree
+
+from ..glyph_library import glyph_centre, glyph_hash, glyph_points, same_outline
+from .op_utils import insert_keyframes
+from .visibility import toggle_visibility
+
+
+# Neighbours fetched per source glyph in the first matching round.
+_FIRST_ROUND_NEIGHBOURS = 4
+
+
+def _outline_class(data, classes):
+    """Return a key shared by every outline equal to ``data``.
+
+    ``classes`` maps :func:`glyph_hash` keys to the points of the outlines
+    seen so far and grows as new outlines turn up.
+    """
+    key = glyph_hash(data)
+    points = glyph_points(data)
+    known = classes.setdefault(key, [])
+    for number, other in enumerate(known):
+        if same_outline(other, points):
+            return key, number
+    known.append(points)
+    return key, len(known) - 1
+
+
+def _glyphs(collection, classes):
+    """Return ``(object, key, world position)`` for each glyph of a collection.
+
+    Only the collection's own objects count; index labels live in child
+    collections.  Outlines are compared once per datablock, so glyphs sharing
+    library data cost one comparison between them.
+    """
+    cache = {}
+    glyphs = []
+    for obj in collection.objects:
+        if obj.type not in {"MESH", "CURVE"} or obj.data is None:
+            continue
+        if obj.get("typst_svg_image_object"):
+            continue
+        data = obj.data
+        pointer = data.as_pointer()
+        if pointer not in cache:
+            centre = glyph_centre(data)
+            key = None if centre is None else _outline_class(data, classes)
+            cache[pointer] = (key, centre)
+        key, centre = cache[pointer]
+        if key is None:
+            continue
+        scale = tuple(round(value, 4) for value in obj.matrix_world.to_scale())
+        position = obj.matrix_world @ Vector(centre.tolist())
+        glyphs.append((obj, (key, scale), position))
+    return glyphs
+
+
+def _pair_nearest(sources, targets):
+    """Pair ``(object, position)`` sources and targets, nearest first.
+
+    Returns:
+        tuple: ``(pairs, unpaired sources)`` with the entries of both lists.
+    """
+    tree = KDTree(len(targets))
+    for index, (_obj, position) in enumerate(targets):
+        tree.insert(position, index)
+    tree.balance()
+
+    pairs = []
+    open_sources = list(range(len(sources)))
+    used = set()
+    neighbours = _FIRST_ROUND_NEIGHBOURS
+    while open_sources and len(used) < len(targets):
+        # Gather each open source's nearest free targets, then take the
+        # shortest pairs first.  Widen the search until everything that can
+        # be paired is.
+        neighbours = min(neighbours, len(targets))
+        candidates = []
+        for source in open_sources:
+            for _co, target, distance in tree.find_n(
+                sources[source][1], neighbours
+            ):
+                if target not in used:
+                    candidates.append((distance, source, target))
+        candidates.sort()
+        paired = set()
+        for _distance, source, target in candidates:
+            if source in paired or target in used:
+                continue
+            paired.add(source)
+            used.add(target)
+            pairs.append((sources[source], targets[target]))
+        open_sources = [source for source in open_sources if source not in paired]
+        if neighbours == len(targets):
+            break
+        neighbours *= 2
+    return pairs, [sources[index] for index in open_sources]
+
+
+def _match(source, target):
+    """Return :func:`match_glyphs` with ``(object, position)`` entries."""
+    classes = {}
+    groups = {}
+    for obj, key, position in _glyphs(target, classes):
+        groups.setdefault(key, ([], []))[1].append((obj, position))
+    removed = []
+    for obj, key, position in _glyphs(source, classes):
+        if key in groups:
+            groups[key][0].append((obj, position))
+        else:
+            removed.append((obj, position))
+
+    pairs = []
+    added = []
+    for sources, targets in groups.values():
+        if not sources:
+            added.extend(targets)
+            continue
+        group_pairs, group_removed = _pair_nearest(sources, targets)
+        pairs.extend(group_pairs)
+        removed.extend(group_removed)
+        matched = {entry[0] for _source_entry, entry in group_pairs}
+        added.extend(entry for entry in targets if entry[0] not in matched)
+    return pairs, removed, added
+
+
+def match_glyphs(source, target):
+    """Match the glyphs of two collections by outline and position.
+
+    Args:
+        source: The collection animated from.
+        target: The collection animated to.
+
+    Returns:
+        tuple: ``(pairs, removed, added)``.  ``pairs`` holds ``(source glyph,
+        target glyph)`` tuples, ``removed`` the source glyphs without a
+        match and ``added`` the target glyphs without a match.
+    """
+    pairs, removed, added = _match(source, target)
+    return (
+        [(source_entry[0], target_entry[0]) for source_entry, target_entry in pairs],
+        [obj for obj, _position in removed],
+        [obj for obj, _position in added],
+    )
+
+
+def _end_location(obj, offset):
+    """Return the ``location`` that moves ``obj`` by a world-space offset."""
+    world = Matrix.Translation(offset) @ obj.matrix_world
+    if obj.parent is not None:
+        parent = obj.parent.matrix_world @ obj.matrix_parent_inverse
+        world = parent.inverted_safe() @ world
+    return world.to_translation()
+
+
+def _key_opacity(obj, keyframes):
+    if "opacity" not in obj:
+        obj["opacity"] = 1.0
+    insert_keyframes(obj, '["opacity"]', keyframes)
+
+
+def morph_collections(source, target, frame=None, duration=10):
+    """Key the transition from one imported formula to another.
+
+    Matched source glyphs move onto their target glyphs between ``frame``
+    and ``frame + duration``, then hand over to them.  Unmatched source
+    glyphs fade out and unmatched target glyphs fade in over the same
+    frames.  Target glyphs are hidden before the transition.
+
+    Args:
+        source: The collection animated from.
+        target: The collection animated to.
+        frame: First frame of the transition. Defaults to the current frame.
+        duration: Length of the transition in frames.
+
+    Returns:
+        tuple: ``(matched, removed, added)`` glyph counts.
+    """
+    if frame is None:
+        frame = bpy.context.scene.frame_current
+    end_frame = frame + duration
+    pairs, removed, added = _match(source, target)
+
+    for (source_obj, source_position), (target_obj, target_position) in pairs:
+        start = source_obj.location.copy()
+        end = _end_location(source_obj, target_position - source_position)
+        for axis in range(3):
+            insert_keyframes(
+                source_obj,
+                "location",
+                [(frame, start[axis]), (end_frame, end[axis])],
+                index=axis,
+            )
+        toggle_visibility(source_obj, end_frame, False)
+        toggle_visibility(target_obj, end_frame, True)
+
+    for obj, _position in removed:
+        _key_opacity(obj, [(frame, obj.get("opacity", 1.0)), (end_frame, 0.0)])
+        toggle_visibility(obj, end_frame, False)
+
+    for obj, _position in added:
+        opacity = obj.get("opacity", 1.0)
+        _key_opacity(obj, [(frame, 0.0), (end_frame, opacity)])
+        toggle_visibility(obj, frame, True)
+
+    return len(pairs), len(removed), len(added)
+
+
+class OBJECT_OT_morph_collections(bpy.types.Operator):
+    """
+    Morph one imported formula into another.
+
+    Usage:
+    1. Select a glyph of the formula to animate from
+    2. Then select a glyph of the formula to animate to last (making it active)
+    3. Run the operator to move matching glyphs and fade the others
+    """
+
+    bl_idname = "object.morph_collections"
+    bl_label = "Morph Collections"
+    bl_options = {"REGISTER", "UNDO"}
+
+    duration: bpy.props.IntProperty(
+        name="Duration",
+        description="Length of the transition in frames",
+        default=10,
+        min=1,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return (
+            context.active_object is not None
+            and len(context.selected_objects) >= 2
+        )
+
+    def execute(self, context):
+        target = context.active_object.users_collection[0]
+        sources = {
+            collection
+            for obj in context.selected_objects
+            for collection in obj.users_collection
+            if collection != target
+        }
+        if len(sources) != 1:
+            self.report(
+                {"WARNING"},
+                "Select glyphs from exactly two collections, the target one last",
+            )
+            return {"CANCELLED"}
+
+        (source,) = sources
+        matched, removed, added = morph_collections(
+            source,
+            target,
+            frame=context.scene.frame_current,
+            duration=self.duration,
+        )
+        self.report(
+            {"INFO"},
+            f"Morphing '{source.name}' into '{target.name}': {matched} moved, "
+            f"{removed} faded out, {added} faded in",
+        )
+        return {"FINISHED"}
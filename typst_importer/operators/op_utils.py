@@ -13,6 +13,50 @@ def get_or_create_collection(name):
         return collection
 
 
+def duplicate_objects(objects, collection, suffix, keep_animation=True):
+    """Copy ``objects`` into ``collection`` through the data API.
+
+    The copies share their object data with the originals, like
+    ``Alt+D``, and are linked into ``collection`` only.  Unlike
+    ``bpy.ops.object.duplicate`` this needs no selection changes or
+    operator calls per object, so large selections are copied in one pass.
+
+    Args:
+        objects: The objects to copy.
+        collection: The collection that receives the copies.
+        suffix: Appended to each original name to name its copy.
+        keep_animation: Give each copy its own copy of the original's
+            Action.  If False, the copies have no animation data.
+
+    Returns:
+        list: The copies, in the order of ``objects``.
+    """
+    copies = []
+    for obj in objects:
+        copy = obj.copy()
+        copy.name = f"{obj.name}{suffix}"
+        animation_data = copy.animation_data
+        if animation_data is not None:
+            if not keep_animation:
+                copy.animation_data_clear()
+            elif animation_data.action is not None:
+                # Keys added to the copy must not reach the original.
+                animation_data.action = animation_data.action.copy()
+        collection.objects.link(copy)
+        copies.append(copy)
+    return copies
+
+
+def select_only(context, objects):
+    """Select exactly ``objects`` and make the first one active."""
+    for obj in context.selected_objects:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    if objects:
+        context.view_layer.objects.active = objects[0]
+
+
 def animation_fcurves(obj: bpy.types.Object):
     """Return the object's active Action f-curves across Blender action APIs."""
     if obj.animation_data is None or obj.animation_data.action is None:
@@ -32,3 +76,74 @@ def animation_fcurves(obj: bpy.types.Object):
             if channelbag is not None:
                 return channelbag.fcurves
     return ()
+
+
+# Enum values as read and written by ``foreach_get``/``foreach_set``.
+_INTERPOLATION_VALUES = {"CONSTANT": 0, "LINEAR": 1, "BEZIER": 2}
+_AUTO_CLAMPED_HANDLE = 4
+
+
+def ensure_fcurve(obj: bpy.types.Object, data_path: str, index: int = 0):
+    """Return the object's F-curve for ``data_path``, creating it if needed."""
+    animation_data = obj.animation_data or obj.animation_data_create()
+    if animation_data.action is None:
+        animation_data.action = bpy.data.actions.new(f"{obj.name}Action")
+    return animation_data.action.fcurve_ensure_for_datablock(
+        obj, data_path, index=index
+    )
+
+
+def insert_keyframes(
+    obj: bpy.types.Object,
+    data_path: str,
+    keyframes,
+    index: int = 0,
+    interpolation: str = "BEZIER",
+):
+    """Write ``(frame, value)`` keyframes to one F-curve in a single batch.
+
+    Unlike repeated ``keyframe_insert`` calls, the RNA path is resolved and the
+    F-curve looked up once, and all points are written with
+    ``keyframe_points.add`` and ``foreach_set``.  Existing keys on the same
+    frames are replaced.  Use ``"CONSTANT"`` interpolation for booleans and
+    other stepped values; the property's current value is left unchanged.
+
+    Returns:
+        The F-curve the keyframes were written to.
+    """
+    import numpy as np
+
+    fcurve = ensure_fcurve(obj, data_path, index)
+    keyframes = np.asarray(
+        [(float(frame), float(value)) for frame, value in keyframes],
+        dtype=np.float32,
+    ).reshape(-1, 2)
+    points = fcurve.keyframe_points
+    frames = set(keyframes[:, 0].tolist())
+    # Removing a key shifts the later ones down, so remove from the end.
+    replaced = [index for index, point in enumerate(points) if point.co.x in frames]
+    for index in reversed(replaced):
+        points.remove(points[index], fast=True)
+
+    existing = len(points)
+    total = existing + len(keyframes)
+    points.add(len(keyframes))
+
+    for attribute in ("co", "handle_left", "handle_right"):
+        values = np.empty(total * 2, dtype=np.float32)
+        points.foreach_get(attribute, values)
+        values[existing * 2 :] = keyframes.ravel()
+        points.foreach_set(attribute, values)
+    for attribute, value in (
+        ("interpolation", _INTERPOLATION_VALUES[interpolation]),
+        ("handle_left_type", _AUTO_CLAMPED_HANDLE),
+        ("handle_right_type", _AUTO_CLAMPED_HANDLE),
+    ):
+        values = np.empty(total, dtype=np.int32)
+        points.foreach_get(attribute, values)
+        values[existing:] = value
+        points.foreach_set(attribute, values)
+
+    # Sort the new points in and recalculate their automatic handles.
+    fcurve.update()
+    return fcurve
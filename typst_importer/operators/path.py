@@ -4,7 +4,13 @@ from ..node_groups import (
     modifier_input_data_path,
     set_modifier_input_value,
 )
-from .op_utils import animation_fcurves, get_or_create_collection
+from .op_utils import (
+    animation_fcurves,
+    duplicate_objects,
+    get_or_create_collection,
+    insert_keyframes,
+    select_only,
+)
 from ..operators.visibility import toggle_visibility
 
 # Helper functions
@@ -109,10 +115,11 @@ def configure_follow_path_animation(
         if fcurve.data_path == factor_data_path:
             fcurves.remove(fcurve)
 
-    set_modifier_input_value(modifier, "Factor", 0.0)
-    obj.keyframe_insert(factor_data_path, frame=current_frame)
-    set_modifier_input_value(modifier, "Factor", 1.0)
-    obj.keyframe_insert(factor_data_path, frame=current_frame + duration)
+    insert_keyframes(
+        obj,
+        factor_data_path,
+        [(current_frame, 0.0), (current_frame + duration, 1.0)],
+    )
     set_modifier_input_value(modifier, "Factor", 0.0)
 
 
@@ -199,31 +206,19 @@ class OBJECT_OT_follow_path(bpy.types.Operator):
         # Get or create the AnimationObjs collection
         target_collection = get_or_create_collection("AnimationObjs")
 
-        # Create a copy of the follower obj
-        bpy.ops.object.select_all(action="DESELECT")
-        follower_obj.select_set(True)
-        bpy.context.view_layer.objects.active = follower_obj
-        bpy.ops.object.duplicate()
-        burst_obj = bpy.context.active_object
+        # Create a copy of the follower obj in the AnimationObjs collection
+        name = follower_obj.name
+        (burst_obj,) = duplicate_objects([follower_obj], target_collection, "_burst")
         arise_obj = follower_obj
+        select_only(context, [burst_obj])
 
-        # Ensure the copy has a descriptive name
-        arise_obj.name = f"{follower_obj.name}_arise"
-        burst_obj.name = f"{follower_obj.name}_burst"
-
-        # Move the burst object to the AnimationObjs collection
-        # First remove from current collections
-        for collection in bpy.data.collections:
-            if burst_obj.name in collection.objects:
-                collection.objects.unlink(burst_obj)
-        
-        # Add to target collection
-        target_collection.objects.link(burst_obj)
+        # Ensure the original has a descriptive name
+        arise_obj.name = f"{name}_arise"
 
         # Create a geometry nodes modifier for the moving obj (for path following)
         burst_obj_modifier = burst_obj.modifiers.new(name="FollowPath", type="NODES")
 
-        # Always create a new geometry nodes group to avoid conflicts
+        # Every follower shares one group; the path and factor are modifier inputs
         geometry_nodes = create_follow_curve_node_group()
 
         # Assign the node group to the modifier
@@ -296,54 +291,29 @@ class OBJECT_OT_arc_and_follow(bpy.types.Operator):
         target_collection = get_or_create_collection("AnimationObjs")
 
         # Step 3: Set up the first object to follow the path
-        # Create a copy of the first object
-        bpy.ops.object.select_all(action="DESELECT")
-        first_obj.select_set(True)
-        bpy.context.view_layer.objects.active = first_obj
-        bpy.ops.object.duplicate()
-        arise_obj = first_obj
-        burst_obj = bpy.context.active_object
-
         # Create a common prefix for all related objects
         prefix = f"{first_obj.name}"
 
-        # Ensure the copy has a descriptive name
+        # Copy the first object, and the second object as its destination,
+        # into the AnimationObjs collection
+        burst_obj, conclude_obj = duplicate_objects(
+            [first_obj, second_obj], target_collection, ""
+        )
+        arise_obj = first_obj
+        select_only(context, [burst_obj])
+
+        # Ensure the objects have descriptive names
         arise_obj.name = f"{prefix}_a"
         burst_obj.name = f"{prefix}_b"
-
-        # Move the burst object to the AnimationObjs collection
-        # First remove from current collections
-        for collection in bpy.data.collections:
-            if burst_obj.name in collection.objects:
-                collection.objects.unlink(burst_obj)
-        
-        # Add to target collection
-        target_collection.objects.link(burst_obj)
-
-        # Create a copy of the second object at z=0
-        bpy.ops.object.select_all(action="DESELECT")
-        second_obj.select_set(True)
-        bpy.context.view_layer.objects.active = second_obj
-        bpy.ops.object.duplicate()
-        conclude_obj = bpy.context.active_object
         conclude_obj.name = f"{prefix}_c"
 
         # Place the destination object at z=0
         conclude_obj.location.z = 0
 
-        # Move the conclude object to the AnimationObjs collection
-        # First remove from current collections
-        for collection in bpy.data.collections:
-            if conclude_obj.name in collection.objects:
-                collection.objects.unlink(conclude_obj)
-        
-        # Add to target collection
-        target_collection.objects.link(conclude_obj)
-
         # Create a geometry nodes modifier for the moving obj (for path following)
         burst_obj_modifier = burst_obj.modifiers.new(name="FollowPath", type="NODES")
 
-        # Always create a new geometry nodes group to avoid conflicts
+        # Every follower shares one group; the path and factor are modifier inputs
         geometry_nodes = create_follow_curve_node_group()
 
         # Assign the node group to the modifier
@@ -3,8 +3,6 @@ from pathlib import Path
 import tempfile
 import time
 
-from ..typst_to_svg import typst_to_blender_curves
-
 
 DEFAULT_CUSTOM_HEADER = """#set page(width: auto, height: auto, margin: 0cm, fill: none)
 #set text(size: 50pt)
@@ -70,6 +68,8 @@ class ImportFromTextboxAsCurveOperator(ImportFromTextboxOperator):
     bl_label = "Import from Textbox as Curve"
 
     def import_typst(self, typst_file: Path, origin_to_char: bool = False):
+        from ..typst_to_svg import typst_to_blender_curves
+
         return typst_to_blender_curves(
             typst_file,
             convert_to_mesh=False,
@@ -83,6 +83,8 @@ class ImportFromTextboxAsMeshOperator(ImportFromTextboxOperator):
     bl_label = "Import from Textbox as Mesh"
 
     def import_typst(self, typst_file: Path, origin_to_char: bool = False):
+        from ..typst_to_svg import typst_to_blender_curves
+
         return typst_to_blender_curves(
             typst_file,
             convert_to_mesh=True,
@@ -96,6 +98,8 @@ class ImportFromTextboxAsGreasePencilOperator(ImportFromTextboxOperator):
     bl_label = "Import from Textbox as Grease Pencil"
 
     def import_typst(self, typst_file: Path, origin_to_char: bool = False):
+        from ..typst_to_svg import typst_to_blender_curves
+
         return typst_to_blender_curves(
             typst_file,
             convert_to_mesh=False,
@@ -110,6 +114,8 @@ class ImportFromTextboxAsUnfilledCurveOperator(ImportFromTextboxOperator):
     bl_label = "Import from Textbox as Unfilled Curve"
 
     def import_typst(self, typst_file: Path, origin_to_char: bool = False):
+        from ..typst_to_svg import typst_to_blender_curves
+
         return typst_to_blender_curves(
             typst_file,
             convert_to_mesh=False,
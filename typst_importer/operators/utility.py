@@ -1,7 +1,7 @@
 import bpy
 from .visibility import toggle_visibility
-from .op_utils import get_or_create_collection  
-from ..node_groups import set_modifier_input_value
+from .op_utils import duplicate_objects, get_or_create_collection, select_only
+from ..node_groups import merge_duplicate_node_groups
 
 
 
@@ -22,63 +22,50 @@ class OBJECT_OT_copy_without_keyframes(bpy.types.Operator):
 
     def execute(self, context):
         current_frame = context.scene.frame_current
-        copied_objects = []
         original_objects = list(context.selected_objects)  # Create a copy of the list
 
         # Get or create AnimationObjs collection
         target_collection = get_or_create_collection("AnimationObjs")
 
-        for obj in original_objects:
-            # Select only this object and deselect others
-            bpy.ops.object.select_all(action='DESELECT')
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-
-            # Duplicate the object
-            bpy.ops.object.duplicate()
-            new_obj = context.active_object
-            new_obj.name = f"{obj.name}_static"
-            
-            # Clear all animation data from the new object
-            if new_obj.animation_data:
-                new_obj.animation_data_clear()
-                
+        # Copy the whole selection without its animation data
+        copied_objects = duplicate_objects(
+            original_objects, target_collection, "_static", keep_animation=False
+        )
+
+        for obj, new_obj in zip(original_objects, copied_objects):
             # Clear all modifiers with keyframes
             for modifier in list(new_obj.modifiers):
                 # Check if this is a modifier we typically use for animation
                 if modifier.name in ["Visibility", "FollowPath"]:
                     new_obj.modifiers.remove(modifier)
 
-            # Add to the list of copied objects
-            copied_objects.append(new_obj)
-            
-            # Move the new object to the AnimationObjs collection
-            # First remove from current collections
-            for collection in bpy.data.collections:
-                if new_obj.name in collection.objects:
-                    collection.objects.unlink(new_obj)
-            
-            # Add to target collection
-            target_collection.objects.link(new_obj)
-
             # Toggle visibility of the original object to off
             toggle_visibility(obj, current_frame, make_visible=False)
-            
+
             # Make the new object visible right away
-            new_visibility_modifier = toggle_visibility(new_obj, current_frame, make_visible=True)
-            # Set initial visibility state to True for the new object
-            set_modifier_input_value(new_visibility_modifier, "Visibility", True)
+            toggle_visibility(
+                new_obj, current_frame, make_visible=True, display_state=True
+            )
 
         # Reselect all the new objects
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in copied_objects:
-            obj.select_set(True)
-        
-        if copied_objects:
-            context.view_layer.objects.active = copied_objects[0]
-        
+        select_only(context, copied_objects)
+
         self.report(
             {"INFO"},
             f"Created {len(copied_objects)} static copies in collection 'AnimationObjs'"
         )
         return {"FINISHED"}
+
+
+class FILE_OT_merge_typst_node_groups(bpy.types.Operator):
+    """Replace duplicate Visibility and Follow Path node groups with the shared
+    ones and remove the unused copies"""
+
+    bl_idname = "file.merge_typst_node_groups"
+    bl_label = "Merge Typst Node Groups"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        removed = merge_duplicate_node_groups()
+        self.report({"INFO"}, f"Removed {removed} duplicate node group(s)")
+        return {"FINISHED"}
@@ -4,21 +4,61 @@ from ..node_groups import (
     set_modifier_input_value,
     visibility_node_group,
 )
-from .op_utils import get_or_create_collection
+from .op_utils import (
+    duplicate_objects,
+    get_or_create_collection,
+    insert_keyframes,
+    select_only,
+)
+
+
+VISIBILITY_BACKENDS = ("MODIFIER", "HIDE")
+
 
+def visibility_backend(context=None):
+    """Return the scene's visibility backend, defaulting to ``"MODIFIER"``."""
+    scene = (context or bpy.context).scene
+    return getattr(scene, "typst_visibility_backend", "MODIFIER")
 
-def toggle_visibility(obj, current_frame, make_visible):
+
+def toggle_visibility(
+    obj, current_frame, make_visible, display_state=None, backend=None
+):
     """
-    Helper function to toggle visibility of an object using Geometry Nodes modifier.
+    Helper function to toggle visibility of an object at a frame.
 
     Args:
         obj: The object to toggle visibility for
         current_frame: The current frame in the timeline
         make_visible: Boolean indicating whether to make the object visible (True) or invisible (False)
+        display_state: Visibility shown after keying. Defaults to the state
+            before ``current_frame``.
+        backend: ``"MODIFIER"`` keys the Visibility input of a Geometry Nodes
+            modifier. ``"HIDE"`` keys ``hide_viewport`` and ``hide_render``
+            instead, which costs nothing per frame because hidden objects are
+            not evaluated. Defaults to the scene's ``typst_visibility_backend``.
 
     Returns:
-        The visibility modifier
+        The visibility modifier, or None with the ``"HIDE"`` backend
     """
+    backend = backend or visibility_backend()
+    if backend not in VISIBILITY_BACKENDS:
+        raise ValueError(f"Unknown visibility backend {backend!r}")
+    initial_state = not make_visible
+    if display_state is None:
+        display_state = initial_state
+
+    if backend == "HIDE":
+        # Keys hold the hidden flag, the inverse of the visibility state.
+        hidden = [
+            (current_frame - 1, not initial_state),
+            (current_frame, initial_state),
+        ]
+        for data_path in ("hide_viewport", "hide_render"):
+            insert_keyframes(obj, data_path, hidden, interpolation="CONSTANT")
+        obj.hide_viewport = obj.hide_render = not display_state
+        return None
+
     # Check if the object already has a visibility modifier
     visibility_modifier = None
     for modifier in obj.modifiers:
@@ -36,18 +76,15 @@ def toggle_visibility(obj, current_frame, make_visible):
         "Visibility",
     )
 
-    # Set initial state at current frame
-    initial_state = not make_visible
-    set_modifier_input_value(visibility_modifier, "Visibility", initial_state)
-    obj.keyframe_insert(visibility_data_path, frame=current_frame - 1)
-
-    # Set target state at next frame
-    target_state = make_visible
-    set_modifier_input_value(visibility_modifier, "Visibility", target_state)
-    obj.keyframe_insert(visibility_data_path, frame=current_frame)
+    # Switch from the initial to the target state at the current frame
+    insert_keyframes(
+        obj,
+        visibility_data_path,
+        [(current_frame - 1, initial_state), (current_frame, make_visible)],
+        interpolation="CONSTANT",
+    )
 
-    # Reset to initial state for display
-    set_modifier_input_value(visibility_modifier, "Visibility", initial_state)
+    set_modifier_input_value(visibility_modifier, "Visibility", display_state)
     return visibility_modifier
 
 
@@ -97,9 +134,8 @@ class OBJECT_OT_visibility_off(bpy.types.Operator):
         current_frame = context.scene.frame_current
 
         for obj in context.selected_objects:
-            new_visibility_modifier = toggle_visibility(obj, current_frame, False)
-            # Set initial visibility state to False for the object
-            set_modifier_input_value(new_visibility_modifier, "Visibility", False)
+            # Show the object as hidden right away
+            toggle_visibility(obj, current_frame, False, display_state=False)
 
         self.report(
             {"INFO"},
@@ -263,57 +299,24 @@ class OBJECT_OT_copy_to_plane(bpy.types.Operator):
         # Get or create the AnimationObjs collection
         target_collection = get_or_create_collection("AnimationObjs")
 
-        # Store selected objects
-        selected_objects = list(context.selected_objects)
-        created_objects = []
+        # Copy the whole selection into the AnimationObjs collection
+        created_objects = duplicate_objects(
+            list(context.selected_objects), target_collection, "_plane"
+        )
 
-        for obj in selected_objects:
-            # Deselect all objects
-            bpy.ops.object.select_all(action="DESELECT")
-            
-            # Select only this object
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-            
-            # Duplicate the object
-            bpy.ops.object.duplicate()
-            
-            # Get the newly created copy
-            copy_obj = context.active_object
-            copy_obj.name = f"{obj.name}_plane"
-            
+        for copy_obj in created_objects:
             # Set z coordinate to 0
             copy_obj.location.z = 0
-            
-            # Move the copy to the AnimationObjs collection
-            # First remove from current collections
-            for collection in bpy.data.collections:
-                if copy_obj.name in collection.objects:
-                    collection.objects.unlink(copy_obj)
-            
-            # Add to target collection
-            target_collection.objects.link(copy_obj)
-            
-            # Make the object visible with visibility modifier
-            new_visibility_modifier = toggle_visibility(copy_obj, current_frame, True)
-            # Set initial visibility state to True for the new object
-            set_modifier_input_value(new_visibility_modifier, "Visibility", True)
-            
-            # Ensure the opacity property exists
-            if "opacity" not in copy_obj:
-                copy_obj["opacity"] = 0.0
-            
+
+            # Make the object visible and show it right away
+            toggle_visibility(copy_obj, current_frame, True, display_state=True)
+
             # Set opacity to 1
             copy_obj["opacity"] = 1.0
-            copy_obj.keyframe_insert(data_path='["opacity"]', frame=current_frame)
-            
-            created_objects.append(copy_obj.name)
+            insert_keyframes(copy_obj, '["opacity"]', [(current_frame, 1.0)])
 
         # Select all the newly created objects
-        bpy.ops.object.select_all(action="DESELECT")
-        for obj_name in created_objects:
-            if obj_name in bpy.data.objects:
-                bpy.data.objects[obj_name].select_set(True)
+        select_only(context, created_objects)
 
         self.report(
             {"INFO"},
@@ -0,0 +1,247 @@
+"""Merge same-coloured SVG paths into compound paths before import.
+
+Joined imports used to create one curve object per glyph and then join them
+with ``bpy.ops.object.join``.  :func:`merge_svg_paths` instead rewrites the
+import SVG so that every group of paths sharing fill, fill rule and opacity
+becomes a single compound path, with each member's transform baked into its
+coordinates.  Blender's importer then creates one curve object per colour,
+and only those few objects are left to join.
+
+The merged path takes the place of the group's first member in document
+order, so paint-order markers for images keep their relative position.
+Paths under clips, masks or filters, paths with gradients, unconverted
+strokes, or CSS-styled documents are left untouched.
+"""
+
+import math
+
+from lxml import etree
+from svg.path import Arc, Close, CubicBezier, Line, Move, QuadraticBezier, parse_path
+
+from .svg_preprocessing import parse_svg_string
+from .svg_utils import (
+    MAT_IDENTITY,
+    ROOT_PARENT_STATE,
+    SKIP_TAGS,
+    element_state,
+    format_number,
+    mat_apply,
+    mat_inverse,
+    mat_mul,
+    parse_opacity,
+    parse_transform,
+    style_property,
+    svg_tag,
+    svg_viewport_matrix,
+)
+
+
+_PAINT_PROPERTIES = ("fill", "fill-opacity", "fill-rule", "stroke")
+_DEFAULT_PAINT = {"fill": "#000000", "fill-rule": "nonzero"}
+
+
+def _arc_to_cubics(arc):
+    """Return cubic ``(c1, c2, end)`` control points approximating an arc."""
+    radius = arc.radius * arc.radius_scale
+    rotation = math.radians(arc.rotation)
+    cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+
+    def ellipse_point(u, v):
+        x = u * radius.real
+        y = v * radius.imag
+        return complex(
+            cos_r * x - sin_r * y + arc.center.real,
+            sin_r * x + cos_r * y + arc.center.imag,
+        )
+
+    count = max(1, math.ceil(abs(arc.delta) / 90.0))
+    step = math.radians(arc.delta) / count
+    start = math.radians(arc.theta)
+    handle = 4.0 / 3.0 * math.tan(step / 4.0)
+    cubics = []
+    for index in range(count):
+        a0 = start + index * step
+        a1 = a0 + step
+        cos0, sin0 = math.cos(a0), math.sin(a0)
+        cos1, sin1 = math.cos(a1), math.sin(a1)
+        cubics.append(
+            (
+                ellipse_point(cos0 - handle * sin0, sin0 + handle * cos0),
+                ellipse_point(cos1 + handle * sin1, sin1 - handle * cos1),
+                ellipse_point(cos1, sin1),
+            )
+        )
+    # Land exactly on the authored end point.
+    c1, c2, _end = cubics[-1]
+    cubics[-1] = (c1, c2, arc.end)
+    return cubics
+
+
+def _transformed_path_data(d, matrix):
+    """Return ``d`` with ``matrix`` applied to every coordinate."""
+
+    def point(value):
+        x, y = mat_apply(matrix, (value.real, value.imag))
+        return f"{format_number(x)} {format_number(y)}"
+
+    commands = []
+    current = None
+    for segment in parse_path(d):
+        if isinstance(segment, Move):
+            commands.append(f"M {point(segment.end)}")
+            current = segment.end
+            continue
+        if isinstance(segment, Close):
+            commands.append("Z")
+            current = segment.end
+            continue
+        if current is None or segment.start != current:
+            commands.append(f"M {point(segment.start)}")
+        current = segment.end
+        if isinstance(segment, Line):
+            commands.append(f"L {point(segment.end)}")
+        elif isinstance(segment, QuadraticBezier):
+            commands.append(f"Q {point(segment.control)} {point(segment.end)}")
+        elif isinstance(segment, CubicBezier):
+            commands.append(
+                f"C {point(segment.control1)} {point(segment.control2)} "
+                f"{point(segment.end)}"
+            )
+        elif isinstance(segment, Arc):
+            if segment.start == segment.end:
+                continue
+            if segment.radius.real == 0 or segment.radius.imag == 0:
+                commands.append(f"L {point(segment.end)}")
+                continue
+            for c1, c2, end in _arc_to_cubics(segment):
+                commands.append(f"C {point(c1)} {point(c2)} {point(end)}")
+    return " ".join(commands)
+
+
+def _paint_key(paint, state):
+    """Return the merge key of a path, or ``None`` if it must stay separate."""
+    fill = paint["fill"].lower()
+    if fill in {"none", "currentcolor"} or fill.startswith("url("):
+        return None
+    stroke = paint.get("stroke")
+    if stroke is not None and stroke.lower() != "none":
+        return None
+    return (
+        fill,
+        paint["fill-rule"].lower(),
+        parse_opacity(paint.get("fill-opacity")),
+        state.opacity,
+    )
+
+
+def merge_svg_paths(svg_content, scene_scale_length=1.0):
+    """Return ``svg_content`` with same-paint paths merged into compound paths.
+
+    Coordinates are baked relative to the root viewport, which Blender still
+    applies on import.  Content that cannot be merged safely is returned
+    unchanged.
+    """
+    if svg_content.count("<path") < 2:
+        return svg_content
+    root = parse_svg_string(svg_content)
+    for el in root.iter():
+        if svg_tag(el) in {"style", "use"}:
+            # CSS selectors or unresolved references could depend on the
+            # document structure this pass rewrites.
+            return svg_content
+
+    _matrix, viewport = svg_viewport_matrix(
+        root, (0.0, 0.0), nested=False, scene_scale_length=scene_scale_length
+    )
+    root_state = element_state(root, ROOT_PARENT_STATE)
+    if root_state is None:
+        return svg_content
+    root_paint = dict(_DEFAULT_PAINT)
+    for name in _PAINT_PROPERTIES:
+        value = style_property(root, root_state.styles, name)
+        if value and value.strip().lower() != "inherit":
+            root_paint[name] = value.strip()
+
+    # key -> [(path, parent ctm, path ctm)] in document order.
+    groups = {}
+    stack = [
+        (child, MAT_IDENTITY, viewport, root_state, root_paint)
+        for child in reversed(root)
+    ]
+    while stack:
+        el, ctm, viewport, parent_state, parent_paint = stack.pop()
+        tag = svg_tag(el)
+        if tag is None or tag in SKIP_TAGS:
+            continue
+        state = element_state(el, parent_state)
+        if state is None:
+            continue
+
+        paint = parent_paint
+        for name in _PAINT_PROPERTIES:
+            value = style_property(el, state.styles, name)
+            if value and value.strip().lower() != "inherit":
+                if paint is parent_paint:
+                    paint = dict(parent_paint)
+                paint[name] = value.strip()
+
+        parent_ctm = ctm
+        transform = el.get("transform")
+        if transform:
+            ctm = mat_mul(ctm, parse_transform(transform))
+
+        if tag == "path":
+            key = _paint_key(paint, state)
+            if (
+                key is not None
+                and not state.effects
+                and state.visibility == "visible"
+                and el.get("d")
+            ):
+                groups.setdefault(key, []).append((el, parent_ctm, ctm))
+            continue
+
+        if tag == "svg":
+            viewport_matrix, viewport = svg_viewport_matrix(
+                el,
+                viewport,
+                nested=True,
+                scene_scale_length=scene_scale_length,
+            )
+            ctm = mat_mul(ctm, viewport_matrix)
+        elif tag not in {"g", "a"}:
+            continue
+        stack.extend(
+            (child, ctm, viewport, state, paint) for child in reversed(el)
+        )
+
+    merged = False
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        head, head_parent_ctm, _head_ctm = members[0]
+        try:
+            # The merged data lives in root coordinates; cancel the context
+            # the head path is nested in.
+            inverse = mat_inverse(head_parent_ctm)
+        except ValueError:
+            continue
+        try:
+            data = " ".join(
+                _transformed_path_data(el.get("d"), ctm) for el, _parent, ctm in members
+            )
+        except (ValueError, IndexError):
+            continue
+        head.set("d", data)
+        if inverse == MAT_IDENTITY:
+            head.attrib.pop("transform", None)
+        else:
+            values = " ".join(format_number(value) for value in inverse)
+            head.set("transform", f"matrix({values})")
+        for el, _parent, _ctm in members[1:]:
+            el.getparent().remove(el)
+        merged = True
+
+    if not merged:
+        return svg_content
+    return etree.tostring(root, encoding="unicode")
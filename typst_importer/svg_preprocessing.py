@@ -4,9 +4,8 @@ import math
 import re
 from svg.path import parse_path
 
-# SVG namespace used throughout.
-SVG_NS = "http://www.w3.org/2000/svg"
-NS_MAP = {"svg": SVG_NS, "xlink": "http://www.w3.org/1999/xlink"}
+from .svg_utils import NS_MAP, SVG_NS, format_number
+
 _FLOAT_RE = re.compile(r"[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?")
 _LENGTH_UNITS = {
     "": 1.0,
@@ -156,10 +155,6 @@ def _active_viewport(element):
     return viewport
 
 
-def _number(value):
-    return format(value, ".15g")
-
-
 def _ensure_unicode(xml_string):
     """
     Ensures the input XML string is a Unicode string without an XML encoding declaration.
@@ -303,7 +298,7 @@ def flatten_svg(svg_content):
                 if use_x != 0 or use_y != 0:
                     placement.set(
                         "transform",
-                        f"translate({_number(use_x)},{_number(use_y)})",
+                        f"translate({format_number(use_x)},{format_number(use_y)})",
                     )
                 target_group = etree.Element(f"{{{SVG_NS}}}g")
                 for attr_name, attr_value in target.items():
@@ -328,7 +323,8 @@ def flatten_svg(svg_content):
                 if target_x != 0 or target_y != 0:
                     target_position.set(
                         "transform",
-                        f"translate({_number(target_x)},{_number(target_y)})",
+                        f"translate({format_number(target_x)},"
+                        f"{format_number(target_y)})",
                     )
 
                 viewport_compensation = etree.Element(f"{{{SVG_NS}}}g")
@@ -337,12 +333,12 @@ def flatten_svg(svg_content):
                 if scale_x != 1.0 or scale_y != 1.0:
                     viewport_compensation.set(
                         "transform",
-                        f"scale({_number(scale_x)},{_number(scale_y)})",
+                        f"scale({format_number(scale_x)},{format_number(scale_y)})",
                     )
 
                 target_viewport = etree.Element(f"{{{SVG_NS}}}svg")
-                target_viewport.set("width", _number(width))
-                target_viewport.set("height", _number(height))
+                target_viewport.set("width", format_number(width))
+                target_viewport.set("height", format_number(height))
                 # ``overflow`` belongs to the viewport established when a
                 # <symbol> or nested <svg> is instantiated.  Leaving it on
                 # the surrounding group makes the synthetic viewport use the
@@ -382,8 +378,8 @@ def flatten_svg(svg_content):
                     correction.set(
                         "transform",
                         "matrix("
-                        f"{_number(scale_x)} 0 0 {_number(scale_y)} "
-                        f"{_number(translate_x)} {_number(translate_y)})",
+                        f"{format_number(scale_x)} 0 0 {format_number(scale_y)} "
+                        f"{format_number(translate_x)} {format_number(translate_y)})",
                     )
                     content_parent.append(correction)
                     content_parent = correction
@@ -0,0 +1,359 @@
+"""SVG helpers shared by the image extraction and path merging passes.
+
+Both passes walk the import SVG the way Blender's io_curve_svg does, so they
+agree on 2D affine matrices, lengths, viewports and the inherited
+presentation state (display, visibility, opacity and effects) of each
+element.
+"""
+
+import math
+import re
+
+from lxml import etree
+
+
+# SVG namespace used throughout.
+SVG_NS = "http://www.w3.org/2000/svg"
+NS_MAP = {"svg": SVG_NS, "xlink": "http://www.w3.org/1999/xlink"}
+
+# Same unit table as io_curve_svg (90 dpi user units).
+SVG_UNITS = {
+    "": 1.0,
+    "px": 1.0,
+    "in": 90.0,
+    "mm": 90.0 / 25.4,
+    "cm": 90.0 / 2.54,
+    "pt": 1.25,
+    "pc": 15.0,
+    "em": 1.0,
+    "ex": 1.0,
+}
+
+_FLOAT_RE = re.compile(r"[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?")
+_TRANSFORM_RE = re.compile(r"\s*([A-Za-z]+)\s*\((.*?)\)")
+
+
+# --- 2D affine matrices, stored as (a, b, c, d, e, f) like SVG matrix():
+#     x' = a*x + c*y + e
+#     y' = b*x + d*y + f
+
+MAT_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def mat_mul(m, n):
+    """Return matrix product ``m @ n`` (``n`` is applied first)."""
+    a1, b1, c1, d1, e1, f1 = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def mat_apply(m, point):
+    a, b, c, d, e, f = m
+    x, y = point
+    return (a * x + c * y + e, b * x + d * y + f)
+
+
+def mat_translate(tx, ty):
+    return (1.0, 0.0, 0.0, 1.0, tx, ty)
+
+
+def mat_scale(sx, sy):
+    return (sx, 0.0, 0.0, sy, 0.0, 0.0)
+
+
+def mat_inverse(m):
+    a, b, c, d, e, f = m
+    det = a * d - b * c
+    if det == 0:
+        raise ValueError("matrix is not invertible")
+    return (
+        d / det,
+        -b / det,
+        -c / det,
+        a / det,
+        (c * f - d * e) / det,
+        (b * e - a * f) / det,
+    )
+
+
+def parse_transform(transform):
+    """Parse an SVG transform list into a single affine matrix."""
+    m = MAT_IDENTITY
+    for match in _TRANSFORM_RE.finditer(transform):
+        func = match.group(1)
+        params = [float(p) for p in _FLOAT_RE.findall(match.group(2))]
+        if func == "matrix" and len(params) == 6:
+            t = tuple(params)
+        elif func == "translate" and params:
+            t = mat_translate(params[0], params[1] if len(params) > 1 else 0.0)
+        elif func == "scale" and params:
+            t = mat_scale(params[0], params[1] if len(params) > 1 else params[0])
+        elif func == "rotate" and params:
+            angle = math.radians(params[0])
+            rotation = (
+                math.cos(angle),
+                math.sin(angle),
+                -math.sin(angle),
+                math.cos(angle),
+                0.0,
+                0.0,
+            )
+            if len(params) >= 3:
+                cx, cy = params[1], params[2]
+                t = mat_mul(
+                    mat_mul(mat_translate(cx, cy), rotation),
+                    mat_translate(-cx, -cy),
+                )
+            else:
+                t = rotation
+        elif func == "skewX" and params:
+            t = (
+                1.0,
+                0.0,
+                math.tan(math.radians(params[0])),
+                1.0,
+                0.0,
+                0.0,
+            )
+        elif func == "skewY" and params:
+            t = (
+                1.0,
+                math.tan(math.radians(params[0])),
+                0.0,
+                1.0,
+                0.0,
+                0.0,
+            )
+        else:
+            continue
+        m = mat_mul(m, t)
+    return m
+
+
+def parse_coord(coord, size=0.0):
+    """Parse an SVG coordinate or length against the active viewport size."""
+    coord = coord.strip()
+    match = _FLOAT_RE.match(coord)
+    if not match:
+        return 0.0
+    value = float(match.group(0))
+    unit = coord[match.end() :].strip()
+    if unit == "%":
+        return float(size) / 100.0 * value
+    return value * SVG_UNITS.get(unit, 1.0)
+
+
+def _parse_viewbox(el):
+    raw = el.get("viewBox")
+    if not raw:
+        return None
+    values = [float(part) for part in _FLOAT_RE.findall(raw)]
+    if len(values) != 4:
+        return None
+    return tuple(values)
+
+
+def svg_viewport_matrix(el, parent_rect, nested, scene_scale_length=1.0):
+    """Replicate Blender io_curve_svg's SVG viewport matrix and child rect."""
+    parent_w, parent_h = parent_rect
+    x = parse_coord(el.get("x", "0"), parent_w)
+    y = parse_coord(el.get("y", "0"), parent_h)
+    width_attr = el.get("width")
+    height_attr = el.get("height")
+    width = parse_coord(width_attr, parent_w) if width_attr else parent_w
+    height = parse_coord(height_attr, parent_h) if height_attr else parent_h
+
+    matrix = mat_translate(x, y)
+    if nested and parent_w != 0 and parent_h != 0:
+        matrix = mat_mul(matrix, mat_scale(width / parent_w, height / parent_h))
+
+    viewbox = _parse_viewbox(el)
+    if viewbox is not None:
+        vx, vy, vw, vh = viewbox
+        if vw != 0 and vh != 0:
+            if nested or (width != 0 and height != 0):
+                scale = min(width / vw, height / vh)
+            else:
+                scale = 1.0
+                width, height = vw, vh
+            tx = (width - vw * scale) / 2.0
+            ty = (height - vh * scale) / 2.0
+            matrix = mat_mul(matrix, mat_translate(tx, ty))
+            matrix = mat_mul(matrix, mat_translate(-vx, -vy))
+            matrix = mat_mul(matrix, mat_scale(scale, scale))
+
+        unit = ""
+        if height_attr:
+            match = _FLOAT_RE.match(height_attr.strip())
+            if match:
+                unit = height_attr.strip()[match.end() :].strip()
+        if unit in ("cm", "mm", "in", "pt", "pc"):
+            unitscale = SVG_UNITS[unit] / 90.0 * 1000.0 / 39.3701
+            unitscale /= scene_scale_length or 1.0
+            matrix = mat_mul(matrix, mat_scale(unitscale, unitscale))
+
+        # This is a Blender importer convention, including for nested SVGs.
+        matrix = mat_mul(matrix, mat_translate(0.0, -vy - vh))
+        child_rect = (vw, vh)
+    else:
+        child_rect = (width, height)
+
+    return matrix, child_rect
+
+
+def format_number(value):
+    """Format a float for an SVG attribute without losing precision."""
+    return format(value, ".15g")
+
+
+_NO_STYLES = {}
+
+
+def _style_map(el):
+    style = el.get("style")
+    if not style:
+        return _NO_STYLES
+    declarations = {}
+    for declaration in style.split(";"):
+        if ":" not in declaration:
+            continue
+        key, value = declaration.split(":", 1)
+        important_match = re.search(
+            r"\s*!\s*important\s*$", value, flags=re.IGNORECASE
+        )
+        important = important_match is not None
+        if important_match:
+            value = value[: important_match.start()]
+        key = key.strip().lower()
+        previous = declarations.get(key)
+        if previous is None or important or not previous[1]:
+            declarations[key] = (value.strip(), important)
+    return {key: value for key, (value, _important) in declarations.items()}
+
+
+def style_property(el, styles, name):
+    """Return a property from the ``style`` map or else the attribute."""
+    return styles.get(name, el.get(name))
+
+
+def parse_opacity(value):
+    """Parse an opacity number or percentage, clamped to ``[0, 1]``."""
+    if value is None or value.strip().lower() == "inherit":
+        return 1.0
+    raw = value.strip()
+    try:
+        parsed = float(raw[:-1]) / 100.0 if raw.endswith("%") else float(raw)
+    except ValueError:
+        return 1.0
+    return max(0.0, min(1.0, parsed))
+
+
+class ElementState:
+    """Inherited presentation state of one displayed element."""
+
+    __slots__ = (
+        "display",
+        "visibility",
+        "opacity",
+        "local_opacity",
+        "effects",
+        "styles",
+    )
+
+    def __init__(self, display, visibility, opacity, local_opacity, effects, styles):
+        self.display = display
+        self.visibility = visibility
+        self.opacity = opacity
+        self.local_opacity = local_opacity
+        self.effects = effects
+        self.styles = styles
+
+
+ROOT_PARENT_STATE = ElementState(
+    "inline", "visible", 1.0, 1.0, frozenset(), _NO_STYLES
+)
+_EFFECT_PROPERTIES = ("clip-path", "mask", "filter")
+
+
+def element_state(el, parent_state):
+    """Return the element's state, or ``None`` when it is not displayed."""
+    styles = _style_map(el)
+    display_value = (style_property(el, styles, "display") or "inline").strip().lower()
+    if display_value == "inherit":
+        display = parent_state.display
+    elif display_value in {"initial", "unset", "revert", "revert-layer"}:
+        display = "inline"
+    else:
+        display = display_value
+    if display == "none":
+        return None
+
+    visibility_value = style_property(el, styles, "visibility")
+    visibility = parent_state.visibility
+    if visibility_value:
+        visibility_value = visibility_value.strip().lower()
+        if visibility_value in {"initial", "revert", "revert-layer"}:
+            visibility = "visible"
+        elif visibility_value not in {"inherit", "unset"}:
+            visibility = visibility_value
+
+    opacity_value = style_property(el, styles, "opacity")
+    if opacity_value:
+        opacity_value = opacity_value.strip().lower()
+    if opacity_value == "inherit":
+        local_opacity = parent_state.local_opacity
+    elif opacity_value in {"initial", "unset", "revert", "revert-layer"}:
+        local_opacity = 1.0
+    else:
+        local_opacity = parse_opacity(opacity_value)
+
+    # The parent's set is shared unless this element adds an effect.
+    effects = parent_state.effects
+    for name in _EFFECT_PROPERTIES:
+        if name in effects:
+            continue
+        value = style_property(el, styles, name)
+        if value and value.strip().lower() != "none":
+            effects = effects | {name}
+
+    return ElementState(
+        display,
+        visibility,
+        parent_state.opacity * local_opacity,
+        local_opacity,
+        effects,
+        styles,
+    )
+
+
+# Definition-only and otherwise non-rendered containers.
+SKIP_TAGS = {
+    "defs",
+    "symbol",
+    "clipPath",
+    "mask",
+    "marker",
+    "pattern",
+    "switch",
+    "foreignObject",
+    "style",
+    "script",
+    "metadata",
+}
+
+
+def svg_tag(el):
+    """Return the local name of an SVG element, or ``None`` for anything else."""
+    if not isinstance(el.tag, str):
+        return None
+    qname = etree.QName(el.tag)
+    if qname.namespace not in (None, SVG_NS):
+        return None
+    return qname.localname
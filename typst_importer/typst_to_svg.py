@@ -2,37 +2,50 @@ from pathlib import Path
 import tempfile
 from typing import Optional, Tuple
 import importlib
+import math
 import os
+import re
+import shutil
 
-from mathutils import Matrix
+from mathutils import Matrix, Vector
 import bpy
+import numpy as np
 import typst
-import databpy as db
-from nodebpy import shader as s
 
 from .node_groups import (
     DEFAULT_GREASE_PENCIL_STROKE_RADIUS,
+    GLYPH_INSTANCES_NODE_GROUP,
+    INDEX_LABELS_NODE_GROUP,
+    add_glyph_reveal_modifier,
     add_grease_pencil_stroke_radius_modifier,
+    bake_grease_pencil_stroke_radius as _bake_stroke_radius,
+    create_glyph_instances_node_group,
+    create_index_labels_node_group,
+    set_modifier_input_value,
 )
 from .svg_preprocessing import preprocess_svg
+from .glyph_library import adopt_glyphs
+from .path_merge import merge_svg_paths
+from .image_atlas import build_image_atlases
+from .image_store import resolve_store_directory
+from .material_registry import (
+    EMISSION_VARIANT,
+    GREASE_PENCIL_VARIANT,
+    INSTANCE_ATTRIBUTE_VARIANT,
+    OBJECT_COLOR_VARIANT,
+    lookup_material,
+    material_key,
+    register_material,
+    shared_material,
+)
 from .image_import import (
     create_image_planes,
+    externalize_svg_images,
     finalize_paint_order,
+    fold_svg_scale,
     prepare_svg_images,
 )
 
-# Register the property for collections
-bpy.types.Collection.processed_svg = bpy.props.StringProperty(
-    name="Processed SVG",
-    description="Processed SVG content from Typst",
-)
-
-# Store the most recently generated processed SVG on the scene for easy export
-bpy.types.Scene.typst_last_processed_svg = bpy.props.StringProperty(
-    name="Last Processed SVG",
-    description="Most recently generated processed SVG from Typst",
-)
-
 
 
 def move_objects(objs, target_collection: bpy.types.Collection) -> None:
@@ -54,122 +67,97 @@ def move_objects(objs, target_collection: bpy.types.Collection) -> None:
         target_collection.objects.link(obj)
 
 
-def _snapshot_svg_import_state():
-    """Capture Blender data created by one Typst SVG import transaction."""
+def _new_svg_import_journal():
+    """Start a journal of the Blender data created by one Typst SVG import.
+
+    Each import step records the datablocks it creates, so cleanup and
+    rollback only ever visit this import's data. Their cost no longer grows
+    with the rest of the file.
+    """
     return {
-        "collections": set(bpy.data.collections),
-        "objects": set(bpy.data.objects),
-        "curves": set(bpy.data.curves),
-        "meshes": set(bpy.data.meshes),
-        "materials": set(bpy.data.materials),
-        "images": set(bpy.data.images),
-        "owned_collections": set(),
+        "collections": set(),
+        "objects": set(),
+        "meshes": set(),
+        "materials": set(),
+        "images": set(),
     }
 
 
-def _rollback_svg_import_state(before) -> None:
-    """Remove only data created by a failed Typst SVG import."""
-    owned_collections = set()
+def _is_alive(id_data) -> bool:
+    """Return whether a Python reference still points at a datablock."""
+    try:
+        id_data.name
+    except ReferenceError:
+        return False
+    return True
 
-    def collect_collection(collection):
-        if collection in owned_collections:
-            return
-        owned_collections.add(collection)
-        for child in collection.children:
-            if child not in before["collections"]:
-                collect_collection(child)
 
-    for collection in before["owned_collections"]:
-        if collection.name in bpy.data.collections:
-            collect_collection(collection)
+def _rollback_svg_import_state(journal) -> None:
+    """Remove only data created by a failed Typst SVG import.
 
-    new_objects = set(bpy.data.objects) - before["objects"]
+    Collections are removed only when journaled; child collections the user
+    added to them are kept, along with their objects.
+    """
+    owned_collections = {
+        collection for collection in journal["collections"] if _is_alive(collection)
+    }
     owned_objects = {
-        obj
-        for collection in owned_collections
-        for obj in collection.objects
-        if obj in new_objects
+        obj for collection in owned_collections for obj in collection.objects
     }
-    owned_objects.update(
-        obj for obj in new_objects if obj.get("typst_svg_image_object")
-    )
+    owned_objects.update(obj for obj in journal["objects"] if _is_alive(obj))
 
-    owned_meshes = set()
-    owned_curves = set()
-    owned_materials = set()
-    owned_images = set()
+    owned_data = set()
+    owned_materials = {item for item in journal["materials"] if _is_alive(item)}
+    owned_images = {item for item in journal["images"] if _is_alive(item)}
+    owned_data.update(item for item in journal["meshes"] if _is_alive(item))
     for obj in owned_objects:
         data = obj.data
-        if isinstance(data, bpy.types.Mesh):
-            owned_meshes.add(data)
-        elif isinstance(data, bpy.types.Curve):
-            owned_curves.add(data)
-        if data is not None and hasattr(data, "materials"):
-            owned_materials.update(
-                material for material in data.materials if material is not None
-            )
-
+        if data is None:
+            continue
+        owned_data.add(data)
+        owned_materials.update(
+            material
+            for material in getattr(data, "materials", ())
+            if material is not None
+        )
     for material in owned_materials:
-        if not material.use_nodes or material.node_tree is None:
+        if material.node_tree is None:
             continue
-        for node in material.node_tree.nodes:
-            image = getattr(node, "image", None)
-            if image is not None:
-                owned_images.add(image)
-
-    for obj in owned_objects:
-        bpy.data.objects.remove(obj, do_unlink=True)
-    for collection in tuple(owned_collections):
-        if collection in bpy.data.collections.values():
-            bpy.data.collections.remove(collection)
-
-    owned_meshes.update(
-        mesh
-        for mesh in set(bpy.data.meshes) - before["meshes"]
-        if mesh.get("typst_svg_image_mesh")
-    )
-    owned_materials.update(
-        material
-        for material in set(bpy.data.materials) - before["materials"]
-        if material.get("typst_svg_image_material")
-        or material.get("typst_svg_blender_material")
-    )
-    owned_images.update(
-        image
-        for image in set(bpy.data.images) - before["images"]
-        if image.get("typst_svg_source_hash")
-    )
+        owned_images.update(
+            node.image
+            for node in material.node_tree.nodes
+            if getattr(node, "image", None) is not None
+        )
 
-    for mesh in owned_meshes:
-        if mesh not in before["meshes"] and mesh.users == 0:
-            bpy.data.meshes.remove(mesh)
-    for curve in owned_curves:
-        if curve not in before["curves"] and curve.users == 0:
-            bpy.data.curves.remove(curve)
-    for material in owned_materials:
-        if material not in before["materials"] and material.users == 0:
-            bpy.data.materials.remove(material)
-    for image in owned_images:
-        if image not in before["images"] and image.users == 0:
-            bpy.data.images.remove(image)
+    bpy.data.batch_remove(owned_objects)
+    bpy.data.batch_remove(owned_collections)
+    # Remove users before what they use; data still used elsewhere is kept.
+    for owned in (owned_data, owned_materials, owned_images):
+        bpy.data.batch_remove([item for item in owned if item.users == 0])
 
 
-def _remove_unused_svg_materials(before) -> None:
+def _remove_unused_svg_materials(journal) -> None:
     """Clean importer-owned materials made obsolete by curve deduplication."""
-    for material in tuple(set(bpy.data.materials) - before["materials"]):
-        if material.users == 0 and material.get("typst_svg_blender_material"):
+    for material in tuple(journal["materials"]):
+        if not _is_alive(material):
+            journal["materials"].discard(material)
+        elif material.users == 0 and material.get("typst_svg_blender_material"):
+            journal["materials"].discard(material)
             bpy.data.materials.remove(material)
 
 
-def _import_marked_svg(svg_content, import_state) -> bpy.types.Collection:
-    """Import temporary SVG text and track only the collection it creates."""
+def _import_marked_svg(svg_content, journal) -> bpy.types.Collection:
+    """Import temporary SVG text and journal the collection and materials.
+
+    io_curve_svg creates a fresh material per color for every import, so each
+    material handed out by ``SVGGetMaterial`` belongs to this import.
+    """
     temporary = tempfile.NamedTemporaryFile(
         mode="w", suffix=".svg", encoding="utf-8", delete=False
     )
     try:
         temporary.write(svg_content)
         temporary.close()
-        collections_before = set(bpy.context.scene.collection.children)
         material_hook = None
         try:
             svg_import_module = importlib.import_module("io_curve_svg.import_svg")
@@ -177,11 +165,9 @@ def _import_marked_svg(svg_content, import_state) -> bpy.types.Collection:
 
             def tracked_get_material(color, import_context):
                 material = original_get_material(color, import_context)
-                if (
-                    material is not None
-                    and material not in import_state["materials"]
-                ):
+                if material is not None and material not in journal["materials"]:
                     material["typst_svg_blender_material"] = True
+                    journal["materials"].add(material)
                 return material
 
             svg_import_module.SVGGetMaterial = tracked_get_material
@@ -191,18 +177,12 @@ def _import_marked_svg(svg_content, import_state) -> bpy.types.Collection:
         try:
             bpy.ops.import_curve.svg(filepath=temporary.name)
         finally:
-            source_name = Path(temporary.name).name
-            imported_collection = next(
-                (
-                    collection
-                    for collection in bpy.context.scene.collection.children
-                    if collection not in collections_before
-                    and collection.name == source_name
-                ),
-                None,
+            # The importer names its collection after the uniquely named file.
+            imported_collection = bpy.data.collections.get(
+                Path(temporary.name).name
             )
             if imported_collection is not None:
-                import_state["owned_collections"].add(imported_collection)
+                journal["collections"].add(imported_collection)
             if material_hook is not None:
                 module, original, tracked = material_hook
                 if module.SVGGetMaterial is tracked:
@@ -214,72 +194,247 @@ def _import_marked_svg(svg_content, import_state) -> bpy.types.Collection:
         except OSError:
             pass
 
-    if not import_state["owned_collections"]:
+    if imported_collection is None:
         raise RuntimeError("Failed to import SVG file")
-    return next(iter(import_state["owned_collections"]))
+    return imported_collection
         
 
 # Core object and material setup functions
 def setup_object(obj: bpy.types.Object, scale_factor: float = 200) -> None:
-    """Setup individual object properties."""
+    """Scale an object's data and give it an opacity property.
+
+    The importer folds the scale into the SVG before Blender reads it and only
+    falls back to this geometry pass when :func:`fold_svg_scale` cannot.
+    """
     obj.data.transform(Matrix.Scale(scale_factor, 4))
-    obj["opacity"] = 1.0
-    obj.id_properties_ui("opacity").update(min=0.0, max=1.0, step=0.1)
+    add_opacity_properties((obj,))
+
+
+def add_opacity_properties(objects) -> None:
+    """Add the 0-1 ``opacity`` property read by the importer materials.
+
+    The slider limits come from the ``Object.opacity`` declaration, so only
+    values are written.  A collection's ``objects`` are written in one
+    ``foreach_set``, keeping values already set (image planes carry their
+    SVG opacity); other sequences are set to 1.0 object by object.
+    """
+    if isinstance(objects, bpy.types.bpy_prop_collection):
+        values = [1.0] * len(objects)
+        objects.foreach_get("opacity", values)
+        objects.foreach_set("opacity", values)
+        return
+    for obj in objects:
+        obj["opacity"] = 1.0
+
+
+_MATERIAL_TEMPLATE_NAME = ".TypstEmissionTemplate"
+_MATERIAL_TEMPLATE_MARKER_KEY = "typst_material_template"
+_MATERIAL_TEMPLATE_MARKER = "typst_importer.emission.v1"
+
+
+def _build_material_template() -> bpy.types.Material:
+    mat = bpy.data.materials.new(name=_MATERIAL_TEMPLATE_NAME)
+    mat[_MATERIAL_TEMPLATE_MARKER_KEY] = _MATERIAL_TEMPLATE_MARKER
+    mat.use_nodes = True
+    mat.blend_method = "BLEND"
+
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+
+    attribute = nodes.new(type="ShaderNodeAttribute")
+    attribute.attribute_name = "opacity"
+    attribute.attribute_type = "OBJECT"
+    transparent = nodes.new(type="ShaderNodeBsdfTransparent")
+    emission = nodes.new(type="ShaderNodeEmission")
+    emission.inputs["Strength"].default_value = 1.0
+    mix_shader = nodes.new(type="ShaderNodeMixShader")
+    output = nodes.new(type="ShaderNodeOutputMaterial")
+    output.is_active_output = True
+
+    attribute.location = (-300, 300)
+    transparent.location = (-300, 100)
+    emission.location = (-300, 0)
+    mix_shader.location = (0, 100)
+    output.location = (300, 100)
+
+    links.new(attribute.outputs["Fac"], mix_shader.inputs["Fac"])
+    links.new(transparent.outputs[0], mix_shader.inputs[1])
+    links.new(emission.outputs[0], mix_shader.inputs[2])
+    links.new(mix_shader.outputs[0], output.inputs["Surface"])
+    return mat
+
+
+def _material_template() -> bpy.types.Material:
+    """Return the hidden opacity-material template, building it once."""
+    template = bpy.data.materials.get(_MATERIAL_TEMPLATE_NAME)
+    if (
+        template is not None
+        and template.get(_MATERIAL_TEMPLATE_MARKER_KEY) == _MATERIAL_TEMPLATE_MARKER
+    ):
+        return template
+    for template in bpy.data.materials:
+        if template.get(_MATERIAL_TEMPLATE_MARKER_KEY) == _MATERIAL_TEMPLATE_MARKER:
+            return template
+    return _build_material_template()
 
 
 def create_material(color, name: str = "") -> bpy.types.Material:
-    """Create a new material with nodes setup for opacity."""
-    # Check if material with this name already exists
-    existing_mat = bpy.data.materials.get(name)
-    if existing_mat:
-        # Blender's native Curve -> Grease Pencil conversion reads the viewport
-        # color rather than the shader node color.
-        existing_mat.diffuse_color = color
-        return existing_mat
+    """Create a new material with nodes setup for opacity.
 
-    mat = bpy.data.materials.new(name=name)
+    The node tree is copied from a hidden template and only the colour is
+    patched. Use :func:`color_material` to reuse the shared material of a
+    colour.
+    """
+    mat = _material_template().copy()
+    mat.name = name
+    del mat[_MATERIAL_TEMPLATE_MARKER_KEY]
     # Keep the viewport color in sync with the emission shader. This is also the
     # color used by Blender 5.2 when converting a Curve material to a native
     # Grease Pencil material.
     mat.diffuse_color = color
+    mat.node_tree.nodes["Emission"].inputs["Color"].default_value = color
+    return mat
+
+
+def _hex_color(color) -> str:
+    return "".join(
+        f"{int(max(0.0, min(1.0, component)) * 255):02x}" for component in color[:3]
+    )
+
+
+def color_material(color) -> bpy.types.Material:
+    """Return the shared opacity material for an exact RGBA colour.
+
+    Materials are shared across collections and imports through
+    :mod:`.material_registry`, so every import of black text resolves to the
+    same material.
+    """
+    color = tuple(color)
+    return shared_material(
+        material_key(EMISSION_VARIANT, color),
+        lambda: create_material(color, f"Mat_#{_hex_color(color)}"),
+    )
+
+
+def create_object_color_material(
+    name: str = "TypstObjectColor",
+) -> bpy.types.Material:
+    """Create an opacity material that takes its colour from ``Object.color``.
+
+    All glyphs share this one material, so the number of shaders to compile
+    and draw batches stays the same however many colours a document uses.
+    """
+    mat = bpy.data.materials.new(name=name)
     mat.use_nodes = True
     mat.blend_method = "BLEND"
 
-    mat.node_tree.nodes.clear()
-    with s.tree(mat.node_tree, arrange="sugiyama") as tree:
-        opacity = s.Attribute.object("opacity")
-        mixed = s.MixShader(
-            fac=opacity.o.fac,
-            shader=s.TransparentBSDF(),
-            shader_001=s.Emission(color=color, strength=1.0),
-        )
-        s.MaterialOutput(surface=mixed, is_active_output=True)
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+
+    object_info = nodes.new(type="ShaderNodeObjectInfo")
+    attribute = nodes.new(type="ShaderNodeAttribute")
+    attribute.attribute_name = "opacity"
+    attribute.attribute_type = "OBJECT"
+    transparent = nodes.new(type="ShaderNodeBsdfTransparent")
+    emission = nodes.new(type="ShaderNodeEmission")
+    emission.inputs["Strength"].default_value = 1.0
+    mix_shader = nodes.new(type="ShaderNodeMixShader")
+    output = nodes.new(type="ShaderNodeOutputMaterial")
+
+    attribute.location = (-300, 300)
+    object_info.location = (-550, 0)
+    transparent.location = (-300, 100)
+    emission.location = (-300, 0)
+    mix_shader.location = (0, 100)
+    output.location = (300, 100)
+
+    links.new(object_info.outputs["Color"], emission.inputs["Color"])
+    links.new(attribute.outputs["Fac"], mix_shader.inputs["Fac"])
+    links.new(transparent.outputs[0], mix_shader.inputs[1])
+    links.new(emission.outputs[0], mix_shader.inputs[2])
+    links.new(mix_shader.outputs[0], output.inputs["Surface"])
+    return mat
 
-        tree.node_positions = {
-            "Attribute": (-300, 300),
-            "Transparent BSDF": (-300, 100),
-            "Emission": (-300, 0),
-            "Mix Shader": (0, 100),
-            "Material Output": (300, 100),
-        }
 
+def create_instance_attribute_material(
+    name: str = "TypstInstanceColor",
+) -> bpy.types.Material:
+    """Create an opacity material that reads ``color`` and ``opacity`` from
+    the instancer.
+
+    Used by single-object imports, where every glyph is a Geometry Nodes
+    instance carrying its colour and opacity as point attributes.
+    """
+    mat = bpy.data.materials.new(name=name)
+    mat.use_nodes = True
+    mat.blend_method = "BLEND"
+
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+
+    color = nodes.new(type="ShaderNodeAttribute")
+    color.attribute_name = "color"
+    color.attribute_type = "INSTANCER"
+    attribute = nodes.new(type="ShaderNodeAttribute")
+    attribute.attribute_name = "opacity"
+    attribute.attribute_type = "INSTANCER"
+    transparent = nodes.new(type="ShaderNodeBsdfTransparent")
+    emission = nodes.new(type="ShaderNodeEmission")
+    emission.inputs["Strength"].default_value = 1.0
+    mix_shader = nodes.new(type="ShaderNodeMixShader")
+    output = nodes.new(type="ShaderNodeOutputMaterial")
+
+    attribute.location = (-300, 300)
+    color.location = (-550, 0)
+    transparent.location = (-300, 100)
+    emission.location = (-300, 0)
+    mix_shader.location = (0, 100)
+    output.location = (300, 100)
+
+    links.new(color.outputs["Color"], emission.inputs["Color"])
+    links.new(attribute.outputs["Fac"], mix_shader.inputs["Fac"])
+    links.new(transparent.outputs[0], mix_shader.inputs[1])
+    links.new(emission.outputs[0], mix_shader.inputs[2])
+    links.new(mix_shader.outputs[0], output.inputs["Surface"])
     return mat
 
 
+def use_object_color_material(collection: bpy.types.Collection) -> None:
+    """Move curve fill colours to ``Object.color`` and share one material.
+
+    Mesh conversion keeps both. Grease Pencil conversion and curve joining
+    need per-colour materials, so the importer does not use this with them.
+    """
+    shared = shared_material(
+        material_key(OBJECT_COLOR_VARIANT), create_object_color_material
+    )
+    replaced = set()
+    for obj in collection.objects:
+        if obj.type != "CURVE" or not obj.data.materials:
+            continue
+        material = obj.data.materials[0]
+        if material is None or material == shared:
+            continue
+        obj.color = material.diffuse_color
+        obj.data.materials[0] = shared
+        replaced.add(material)
+
+    for material in replaced:
+        if material.users == 0:
+            bpy.data.materials.remove(material)
+
+
 def deduplicate_materials(collection: bpy.types.Collection) -> None:
     """
-    Deduplicate materials in a collection by reusing identical materials and giving them descriptive names.
+    Replace imported curve materials with the shared material of their colour.
 
     Args:
         collection: The collection containing objects whose materials need deduplication
     """
-
-    # # Clean up any remaining unused materials that might have been created before
-    # for _ in range(3):  # Run multiple times to ensure all orphaned data is removed
-    #     bpy.ops.outliner.orphans_purge(do_recursive=True) #TODO : not very tested, and might delete some materials unintended
-
-    materials_dict = {}
-
+    replaced = set()
     for obj in collection.objects:
         if obj.type != "CURVE" or not obj.data.materials:
             continue
@@ -287,30 +442,16 @@ def deduplicate_materials(collection: bpy.types.Collection) -> None:
         current_mat = obj.data.materials[0]
         if current_mat is None:
             continue
-        mat_key = tuple(current_mat.diffuse_color)
-
-        if mat_key in materials_dict:
-            obj.data.materials.clear()
-            obj.data.materials.append(materials_dict[mat_key])
-        else:
-            rgb = current_mat.diffuse_color[:3]
-            hex_color = "".join(f"{int(c*255):02x}" for c in rgb)
-            mat_name = f"Mat{len(materials_dict)}_#{hex_color}"
-
-            # Check if material already exists in Blender
-            existing_mat = bpy.data.materials.get(mat_name)
-            if existing_mat:
-                new_mat = existing_mat
-            else:
-                new_mat = create_material(current_mat.diffuse_color, mat_name)
-
-            materials_dict[mat_key] = new_mat
-
-            obj.data.materials.clear()
-            obj.data.materials.append(new_mat)
+        shared = color_material(current_mat.diffuse_color)
+        if shared == current_mat:
+            continue
+        obj.data.materials.clear()
+        obj.data.materials.append(shared)
+        replaced.add(current_mat)
 
-            if current_mat.users == 0:
-                bpy.data.materials.remove(current_mat)
+    for material in replaced:
+        if material.users == 0:
+            bpy.data.materials.remove(material)
 
     # Do not purge Blender-wide orphaned data here. Importing Typst content
     # must not remove unused datablocks that belong to the current scene.
@@ -330,25 +471,198 @@ def _join_curves(collection: bpy.types.Collection, name: str) -> None:
     bpy.context.active_object.name = name
 
 
+def _object_points(obj: bpy.types.Object) -> Optional[np.ndarray]:
+    """Return the control points, vertices or stroke points of an object."""
+    data = obj.data
+    if obj.type == "MESH":
+        points = np.empty(len(data.vertices) * 3, dtype=np.float32)
+        data.vertices.foreach_get("co", points)
+        return points.reshape(-1, 3)
+    if obj.type == "CURVE":
+        chunks = []
+        for spline in data.splines:
+            if spline.type == "BEZIER":
+                co = np.empty(len(spline.bezier_points) * 3, dtype=np.float32)
+                spline.bezier_points.foreach_get("co", co)
+                chunks.append(co.reshape(-1, 3))
+            else:
+                co = np.empty(len(spline.points) * 4, dtype=np.float32)
+                spline.points.foreach_get("co", co)
+                chunks.append(co.reshape(-1, 4)[:, :3])
+        return np.concatenate(chunks) if chunks else None
+    if obj.type == "GREASEPENCIL":
+        chunks = []
+        for drawing in _grease_pencil_drawings(data):
+            position = drawing.attributes.get("position")
+            if position is None or not len(position.data):
+                continue
+            co = np.empty(len(position.data) * 3, dtype=np.float32)
+            position.data.foreach_get("vector", co)
+            chunks.append(co.reshape(-1, 3))
+        return np.concatenate(chunks) if chunks else None
+    return None
+
+
+def _grease_pencil_drawings(data):
+    for layer in data.layers:
+        for frame in layer.frames:
+            if frame.drawing is not None:
+                yield frame.drawing
+
+
+def _shift_object_data(obj: bpy.types.Object, offset: Vector) -> None:
+    """Move an object's geometry by ``-offset`` in its local space."""
+    data = obj.data
+    if obj.type in {"MESH", "CURVE"}:
+        data.transform(Matrix.Translation(-offset))
+        return
+    for drawing in _grease_pencil_drawings(data):
+        position = drawing.attributes.get("position")
+        if position is None or not len(position.data):
+            continue
+        co = np.empty(len(position.data) * 3, dtype=np.float32)
+        position.data.foreach_get("vector", co)
+        co = co.reshape(-1, 3)
+        co -= np.asarray(offset, dtype=np.float32)
+        position.data.foreach_set("vector", co.ravel())
+        drawing.tag_positions_changed()
+
+
 def _set_origins_to_geometry(collection: bpy.types.Collection) -> None:
-    """Helper function to set object origins to geometry."""
-    objects = list(collection.objects)
-    if not objects:
+    """Move each object's origin to the median of its points.
+
+    Matches ``origin_set(type="ORIGIN_GEOMETRY", center="MEDIAN")``: curves use
+    their control points, meshes their vertices and Grease Pencil objects
+    their stroke points. Geometry is shifted in bulk and ``location``
+    compensates, so no operator or mode switch is involved.
+    """
+    for obj in collection.objects:
+        _centre_object(obj)
+
+
+def _centre_object(obj: bpy.types.Object) -> None:
+    """Move one object's origin to the median of its points."""
+    # Shifting shared data would move every other user as well.
+    if obj.data is None or obj.data.users > 1:
+        return
+    points = _object_points(obj)
+    if points is None or not len(points):
         return
+    offset = Vector(points.mean(axis=0, dtype=np.float64).tolist())
+    if offset.length_squared == 0.0:
+        return
+    _shift_object_data(obj, offset)
+    obj.location += obj.matrix_basis.to_3x3() @ offset
 
-    bpy.ops.object.select_all(action="DESELECT")
-    bpy.context.view_layer.objects.active = objects[0]
-    bpy.ops.object.mode_set(mode="OBJECT")
 
-    # origin_set already handles every selected editable object per-object,
-    # so one batched call replaces a per-object operator loop.
-    with bpy.context.temp_override(
-        object=objects[0],
-        active_object=objects[0],
-        selected_objects=objects,
-        selected_editable_objects=objects,
+def _share_glyph_data(collection: bpy.types.Collection, journal) -> None:
+    """Centre each glyph and link it to the session's glyph library.
+
+    The library hit rate is recorded on the collection as
+    ``typst_glyphs_reused`` and ``typst_glyphs_total``.
+    """
+    glyphs = []
+    for obj in collection.objects:
+        if obj.type not in {"MESH", "CURVE"} or obj.get("typst_svg_image_object"):
+            continue
+        # The library stores translation-free outlines.
+        _centre_object(obj)
+        glyphs.append(obj)
+
+    reused, total = adopt_glyphs(glyphs, journal)
+    collection["typst_glyphs_reused"] = reused
+    collection["typst_glyphs_total"] = total
+
+
+# Custom property pointing an import at its instancing prototype collection.
+GLYPH_PROTOTYPES_PROPERTY = "typst_glyph_prototypes"
+
+
+def glyph_prototypes(collection: bpy.types.Collection):
+    """Return the prototype collection of an instanced import, if it has one."""
+    return collection.get(GLYPH_PROTOTYPES_PROPERTY)
+
+
+def _instance_glyphs(collection: bpy.types.Collection, journal) -> None:
+    """Replace the glyph objects of an import with one instancing object.
+
+    Glyphs are first deduplicated through the glyph library.  Each distinct
+    outline gets one prototype object in an unlinked ``<collection> Glyphs``
+    collection, named in ``glyph_id`` order and found again with
+    :func:`glyph_prototypes`, and every glyph becomes a point
+    of a vertex-only mesh carrying ``glyph_id``, ``transform``, ``color``,
+    ``paint_index`` and ``opacity`` attributes.  Image planes stay separate
+    objects.
+    """
+    _share_glyph_data(collection, journal)
+    glyphs = [
+        obj
+        for obj in collection.objects
+        if obj.type in {"MESH", "CURVE"} and not obj.get("typst_svg_image_object")
+    ]
+    if not glyphs:
+        return
+
+    prototypes = bpy.data.collections.new(f"{collection.name} Glyphs")
+    journal["collections"].add(prototypes)
+    # Linking the prototypes would render them; the import points at them
+    # instead, so renaming and cleanup can find them.
+    collection[GLYPH_PROTOTYPES_PROPERTY] = prototypes
+    material = shared_material(
+        material_key(INSTANCE_ATTRIBUTE_VARIANT), create_instance_attribute_material
+    )
+
+    count = len(glyphs)
+    glyph_ids = np.empty(count, dtype=np.int32)
+    transforms = np.empty((count, 16), dtype=np.float32)
+    colors = np.empty((count, 4), dtype=np.float32)
+    opacities = np.empty(count, dtype=np.float32)
+    # With use_color_attribute the colour already lives on the object.
+    object_color_material = lookup_material(material_key(OBJECT_COLOR_VARIANT))
+    id_of = {}
+    for index, obj in enumerate(glyphs):
+        glyph_id = id_of.get(obj.data)
+        if glyph_id is None:
+            glyph_id = id_of[obj.data] = len(id_of)
+            # Zero-padded names keep Collection Info order equal to glyph_id.
+            prototype = bpy.data.objects.new(f"Glyph {glyph_id:06d}", obj.data)
+            for slot in prototype.material_slots:
+                slot.link = "OBJECT"
+                slot.material = material
+            prototypes.objects.link(prototype)
+        glyph_ids[index] = glyph_id
+        # Float4x4 attributes are stored column by column.
+        transforms[index] = np.array(obj.matrix_basis, dtype=np.float32).T.ravel()
+        slot_material = obj.material_slots[0].material if obj.material_slots else None
+        if slot_material is None:
+            colors[index] = (0.0, 0.0, 0.0, 1.0)
+        elif slot_material == object_color_material:
+            colors[index] = obj.color
+        else:
+            colors[index] = slot_material.diffuse_color
+        opacities[index] = obj.get("opacity", 1.0)
+
+    mesh = bpy.data.meshes.new(f"{collection.name}_glyphs")
+    journal["meshes"].add(mesh)
+    mesh.vertices.add(count)
+    mesh.vertices.foreach_set("co", transforms[:, 12:15].ravel())
+    for name, data_type, key, values in (
+        ("glyph_id", "INT", "value", glyph_ids),
+        ("paint_index", "INT", "value", np.arange(count, dtype=np.int32)),
+        ("transform", "FLOAT4X4", "value", transforms.ravel()),
+        ("color", "FLOAT_COLOR", "color", colors.ravel()),
+        ("opacity", "FLOAT", "value", opacities),
     ):
-        bpy.ops.object.origin_set(type="ORIGIN_GEOMETRY", center="MEDIAN")
+        mesh.attributes.new(name, data_type, "POINT").data.foreach_set(key, values)
+
+    instancer = bpy.data.objects.new(f"{collection.name}_glyphs", mesh)
+    journal["objects"].add(instancer)
+    modifier = instancer.modifiers.new(name=GLYPH_INSTANCES_NODE_GROUP, type="NODES")
+    modifier.node_group = create_glyph_instances_node_group()
+    set_modifier_input_value(modifier, "Glyphs", prototypes)
+
+    bpy.data.batch_remove(glyphs)
+    collection.objects.link(instancer)
 
 
 def _convert_to_meshes(collection: bpy.types.Collection) -> None:
@@ -389,14 +703,11 @@ def _convert_to_meshes(collection: bpy.types.Collection) -> None:
         obj.name = new_name
         obj.data.name = new_name
 
-    # In-place conversion leaves the source Curve datablocks behind. They are
-    # no longer referenced by Curve objects after a successful conversion.
-    used_curve_data = {
-        obj.data for obj in bpy.data.objects if obj.type == "CURVE"
-    }
-    for curve_data in source_curve_data:
-        if curve_data not in used_curve_data:
-            bpy.data.curves.remove(curve_data)
+    # In-place conversion leaves the source Curve datablocks behind. Any that
+    # are not shared with another object are now unused.
+    bpy.data.batch_remove(
+        [curve_data for curve_data in source_curve_data if curve_data.users == 0]
+    )
 
 def _convert_to_unfilled_paths(collection: bpy.types.Collection) -> None:
     
@@ -425,8 +736,7 @@ def _grease_pencil_material_key(material: bpy.types.Material) -> tuple:
 def _deduplicate_grease_pencil_materials(
     collection: bpy.types.Collection,
 ) -> None:
-    """Share identical native Grease Pencil materials in a collection."""
-    materials_by_key = {}
+    """Share identical native Grease Pencil materials across imports."""
     replaced_materials = set()
 
     for obj in collection.objects:
@@ -437,19 +747,19 @@ def _deduplicate_grease_pencil_materials(
             if material is None or material.grease_pencil is None:
                 continue
 
-            key = _grease_pencil_material_key(material)
-            shared_material = materials_by_key.get(key)
-            if shared_material is None:
+            key = material_key(
+                GREASE_PENCIL_VARIANT, *_grease_pencil_material_key(material)
+            )
+            shared = lookup_material(key)
+            if shared is None:
                 fill_color = material.grease_pencil.fill_color
-                hex_color = "".join(
-                    f"{int(max(0.0, min(1.0, component)) * 255):02x}"
-                    for component in fill_color[:3]
-                )
-                material.name = f"GPMat{len(materials_by_key)}_#{hex_color}"
-                materials_by_key[key] = material
+                material.name = f"GPMat_#{_hex_color(fill_color)}"
+                register_material(material, key)
+                continue
+            if shared == material:
                 continue
 
-            obj.data.materials[index] = shared_material
+            obj.data.materials[index] = shared
             replaced_materials.add(material)
 
     for material in replaced_materials:
@@ -457,9 +767,64 @@ def _deduplicate_grease_pencil_materials(
             bpy.data.materials.remove(material)
 
 
+GLYPH_INDEX_ATTRIBUTE = "glyph_index"
+
+
+def _merge_grease_pencil_objects(objects, name: str) -> bpy.types.Object:
+    """Join converted Grease Pencil glyphs into one object.
+
+    Every stroke keeps the index of its glyph in the ``glyph_index`` curve
+    attribute, in collection order, so glyphs stay selectable and animatable
+    as attribute ranges. Fill ids are renumbered first so the contours of
+    different glyphs never end up in one fill.
+    """
+    next_fill_id = 1
+    for glyph_index, obj in enumerate(objects):
+        for drawing in _grease_pencil_drawings(obj.data):
+            count = len(drawing.strokes)
+            if not count:
+                continue
+            attribute = drawing.attributes.get(GLYPH_INDEX_ATTRIBUTE)
+            if attribute is None:
+                attribute = drawing.attributes.new(
+                    GLYPH_INDEX_ATTRIBUTE, "INT", "CURVE"
+                )
+            attribute.data.foreach_set(
+                "value", np.full(count, glyph_index, dtype=np.int32)
+            )
+            fill_id = drawing.attributes.get("fill_id")
+            if fill_id is None:
+                continue
+            values = np.empty(count, dtype=np.int32)
+            fill_id.data.foreach_get("value", values)
+            ids, inverse = np.unique(values, return_inverse=True)
+            renumbered = np.where(ids != 0, np.arange(len(ids)) + next_fill_id, 0)
+            fill_id.data.foreach_set("value", renumbered[inverse].astype(np.int32))
+            next_fill_id += len(ids)
+
+    merged = objects[0]
+    if len(objects) > 1:
+        source_data = [obj.data for obj in objects[1:]]
+        with bpy.context.temp_override(
+            object=merged,
+            active_object=merged,
+            selected_objects=list(objects),
+            selected_editable_objects=list(objects),
+        ):
+            result = bpy.ops.object.join()
+        if result != {"FINISHED"}:
+            raise RuntimeError("Failed to merge the Grease Pencil glyphs")
+        bpy.data.batch_remove([data for data in source_data if data.users == 0])
+    merged.name = f"GP_{name}"
+    merged.data.name = f"GP_{name}DataBlock"
+    return merged
+
+
 def _convert_to_grease_pencil(
     collection: bpy.types.Collection,
     stroke_radius: float = DEFAULT_GREASE_PENCIL_STROKE_RADIUS,
+    merge_name: Optional[str] = None,
+    bake_stroke_radius: bool = False,
 ) -> None:
     """Convert imported SVG Curves to native Blender 5.2 Grease Pencil data.
 
@@ -467,6 +832,11 @@ def _convert_to_grease_pencil(
     ``hide_stroke`` attributes used by the current Grease Pencil fill system.
     A shared fill id keeps the outer and inner contours of glyphs together, so
     holes in characters such as ``O``, ``a``, ``0``, and ``8`` render properly.
+
+    With ``merge_name``, all glyphs are joined into one object of that name
+    with a single stroke-radius modifier; see
+    :func:`_merge_grease_pencil_objects`. With ``bake_stroke_radius``, the
+    radius is written into the drawings instead of a modifier.
     """
     if bpy.app.version < (5, 2, 0):
         raise RuntimeError("Grease Pencil import requires Blender 5.2 or newer")
@@ -492,7 +862,10 @@ def _convert_to_grease_pencil(
     # large imports (e.g. syntax-highlighted code blocks with thousands of
     # glyphs) from paying the per-operator scene update once per glyph.
     source_names = [obj.name for obj in curve_objects]
-    curves_before_conversion = set(bpy.data.curves)
+    curve_count = len(bpy.data.curves)
+    # Session UIDs only grow, so anything the converter creates is newer than
+    # every datablock that exists now, including the imported curves.
+    newest_uid = max(curve.session_uid for curve in source_curve_data)
     with bpy.context.temp_override(
         object=curve_objects[0],
         active_object=curve_objects[0],
@@ -522,18 +895,23 @@ def _convert_to_grease_pencil(
 
         converted_objects.append(gp_obj)
 
-    # In-place conversion leaves the source Curve datablocks behind (plus any
-    # temporaries the converter created). They are no longer referenced by
-    # Curve objects after a successful conversion.
-    conversion_curve_data = [
-        curve for curve in bpy.data.curves if curve not in curves_before_conversion
-    ]
-    used_curve_data = {
-        obj.data for obj in bpy.data.objects if obj.type == "CURVE"
-    }
-    for curve_data in source_curve_data + conversion_curve_data:
-        if curve_data not in used_curve_data:
-            bpy.data.curves.remove(curve_data)
+    # In-place conversion leaves the source Curve datablocks behind, plus any
+    # temporaries the converter created. Temporaries are only searched for
+    # when the number of curves actually grew.
+    conversion_curve_data = []
+    if len(bpy.data.curves) > curve_count:
+        conversion_curve_data = [
+            curve
+            for curve in bpy.data.curves
+            if curve.session_uid > newest_uid and curve.users == 0
+        ]
+    bpy.data.batch_remove(
+        [
+            curve_data
+            for curve_data in source_curve_data + conversion_curve_data
+            if curve_data.users == 0
+        ]
+    )
 
     for material in source_materials:
         if material.users == 0:
@@ -549,15 +927,143 @@ def _convert_to_grease_pencil(
 
     _deduplicate_grease_pencil_materials(collection)
 
+    if merge_name is not None:
+        glyph_count = len(converted_objects)
+        converted_objects = [
+            _merge_grease_pencil_objects(converted_objects, merge_name)
+        ]
+        add_glyph_reveal_modifier(converted_objects[0], glyph_count)
+
     for obj in converted_objects:
-        add_grease_pencil_stroke_radius_modifier(obj, stroke_radius)
+        if bake_stroke_radius:
+            _bake_stroke_radius(obj, stroke_radius)
+        else:
+            add_grease_pencil_stroke_radius_modifier(obj, stroke_radius)
 
     for obj in converted_objects:
         obj.select_set(True)
     bpy.context.view_layer.objects.active = converted_objects[0]
 
 
-def add_indices_to_collection(imported_collection):
+INDEX_LABEL_MODES = ("GEOMETRY_NODES", "OBJECTS")
+
+
+def _index_text_material() -> bpy.types.Material:
+    mat = bpy.data.materials.get("Index_Material")
+    if mat is None:
+        mat = bpy.data.materials.new("Index_Material")
+        mat.diffuse_color = (0.0, 0.0, 1.0, 1.0)  # Blue color
+    return mat
+
+
+def _index_background_material() -> bpy.types.Material:
+    bg_mat = bpy.data.materials.get("Index_Bg_Material")
+    if bg_mat is not None:
+        return bg_mat
+
+    bg_mat = bpy.data.materials.new("Index_Bg_Material")
+    bg_mat.diffuse_color = (1.0, 1.0, 1.0, 0.2)  # White with some transparency
+
+    # Set up material for transparency
+    bg_mat.use_nodes = True
+    nodes = bg_mat.node_tree.nodes
+    nodes.clear()
+    principled = nodes.new(type="ShaderNodeBsdfPrincipled")
+    principled.inputs["Base Color"].default_value = (1.0, 1.0, 1.0, 1.0)
+    principled.inputs["Alpha"].default_value = 0.2
+    principled.location = (0, 0)
+    output = nodes.new(type="ShaderNodeOutputMaterial")
+    output.is_active_output = True
+    output.location = (400, 0)
+    bg_mat.node_tree.links.new(principled.outputs["BSDF"], output.inputs["Surface"])
+
+    # Enable transparency settings for Eevee
+    bg_mat.blend_method = "BLEND"
+    bg_mat.use_backface_culling = False
+    return bg_mat
+
+
+def _natural_sort_key(name: str):
+    # Collection Info orders separated children by natural name order.
+    return [
+        (0, int(part), "") if part.isdigit() else (1, 0, part.lower())
+        for part in re.split(r"(\d+)", name)
+        if part
+    ]
+
+
+def _indexed_objects(collection) -> list:
+    """Return the objects of ``collection`` that get an index label."""
+    return [obj for obj in collection.objects if not obj.get(ROOT_EMPTY_PROPERTY)]
+
+
+def _add_index_overlay(imported_collection, indices_collection) -> None:
+    """Add one Geometry Nodes object drawing every index label."""
+    objects = _indexed_objects(imported_collection)
+    index_of = {obj.name: index for index, obj in enumerate(objects)}
+    # One label line per Collection Info instance, showing the index the
+    # object has in ``collection.objects``.
+    labels = "\n".join(
+        str(index_of[name]) for name in sorted(index_of, key=_natural_sort_key)
+    )
+    # Collection Info also instances the root empty; the overlay drops it.
+    names = sorted(
+        (obj.name for obj in imported_collection.objects), key=_natural_sort_key
+    )
+    root = collection_root(imported_collection)
+    skip_index = names.index(root.name) if root is not None else -1
+
+    mesh = bpy.data.meshes.new("Index_Overlay")
+    overlay = bpy.data.objects.new("Index_Overlay", mesh)
+    modifier = overlay.modifiers.new(name=INDEX_LABELS_NODE_GROUP, type="NODES")
+    modifier.node_group = create_index_labels_node_group()
+    set_modifier_input_value(modifier, "Collection", imported_collection)
+    set_modifier_input_value(modifier, "Labels", labels)
+    set_modifier_input_value(modifier, "Skip Index", skip_index)
+    set_modifier_input_value(modifier, "Text Material", _index_text_material())
+    set_modifier_input_value(
+        modifier, "Background Material", _index_background_material()
+    )
+    indices_collection.objects.link(overlay)
+
+
+def _add_index_objects(imported_collection, indices_collection) -> None:
+    """Create one text and one circle object per object with the data API."""
+    text_mat = _index_text_material()
+    bg_mat = _index_background_material()
+    circle = bpy.data.meshes.new("Index_Bg")
+    circle.from_pydata(
+        [
+            (0.07 * math.cos(angle), 0.07 * math.sin(angle), 0.0)
+            for angle in (2.0 * math.pi * k / 32 for k in range(32))
+        ],
+        [],
+        [range(32)],
+    )
+    circle.materials.append(bg_mat)
+
+    created = []
+    for i, obj in enumerate(_indexed_objects(imported_collection)):
+        x, y, z = obj.location
+        text = bpy.data.curves.new(f"Index_{i}", type="FONT")
+        text.body = str(i)
+        text.align_x = "CENTER"
+        text.align_y = "CENTER"
+        text.materials.append(text_mat)
+        text_obj = bpy.data.objects.new(f"Index_{i}", text)
+        text_obj.scale = (0.15, 0.15, 0.15)
+        text_obj.location = (x, y, z + 0.009)
+
+        # Every background shares the one circle mesh.
+        circle_obj = bpy.data.objects.new(f"Index_Bg_{i}", circle)
+        circle_obj.location = (x, y, z + 0.005)
+        created.extend((text_obj, circle_obj))
+
+    for obj in created:
+        indices_collection.objects.link(obj)
+
+
+def add_indices_to_collection(imported_collection, *, mode="GEOMETRY_NODES"):
     """
     Add index labels to objects in a collection.
     Example:
@@ -569,102 +1075,72 @@ def add_indices_to_collection(imported_collection):
 
     Args:
         imported_collection: The collection containing objects to be indexed.
+        mode: ``"GEOMETRY_NODES"`` adds a single overlay object whose
+            modifier instances a label and a shared circle at every object,
+            following the objects as they move.  Its collection is linked
+            next to ``imported_collection`` rather than inside it.
+            ``"OBJECTS"`` creates a text and a circle object per object
+            instead, all circles sharing one mesh.
 
     Returns:
         The indices collection if created, otherwise None.
     """
+    if mode not in INDEX_LABEL_MODES:
+        raise ValueError(f"Unknown index label mode {mode!r}")
     # Create a new collection for indices if there are multiple objects
-    if len(imported_collection.objects) > 1:
-        indices_collection = bpy.data.collections.new(
-            f"{imported_collection.name}_Indice^s"
-        )
-        # Link the indices collection as a child of the imported_collection instead of scene collection
+    if len(_indexed_objects(imported_collection)) <= 1:
+        return None
+
+    indices_collection = bpy.data.collections.new(
+        f"{imported_collection.name}_Indice^s"
+    )
+    if mode == "GEOMETRY_NODES":
+        # The overlay reads the imported collection through Collection Info,
+        # which refuses a collection containing the overlay itself, so the
+        # labels sit beside the import instead of inside it.
+        scene_collection = bpy.context.scene.collection
+        parents = [
+            collection
+            for collection in (scene_collection, *scene_collection.children_recursive)
+            if imported_collection.name in collection.children
+        ]
+        for parent in parents or [scene_collection]:
+            parent.children.link(indices_collection)
+        _add_index_overlay(imported_collection, indices_collection)
+    else:
+        # Link the indices collection as a child of the imported_collection
+        # instead of scene collection
         imported_collection.children.link(indices_collection)
+        _add_index_objects(imported_collection, indices_collection)
+    return indices_collection
 
-        for i, obj in enumerate(imported_collection.objects):
-            # Create text object at the same location as the curve/mesh
-            bpy.ops.object.text_add(location=(0, 0, 0))
-            text_obj = bpy.context.active_object
-            text_obj.data.body = str(i)
-            text_obj.name = f"Index_{i}"
-            bpy.ops.object.origin_set(type="ORIGIN_GEOMETRY", center="MEDIAN")
-            text_obj.scale = (0.15, 0.15, 0.15)
-
-            # Make the text smaller
-
-            # Set text color to blue
-            if "Index_Material" not in bpy.data.materials:
-                mat = bpy.data.materials.new("Index_Material")
-                mat.diffuse_color = (0.0, 0.0, 1.0, 1.0)  # Blue color
-            else:
-                mat = bpy.data.materials["Index_Material"]
 
-            if text_obj.data.materials:
-                text_obj.data.materials[0] = mat
-            else:
-                text_obj.data.materials.append(mat)
+ROOT_EMPTY_PROPERTY = "typst_root"
 
-            # Set text position to obj.location with slight z offset
-            text_obj.location = (
-                obj.location[0],
-                obj.location[1],
-                obj.location[2] + 0.009,
-            )
 
-            # Create background circle for the text
-            bpy.ops.mesh.primitive_circle_add(
-                vertices=32,
-                radius=0.07,
-                fill_type="NGON",
-                location=(obj.location[0], obj.location[1], obj.location[2] + 0.005),
-            )
-            circle_obj = bpy.context.active_object
-            circle_obj.name = f"Index_Bg_{i}"
-
-            # Create white material for background with transparency
-            if "Index_Bg_Material" not in bpy.data.materials:
-                bg_mat = bpy.data.materials.new("Index_Bg_Material")
-                bg_mat.diffuse_color = (
-                    1.0,
-                    1.0,
-                    1.0,
-                    0.2,
-                )  # White with some transparency
-
-                # Set up material for transparency
-                bg_mat.use_nodes = True
-                bg_mat.node_tree.nodes.clear()
-                with s.tree(bg_mat.node_tree, arrange="sugiyama") as tree:
-                    principled = s.PrincipledBSDF(
-                        base_color=(1.0, 1.0, 1.0, 1.0), alpha=0.2
-                    )
-                    s.MaterialOutput(surface=principled, is_active_output=True)
-                    tree.node_positions = {
-                        "Principled BSDF": (0, 0),
-                        "Material Output": (400, 0),
-                    }
-
-                # Enable transparency settings for Eevee
-                bg_mat.blend_method = "BLEND"
-                bg_mat.use_backface_culling = False
-            else:
-                bg_mat = bpy.data.materials["Index_Bg_Material"]
-
-            if circle_obj.data.materials:
-                circle_obj.data.materials[0] = bg_mat
-            else:
-                circle_obj.data.materials.append(bg_mat)
-
-            # Move from scene collection to indices collection
-            bpy.context.scene.collection.objects.unlink(text_obj)
-            indices_collection.objects.link(text_obj)
+def collection_root(collection: bpy.types.Collection) -> Optional[bpy.types.Object]:
+    """Return the root empty of an imported collection, if it has one."""
+    for obj in collection.objects:
+        if obj.get(ROOT_EMPTY_PROPERTY):
+            return obj
+    return None
 
-            bpy.context.scene.collection.objects.unlink(circle_obj)
-            indices_collection.objects.link(circle_obj)
 
-        return indices_collection
+def add_root_empty(collection: bpy.types.Collection) -> bpy.types.Object:
+    """Parent every object of ``collection`` to a new empty at the origin.
 
-    return None
+    Objects in child collections, such as index labels, are included. Moving,
+    aligning or animating the empty then moves the whole import at once.
+    """
+    root = bpy.data.objects.new(collection.name, None)
+    root.empty_display_type = "PLAIN_AXES"
+    root[ROOT_EMPTY_PROPERTY] = True
+    for obj in collection.all_objects:
+        if obj.parent is None:
+            # The root sits at the origin, so no parent inverse is needed.
+            obj.parent = root
+    collection.objects.link(root)
+    return root
 
 
 # Main conversion functions
@@ -681,6 +1157,16 @@ def typst_to_blender_curves(
     use_grease_pencil: bool = False,
     grease_pencil_stroke_radius: float = DEFAULT_GREASE_PENCIL_STROKE_RADIUS,
     allow_external_images: bool = False,
+    use_image_atlas: bool = False,
+    use_image_proxies: bool = False,
+    image_directory: Optional[str] = None,
+    stream_images: bool = False,
+    use_color_attribute: bool = False,
+    use_root_empty: bool = False,
+    use_glyph_library: bool = False,
+    use_instancing: bool = False,
+    merge_grease_pencil: bool = False,
+    bake_grease_pencil_stroke_radius: bool = False,
 ) -> bpy.types.Collection:
     """
     Compile a .txt or .typ file to an SVG using Typst,
@@ -690,7 +1176,7 @@ def typst_to_blender_curves(
         typst_file (Path): The path to the .txt or .typ file.
         scale_factor (float, optional): Scale factor for the imported curves. Defaults to 100.0.
         origin_to_char (bool, optional): If True, set the origin of each object to its geometry. Defaults to False.
-        join_curves (bool, optional): If True, join all curves into a single object. Defaults to False.
+        join_curves (bool, optional): If True, join all curves into a single object. Same-colour paths are merged in the SVG first, so Blender only creates one curve per colour. Defaults to False.
         convert_to_mesh (bool, optional): If True, convert curves to meshes. Defaults to False.
         convert_to_unfilled_path (bool, optional): If True, convert curves to unfilled paths. Defaults to False.
         position (Optional[Tuple[float, float, float]], optional): Position (x,y,z) to place the content. Defaults to None.
@@ -699,13 +1185,60 @@ def typst_to_blender_curves(
         grease_pencil_stroke_radius (float, optional): Initial value for the editable Stroke Radius Geometry Nodes input. Defaults to 0.01.
         allow_external_images (bool, optional): Allow image references outside
             the Typst source folder. Keep disabled for untrusted documents.
+        use_image_atlas (bool, optional): Pack small raster images (emoji,
+            icons) into shared atlas textures with one material per atlas.
+            Defaults to False.
+        use_image_proxies (bool, optional): Pack large images as downscaled
+            viewport previews and load their cached full-resolution files
+            only for final renders. Defaults to False.
+        image_directory (Optional[str], optional): Write images once to this
+            content-addressed directory (``//`` paths are relative to the
+            .blend file) and reference them as external files instead of
+            packing them. Defaults to None.
+        stream_images (bool, optional): Spill decoded images to temporary
+            files instead of holding their bytes in memory, release each one
+            once its datablock exists, and store the processed SVG with
+            ``typst-image:`` hash references instead of base64 data.
+            Defaults to False.
+        use_color_attribute (bool, optional): Store each glyph's fill colour
+            as its object colour and share one material that reads it, instead
+            of one material per colour. Ignored with ``use_grease_pencil`` and
+            ``join_curves``, which need per-colour materials. Defaults to False.
+        use_root_empty (bool, optional): Parent every imported object to one
+            empty named after the collection. ``position`` then moves only
+            that empty, and the whole import can be moved or animated through
+            it. Defaults to False.
+        use_glyph_library (bool, optional): Link curve and mesh glyphs to one
+            shared datablock per distinct outline, kept in the hidden
+            "Typst Glyph Library" collection across imports. Each glyph's
+            origin moves to its geometry and its materials move to
+            object-linked slots. Ignored with ``use_grease_pencil``.
+            Defaults to False.
+        use_instancing (bool, optional): Import all glyphs as one object that
+            instances shared glyph outlines onto a point per glyph with
+            Geometry Nodes. Colour, opacity and paint order are point
+            attributes, and the modifier's Reveal and Opacity inputs animate
+            every glyph at once. Implies ``use_glyph_library``; ignored with
+            ``use_grease_pencil``. Defaults to False.
+        merge_grease_pencil (bool, optional): With ``use_grease_pencil``,
+            join every glyph into one Grease Pencil object with a single
+            stroke-radius modifier. Each stroke stores its glyph in the
+            ``glyph_index`` attribute, and a Glyph Reveal modifier shows the
+            first ``Visible Glyphs`` glyphs. Defaults to False.
+        bake_grease_pencil_stroke_radius (bool, optional): Write the stroke
+            radius and ``hide_stroke`` straight into the Grease Pencil
+            drawings instead of adding the Stroke Radius modifier, so static
+            text costs no modifier evaluation per frame. Defaults to False.
 
     Returns:
         bpy.types.Collection: The collection of imported Blender objects.
     """
     typst_file = Path(typst_file)
     file_name_without_ext = typst_file.stem
-    import_state = _snapshot_svg_import_state()
+    journal = _new_svg_import_journal()
+    spill_directory = (
+        tempfile.mkdtemp(prefix="typst_images_") if stream_images else None
+    )
 
     try:
         # Use a unique directory and SVG filename so concurrent imports never
@@ -714,34 +1247,55 @@ def typst_to_blender_curves(
             svg_file = Path(temporary_dir) / f"{file_name_without_ext}.svg"
             typst.compile(typst_file, format="svg", output=str(svg_file))
             processed_svg = preprocess_svg(svg_file.read_text(encoding="utf-8"))
+            scaled_svg, scale_folded = fold_svg_scale(
+                processed_svg,
+                scale_factor,
+                bpy.context.scene.unit_settings.scale_length,
+            )
+            if not scale_folded:
+                print(
+                    "Typst SVG warning: could not fold the scale into the SVG "
+                    "root; scaling the imported objects instead"
+                )
             (
                 images,
                 image_warnings,
                 marked_svg,
                 marker_ids,
             ) = prepare_svg_images(
-                processed_svg,
+                scaled_svg,
                 svg_dir=typst_file.parent,
                 scene_scale_length=bpy.context.scene.unit_settings.scale_length,
                 allow_external_outside_svg=allow_external_images,
+                spill_directory=spill_directory,
             )
-            imported_collection = _import_marked_svg(marked_svg, import_state)
+            if join_curves:
+                # One compound path per colour instead of one per glyph.
+                marked_svg = merge_svg_paths(
+                    marked_svg, bpy.context.scene.unit_settings.scale_length
+                )
+            imported_collection = _import_marked_svg(marked_svg, journal)
+
+        if use_image_atlas:
+            journal["images"].update(build_image_atlases(images, image_warnings))
 
         source_objects = list(imported_collection.objects)
 
         imported_collection.name = f"Typst_{file_name_without_ext}"
-        imported_collection.processed_svg = processed_svg
-
-        # Also store on the scene so the Export panel can always access the
-        # latest SVG.
-        bpy.context.scene.typst_last_processed_svg = processed_svg
 
         create_image_planes(
             images,
             imported_collection,
             use_emission=True,
             warnings=image_warnings,
-            scale_factor=scale_factor,
+            scale_factor=1.0 if scale_folded else scale_factor,
+            use_proxies=use_image_proxies,
+            image_directory=(
+                resolve_store_directory(image_directory, image_warnings)
+                if image_directory
+                else None
+            ),
+            journal=journal,
         )
         if marker_ids:
             finalize_paint_order(
@@ -754,18 +1308,34 @@ def typst_to_blender_curves(
         for warning in image_warnings:
             print(f"Typst SVG image warning: {warning}")
 
-        # Setup curve objects and their vector materials. Image planes have
-        # already been created at the matching Typst scale.
-        for obj in imported_collection.objects:
-            if obj.type != "CURVE":
-                continue
+        if stream_images:
+            # Only images that now have a datablock or a cache file are
+            # replaced by references; the rest stay embedded.
+            processed_svg = externalize_svg_images(processed_svg, images)
+        imported_collection.processed_svg = processed_svg
+        # Also store on the scene so the Export panel can always access the
+        # latest SVG.
+        bpy.context.scene.typst_last_processed_svg = processed_svg
+
+        # Curve geometry and image planes were imported at the Typst scale
+        # unless it could not be folded into the SVG; the curves then still
+        # need scaling besides their names and opacity properties.
+        curves = [obj for obj in imported_collection.objects if obj.type == "CURVE"]
+        for obj in curves:
             # Rename curve objects from "Curve" to "n"
             if obj.name.startswith("Curve"):
                 obj.name = "n" + obj.name[5:]
-            setup_object(obj, scale_factor)
+        if scale_folded:
+            add_opacity_properties(imported_collection.objects)
+        else:
+            for obj in curves:
+                setup_object(obj, scale_factor)
 
-        deduplicate_materials(imported_collection)
-        _remove_unused_svg_materials(import_state)
+        if use_color_attribute and not (use_grease_pencil or join_curves):
+            use_object_color_material(imported_collection)
+        else:
+            deduplicate_materials(imported_collection)
+        _remove_unused_svg_materials(journal)
 
         if join_curves and sum(
             obj.type == "CURVE" for obj in imported_collection.objects
@@ -779,14 +1349,23 @@ def typst_to_blender_curves(
             _convert_to_grease_pencil(
                 imported_collection,
                 stroke_radius=grease_pencil_stroke_radius,
+                merge_name=(
+                    file_name_without_ext if merge_grease_pencil else None
+                ),
+                bake_stroke_radius=bake_grease_pencil_stroke_radius,
             )
         elif convert_to_mesh:
             _convert_to_meshes(imported_collection)
         elif convert_to_unfilled_path:
             _convert_to_unfilled_paths(imported_collection)
 
+        if use_instancing and not use_grease_pencil:
+            _instance_glyphs(imported_collection, journal)
+        elif use_glyph_library and not use_grease_pencil:
+            _share_glyph_data(imported_collection, journal)
+
         # Position the collection if coordinates are provided.
-        if position is not None:
+        if position is not None and not use_root_empty:
             for obj in imported_collection.objects:
                 # Add position as an offset to current location
                 obj.location = (
@@ -795,14 +1374,25 @@ def typst_to_blender_curves(
                     obj.location[2] + position[2],
                 )
 
-        # Add index labels if requested.
+        if use_root_empty:
+            root = add_root_empty(imported_collection)
+            journal["objects"].add(root)
+            if position is not None:
+                root.location = position
+
+        # Add index labels if requested; the root empty gets none.
         if show_indices:
-            add_indices_to_collection(imported_collection)
+            indices_collection = add_indices_to_collection(imported_collection)
+            if indices_collection is not None:
+                journal["collections"].add(indices_collection)
 
         return imported_collection
     except Exception:
-        _rollback_svg_import_state(import_state)
+        _rollback_svg_import_state(journal)
         raise
+    finally:
+        if spill_directory is not None:
+            shutil.rmtree(spill_directory, ignore_errors=True)
 
 
 def typst_express(
@@ -820,6 +1410,16 @@ def typst_express(
     use_grease_pencil: bool = False,
     grease_pencil_stroke_radius: float = DEFAULT_GREASE_PENCIL_STROKE_RADIUS,
     allow_external_images: bool = False,
+    use_image_atlas: bool = False,
+    use_image_proxies: bool = False,
+    image_directory: Optional[str] = None,
+    stream_images: bool = False,
+    use_color_attribute: bool = False,
+    use_root_empty: bool = False,
+    use_glyph_library: bool = False,
+    use_instancing: bool = False,
+    merge_grease_pencil: bool = False,
+    bake_grease_pencil_stroke_radius: bool = False,
 ) -> bpy.types.Collection:
     """
     Create Blender objects from Typst content.
@@ -840,6 +1440,26 @@ def typst_express(
         grease_pencil_stroke_radius (float, optional): Initial value for the editable Stroke Radius Geometry Nodes input. Defaults to 0.01.
         allow_external_images (bool, optional): Allow image references outside
             the Typst source folder. Defaults to False.
+        use_image_atlas (bool, optional): Pack small raster images into shared
+            atlas textures. Defaults to False.
+        use_image_proxies (bool, optional): Use downscaled viewport previews
+            for large images. Defaults to False.
+        image_directory (Optional[str], optional): Store images as external
+            files in this directory instead of packing them. Defaults to None.
+        stream_images (bool, optional): Keep image bytes out of memory and out
+            of the stored processed SVG. Defaults to False.
+        use_color_attribute (bool, optional): Share one material that reads
+            each glyph's object colour. Defaults to False.
+        use_root_empty (bool, optional): Parent every object to one empty
+            named after the collection. Defaults to False.
+        use_glyph_library (bool, optional): Share one datablock per distinct
+            glyph outline across imports. Defaults to False.
+        use_instancing (bool, optional): Import all glyphs as one Geometry
+            Nodes instancing object. Defaults to False.
+        merge_grease_pencil (bool, optional): Join Grease Pencil glyphs into
+            one object. Defaults to False.
+        bake_grease_pencil_stroke_radius (bool, optional): Bake the stroke
+            radius into the drawings instead of a modifier. Defaults to False.
 
     Returns:
         bpy.types.Collection: The collection of imported Blender objects.
@@ -867,7 +1487,23 @@ def typst_express(
         show_indices=show_indices,
         grease_pencil_stroke_radius=grease_pencil_stroke_radius,
         allow_external_images=allow_external_images,
+        use_image_atlas=use_image_atlas,
+        use_image_proxies=use_image_proxies,
+        image_directory=image_directory,
+        stream_images=stream_images,
+        use_color_attribute=use_color_attribute,
+        use_root_empty=use_root_empty,
+        use_glyph_library=use_glyph_library,
+        use_instancing=use_instancing,
+        merge_grease_pencil=merge_grease_pencil,
+        bake_grease_pencil_stroke_radius=bake_grease_pencil_stroke_radius,
     )
     collection.name = name
+    root = collection_root(collection)
+    if root is not None:
+        root.name = name
+    prototypes = glyph_prototypes(collection)
+    if prototypes is not None:
+        prototypes.name = f"{name} Glyphs"
 
     return collection